@@ -1,3 +1,4 @@
+import importlib.util
 import os
 from pathlib import Path
 from datetime import timedelta
@@ -50,6 +51,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "myapp.db_router.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     'whitenoise.middleware.WhiteNoiseMiddleware', 
@@ -78,6 +80,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "docproject.wsgi.application"
 
+# myapp/views/: route modules are imported on first request; EAGER_VIEWS=1
+# imports them all at startup (pair with gunicorn --preload).
+EAGER_VIEWS = os.environ.get("EAGER_VIEWS", "0") == "1"
+
 # ----------------------------------------
 # Database (MySQL)
 # ----------------------------------------
@@ -89,6 +95,81 @@ DATABASES = {
     )
 }
 
+# Read replicas (myapp/db_router.py): comma-separated URLs → aliases replica1, replica2, …
+# Safe requests read from a replica; writes, open transactions and the
+# READ_YOUR_WRITES_SECONDS after a caller's write stay on the primary.
+DATABASE_REPLICAS = []
+for _n, _url in enumerate(filter(None, os.environ.get("DATABASE_REPLICA_URLS", "").split(",")), start=1):
+    DATABASES[f"replica{_n}"] = {**dj_database_url.parse(_url.strip(), conn_max_age=600), "TEST": {"MIRROR": "default"}}
+    DATABASE_REPLICAS.append(f"replica{_n}")
+DATABASE_ROUTERS = ["myapp.db_router.PrimaryReplicaRouter"]
+READ_YOUR_WRITES_SECONDS = int(os.environ.get("READ_YOUR_WRITES_SECONDS", 15))
+
+# Connection pooling (PostgreSQL + psycopg 3, myapp/db_pool.py): each alias gets
+# a psycopg_pool per worker process, so threads borrow a connection per request
+# instead of holding one each. Connections are health-checked on checkout
+# (CONN_HEALTH_CHECKS) and recycled after max_lifetime. DB_POOL=0 falls back to
+# persistent connections; other engines are left alone.
+DB_POOL = os.environ.get("DB_POOL", "1") == "1"
+DB_POOL_OPTIONS = {
+    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),            # seconds to wait for a free connection
+    "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),
+    "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+}
+
+_POOL_AVAILABLE = all(importlib.util.find_spec(m) for m in ("psycopg", "psycopg_pool"))
+
+if DB_POOL and _POOL_AVAILABLE:
+    for _db in DATABASES.values():
+        if _db.get("ENGINE") == "django.db.backends.postgresql":
+            _db["CONN_MAX_AGE"] = 0  # the pool owns connection lifetime
+            _db["CONN_HEALTH_CHECKS"] = True
+            _db.setdefault("OPTIONS", {})["pool"] = dict(DB_POOL_OPTIONS)
+
+# ----------------------------------------
+# Cache
+# ----------------------------------------
+# Shared Redis cache in production so every gunicorn worker sees the same
+# entries and invalidation counters; per-process memory cache otherwise.
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "wellora",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "wellora",
+        }
+    }
+
+PUBLIC_CACHE_SECONDS = int(os.environ.get("PUBLIC_CACHE_SECONDS", 300))
+
+# ----------------------------------------
+# Rate limits (myapp/throttling.py) — "<scope>:<kind>": "<count>/<period>"
+# ----------------------------------------
+RATE_LIMIT_STORE = os.environ.get("RATE_LIMIT_STORE")  # "local" | "cache"; default: cache when REDIS_URL is set
+RATE_LIMITS = {
+    "send_otp:ip": "20/h",
+    "send_otp:email": "5/15m",
+    "check_role:ip": "30/m",
+    "check_role:email": "10/m",
+    "analyze_symptoms:ip": "20/m",
+    "analyze_symptoms:user": "10/m",
+    "chatbot:ip": "30/m",
+    "chatbot:user": "15/m",
+    "chat_stream:ip": "20/m",
+    "chat_stream:user": "10/m",
+    "slots:ip": "120/m",
+}
+
 # ----------------------------------------
 # Custom User Model
 # ----------------------------------------
@@ -102,7 +183,8 @@ AUTH_USER_MODEL = "myapp.User"
 # ----------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # identity from token claims on reads; DB user on writes
+        "myapp.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -111,12 +193,16 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.JSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     ],
+    # reverse proxies in front of the app (e.g. 1 behind nginx). 0 = use REMOTE_ADDR and
+    # ignore X-Forwarded-For, which the client controls; per-IP limits key off this
+    "NUM_PROXIES": int(os.environ.get("NUM_PROXIES", 0)),
 }
 
 from datetime import timedelta
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
+    # short: role / profile / clinic claims are re-read from the DB on every refresh
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
@@ -124,6 +210,8 @@ SIMPLE_JWT = {
     "SIGNING_KEY": SECRET_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
+    "TOKEN_OBTAIN_SERIALIZER": "myapp.authentication.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "myapp.authentication.ClaimsTokenRefreshSerializer",
 }
 
 
@@ -206,6 +294,23 @@ else:
 # ----------------------------------------
 OTP_EXPIRY_MINUTES = 10  # how long OTPs are valid
 
+# OTP delivery (myapp/otp_delivery.py): channel preference, "live" or "fake" providers
+OTP_CHANNELS = ["sms", "email"]
+OTP_DELIVERY_BACKEND = os.environ.get("OTP_DELIVERY_BACKEND", "live")
+OTP_BATCH_DEADLINE_SECONDS = float(os.environ.get("OTP_BATCH_DEADLINE_SECONDS", 15))  # per provider batch, then fail over
+OTP_SMS_DEFAULT_COUNTRY_CODE = os.environ.get("OTP_SMS_DEFAULT_COUNTRY_CODE", "+91")
+
+# Slots (myapp/slots.py): "materialized" = one TimeSlot row per slot, written with
+# the availability window; "virtual" = free slots computed from the windows on
+# read, rows only created at booking. Compare with `manage.py bench_slots`.
+SLOT_MODE = os.environ.get("SLOT_MODE", "materialized")
+VIRTUAL_SLOT_HORIZON_DAYS = int(os.environ.get("VIRTUAL_SLOT_HORIZON_DAYS", 60))
+
+# Twilio (SMS channel is skipped unless all three are set)
+TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN")
+TWILIO_FROM_NUMBER = os.environ.get("TWILIO_FROM_NUMBER")
+
 # ----------------------------------------
 # Razorpay API keys
 # ----------------------------------------
@@ -243,4 +348,17 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # ----------------------------------------
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# "openai" or "fake" (deterministic local model for offline dev / tests)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 6 * 60 * 60))
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", 8))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 15))
+
+# offline symptom matcher: below this confidence analyze_symptoms asks the LLM
+MATCHER_MIN_CONFIDENCE = float(os.getenv("MATCHER_MIN_CONFIDENCE", 0.6))
+
+# SSE chat / symptom streams (ASGI): open streams per worker
+STREAM_MAX_CONCURRENT = int(os.getenv("STREAM_MAX_CONCURRENT", 32))
+
 
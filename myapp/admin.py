@@ -1,8 +1,14 @@
 from django.contrib import admin
+from django.db.models import F
+from django.utils import timezone
+from . import cache as public_cache
+from .etags import touch_doctors
+from .authentication import revoke_tokens
 from .models import (
     ClinicRevenue, User, DoctorProfile, PatientProfile, Clinic, ClinicDoctorRequest,
     DoctorAvailability, Appointment, Payment, Review, MedicalReport,
-    Reminder, Notification, HomeImage, Specialization, Symptom, TimeSlot
+    Reminder, Notification, HomeImage, Specialization, Symptom, TimeSlot,
+    SettlementRun, SettlementStatement,
 )
 
 @admin.register(User)
@@ -18,6 +24,7 @@ class UserAdmin(admin.ModelAdmin):
             is_approved=True,
             is_active=True  # ✅ Activate on approval so they can log in
         )
+        revoke_tokens(queryset.filter(role="clinic_owner").values_list("id", flat=True))
         self.message_user(request, f"{updated} clinic owner(s) approved successfully.")
 
     @admin.action(description="❌ Reject selected users")
@@ -26,6 +33,7 @@ class UserAdmin(admin.ModelAdmin):
             is_approved=False,
             is_active=False  # ✅ Deactivate on rejection
         )
+        revoke_tokens(queryset.filter(role="clinic_owner").values_list("id", flat=True))
         self.message_user(request, f"{updated} clinic owner(s) rejected successfully.")
 
 
@@ -38,12 +46,16 @@ class ClinicAdmin(admin.ModelAdmin):
 
     @admin.action(description="✅ Approve selected clinics")
     def approve_clinic(self, request, queryset):
-        updated = queryset.update(is_verified=True)
+        updated = queryset.update(is_verified=True, updated_at=timezone.now())
+        touch_doctors(clinic_requests__clinic__in=queryset, clinic_requests__status="approved")
+        public_cache.bump(public_cache.DOCTOR_SHARED, public_cache.CLINIC_SHARED)  # .update() sends no signals
         self.message_user(request, f"{updated} clinic(s) approved successfully.")
 
     @admin.action(description="❌ Reject selected clinics")
     def reject_clinic(self, request, queryset):
-        updated = queryset.update(is_verified=False)
+        updated = queryset.update(is_verified=False, updated_at=timezone.now())
+        touch_doctors(clinic_requests__clinic__in=queryset, clinic_requests__status="approved")
+        public_cache.bump(public_cache.DOCTOR_SHARED, public_cache.CLINIC_SHARED)  # .update() sends no signals
         self.message_user(request, f"{updated} clinic(s) rejected successfully.")
 
 
@@ -56,12 +68,14 @@ class DoctorProfileAdmin(admin.ModelAdmin):
 
     @admin.action(description="✅ Approve selected doctors")
     def approve_doctor(self, request, queryset):
-        updated = queryset.update(is_verified=True)
+        updated = queryset.update(is_verified=True, version=F("version") + 1, updated_at=timezone.now())
+        public_cache.bump(public_cache.DOCTOR_LIST, public_cache.DOCTOR_SHARED, public_cache.CLINIC_SHARED)  # .update() sends no signals
         self.message_user(request, f"{updated} doctor(s) approved successfully.")
 
     @admin.action(description="❌ Reject selected doctors")
     def reject_doctor(self, request, queryset):
-        updated = queryset.update(is_verified=False)
+        updated = queryset.update(is_verified=False, version=F("version") + 1, updated_at=timezone.now())
+        public_cache.bump(public_cache.DOCTOR_LIST, public_cache.DOCTOR_SHARED, public_cache.CLINIC_SHARED)  # .update() sends no signals
         self.message_user(request, f"{updated} doctor(s) rejected successfully.")
 
 
@@ -152,4 +166,18 @@ class TimeSlotAdmin(admin.ModelAdmin):
 class ClinicRevenueAdmin(admin.ModelAdmin):
     list_display = ("clinic", "doctor", "appointment", "total_fee", "clinic_share", "doctor_earning", "created_at")
     list_filter = ("clinic", "doctor")
-    search_fields = ("clinic__name", "doctor__user__full_name", "appointment__token_no")
\ No newline at end of file
+    search_fields = ("clinic__name", "doctor__user__full_name", "appointment__token_no")
+
+
+@admin.register(SettlementRun)
+class SettlementRunAdmin(admin.ModelAdmin):
+    list_display = ("period_start", "period_end", "appointment_count", "total_fee", "clinic_share", "doctor_payout", "created_at")
+    readonly_fields = [f.name for f in SettlementRun._meta.fields]
+
+
+@admin.register(SettlementStatement)
+class SettlementStatementAdmin(admin.ModelAdmin):
+    list_display = ("run", "doctor", "clinic", "appointment_count", "total_fee", "clinic_share", "doctor_payout")
+    list_filter = ("run", "clinic")
+    search_fields = ("doctor__user__full_name", "clinic__name")
+    readonly_fields = [f.name for f in SettlementStatement._meta.fields]
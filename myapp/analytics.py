@@ -0,0 +1,195 @@
+# myapp/analytics.py
+"""
+Clinic utilization / no-show analytics.
+
+Everything for a (clinic, period) is pulled with three flat queries into
+pandas frames and aggregated column-wise; the finished report is cached so
+dashboards only pay for the first compute.
+"""
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Appointment, ClinicRevenue, DoctorProfile, TimeSlot
+
+ANALYTICS_CACHE_SECONDS = getattr(settings, "ANALYTICS_CACHE_SECONDS", 15 * 60)
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+LEAD_TIME_BUCKETS = [0, 24, 72, 168, np.inf]
+LEAD_TIME_LABELS = ["same_day", "1_3_days", "3_7_days", "over_week"]
+
+
+def cache_key(clinic_id, start, end):
+    return f"analytics:clinic:{clinic_id}:{start.isoformat()}:{end.isoformat()}"
+
+
+def _local(series):
+    return pd.to_datetime(series, utc=True).dt.tz_convert(settings.TIME_ZONE)
+
+
+def _rate(part, whole):
+    return round(float(part) / float(whole), 4) if whole else 0.0
+
+
+def _load_frames(clinic_id, start, end):
+    slots = pd.DataFrame.from_records(
+        list(
+            TimeSlot.objects.filter(clinic_id=clinic_id, start__date__gte=start, start__date__lte=end)
+            .values_list("doctor_id", "start", "is_booked")
+        ),
+        columns=["doctor_id", "start", "is_booked"],
+    )
+    appts = pd.DataFrame.from_records(
+        list(
+            Appointment.objects.filter(
+                clinic_id=clinic_id, timeslot__start__date__gte=start, timeslot__start__date__lte=end
+            ).values_list("doctor_id", "status", "paid", "created_at", "timeslot__start")
+        ),
+        columns=["doctor_id", "status", "paid", "created_at", "visit_at"],
+    )
+    revenue = pd.DataFrame.from_records(
+        list(
+            ClinicRevenue.objects.filter(
+                clinic_id=clinic_id,
+                appointment__timeslot__start__date__gte=start,
+                appointment__timeslot__start__date__lte=end,
+            ).values_list("doctor_id", "total_fee", "clinic_share")
+        ),
+        columns=["doctor_id", "total_fee", "clinic_share"],
+    )
+    return slots, appts, revenue
+
+
+def _heatmap(slots):
+    """7×24 grid (weekday × local hour) of total and booked slots."""
+    total = np.zeros((7, 24), dtype="int64")
+    booked = np.zeros((7, 24), dtype="int64")
+    if not slots.empty:
+        local = _local(slots["start"])
+        flat = local.dt.weekday.to_numpy() * 24 + local.dt.hour.to_numpy()
+        total = np.bincount(flat, minlength=7 * 24).reshape(7, 24)
+        booked = np.bincount(flat, weights=slots["is_booked"].to_numpy(dtype="int64"), minlength=7 * 24)
+        booked = booked.astype("int64").reshape(7, 24)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(total > 0, booked / np.maximum(total, 1), 0.0)
+
+    return {
+        "weekdays": WEEKDAYS,
+        "hours": list(range(24)),
+        "total_slots": total.tolist(),
+        "booked_slots": booked.tolist(),
+        "utilization": np.round(ratio, 4).tolist(),
+    }
+
+
+def _lead_times(appts):
+    active = appts[appts["visit_at"].notna()]
+    if active.empty:
+        return {"count": 0, "mean_hours": None, "median_hours": None, "p90_hours": None,
+                "buckets": dict.fromkeys(LEAD_TIME_LABELS, 0)}
+
+    hours = (
+        (pd.to_datetime(active["visit_at"], utc=True) - pd.to_datetime(active["created_at"], utc=True))
+        .dt.total_seconds().to_numpy() / 3600.0
+    )
+    hours = np.clip(hours, 0, None)
+    counts = np.histogram(hours, bins=LEAD_TIME_BUCKETS)[0]
+    return {
+        "count": int(hours.size),
+        "mean_hours": round(float(hours.mean()), 2),
+        "median_hours": round(float(np.median(hours)), 2),
+        "p90_hours": round(float(np.percentile(hours, 90)), 2),
+        "buckets": {label: int(n) for label, n in zip(LEAD_TIME_LABELS, counts)},
+    }
+
+
+def _per_doctor(slots, appts, revenue):
+    slot_stats = (
+        slots.groupby("doctor_id")["is_booked"].agg(total_slots="size", booked_slots="sum")
+        if not slots.empty else pd.DataFrame(columns=["total_slots", "booked_slots"])
+    )
+
+    if not appts.empty:
+        appts = appts.assign(
+            cancelled=appts["status"].eq("cancelled"),
+            unpaid=appts["status"].ne("cancelled") & ~appts["paid"].astype(bool),
+        )
+        appt_stats = appts.groupby("doctor_id").agg(
+            appointments=("status", "size"), cancelled=("cancelled", "sum"), unpaid=("unpaid", "sum")
+        )
+    else:
+        appt_stats = pd.DataFrame(columns=["appointments", "cancelled", "unpaid"])
+
+    if not revenue.empty:
+        revenue = revenue.assign(
+            total_fee=pd.to_numeric(revenue["total_fee"]), clinic_share=pd.to_numeric(revenue["clinic_share"])
+        )
+        rev_stats = revenue.groupby("doctor_id").agg(revenue=("total_fee", "sum"), clinic_share=("clinic_share", "sum"))
+    else:
+        rev_stats = pd.DataFrame(columns=["revenue", "clinic_share"])
+
+    table = slot_stats.join(appt_stats, how="outer").join(rev_stats, how="outer").fillna(0)
+    names = dict(
+        DoctorProfile.objects.filter(id__in=[int(i) for i in table.index]).values_list("id", "user__full_name")
+    )
+
+    rows = []
+    for doctor_id, r in table.iterrows():
+        total_slots, booked_slots = int(r["total_slots"]), int(r["booked_slots"])
+        appointments = int(r["appointments"])
+        rows.append({
+            "doctor_id": int(doctor_id),
+            "doctor_name": names.get(int(doctor_id)),
+            "total_slots": total_slots,
+            "booked_slots": booked_slots,
+            "free_slots": total_slots - booked_slots,
+            "booked_ratio": _rate(booked_slots, total_slots),
+            "appointments": appointments,
+            "cancellation_rate": _rate(r["cancelled"], appointments),
+            "unpaid_rate": _rate(r["unpaid"], appointments - int(r["cancelled"])),
+            "revenue": round(float(r["revenue"]), 2),
+            "clinic_share": round(float(r["clinic_share"]), 2),
+        })
+    return sorted(rows, key=lambda row: row["booked_ratio"], reverse=True)
+
+
+def compute_clinic_report(clinic_id, start, end):
+    slots, appts, revenue = _load_frames(clinic_id, start, end)
+
+    total_slots = len(slots)
+    booked_slots = int(slots["is_booked"].sum()) if total_slots else 0
+    total_appts = len(appts)
+    cancelled = int(appts["status"].eq("cancelled").sum()) if total_appts else 0
+    unpaid = int((appts["status"].ne("cancelled") & ~appts["paid"].astype(bool)).sum()) if total_appts else 0
+
+    return {
+        "clinic_id": clinic_id,
+        "period": {"from": start.isoformat(), "to": end.isoformat()},
+        "summary": {
+            "total_slots": total_slots,
+            "booked_slots": booked_slots,
+            "free_slots": total_slots - booked_slots,
+            "booked_ratio": _rate(booked_slots, total_slots),
+            "appointments": total_appts,
+            "cancellation_rate": _rate(cancelled, total_appts),
+            "unpaid_rate": _rate(unpaid, total_appts - cancelled),
+            "revenue": round(float(pd.to_numeric(revenue["total_fee"]).sum()), 2) if len(revenue) else 0.0,
+        },
+        "doctors": _per_doctor(slots, appts, revenue),
+        "heatmap": _heatmap(slots),
+        "lead_time": _lead_times(appts),
+    }
+
+
+def clinic_report(clinic_id, start, end, refresh=False):
+    """Cached per (clinic, period); pass refresh=True to recompute."""
+    key = cache_key(clinic_id, start, end)
+    if not refresh:
+        report = cache.get(key)
+        if report is not None:
+            return report
+    report = compute_clinic_report(clinic_id, start, end)
+    cache.set(key, report, ANALYTICS_CACHE_SECONDS)
+    return report
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class MyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapp'
+
+    def ready(self):
+        # registers the cache invalidation / version stamp / slot bitmap / matcher / token revocation receivers
+        from . import authentication, bitmaps, cache, etags, matcher  # noqa: F401
+
+        from django.conf import settings
+
+        if getattr(settings, "EAGER_VIEWS", False):
+            from . import views
+
+            views.load_all()
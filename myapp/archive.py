@@ -0,0 +1,189 @@
+# myapp/archive.py
+"""
+Move unpaid history older than the archive horizon out of the hot tables.
+
+  * Appointments whose visit (or, without a slot, creation) is older than the
+    cutoff are copied into AppointmentArchive and deleted — unless money is
+    attached: paid, or referenced by a Payment, ClinicRevenue or SettlementLine.
+  * Past slots no appointment points at any more: booked ones are compacted
+    into TimeSlotArchive, free ones are simply deleted.
+
+Paid history is never archived, settled or not: Payment and ClinicRevenue
+cascade from Appointment and SettlementLine protects it, so those rows (and
+their slots) stay in the hot tables for good. The hot tables therefore hold
+the active horizon plus every paid visit; moving that out needs archive
+copies of the money tables first.
+
+Each batch is one short transaction over at most `batch_size` rows picked by
+primary key (rows another transaction holds are skipped on PostgreSQL), so
+the job can run during traffic. Deletes bypass model signals: archived rows
+are past the horizon, no cached page or ETag depends on them.
+
+Reports over ranges older than the horizon (clinic analytics) only see what
+stayed in the hot tables — keep ARCHIVE_AFTER_DAYS above the longest range
+anyone reports on.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import (
+    Appointment,
+    AppointmentArchive,
+    ClinicRevenue,
+    Payment,
+    Reminder,
+    SettlementLine,
+    TimeSlot,
+    TimeSlotArchive,
+)
+
+ARCHIVE_AFTER_DAYS = getattr(settings, "ARCHIVE_AFTER_DAYS", 180)
+ARCHIVE_BATCH_SIZE = getattr(settings, "ARCHIVE_BATCH_SIZE", 1000)
+
+_APPT_FIELDS = [
+    "id", "patient_id", "doctor_id", "clinic_id", "timeslot_id", "status",
+    "created_at", "notes", "amount", "paid", "token_no",
+]
+
+
+def archive_cutoff(days=None, now=None):
+    return (now or timezone.now()) - timedelta(days=ARCHIVE_AFTER_DAYS if days is None else days)
+
+
+def _month(dt):
+    return timezone.localtime(dt).date().replace(day=1)
+
+
+def archivable_appointments(cutoff):
+    """Past appointments with no money attached (see the module docstring)."""
+    return Appointment.objects.filter(
+        Q(timeslot__end__lt=cutoff) | Q(timeslot__isnull=True, created_at__lt=cutoff),
+        paid=False,
+    ).exclude(
+        Exists(Payment.objects.filter(appointment=OuterRef("pk")))
+        | Exists(ClinicRevenue.objects.filter(appointment=OuterRef("pk")))
+        | Exists(SettlementLine.objects.filter(appointment=OuterRef("pk")))
+    )
+
+
+def archivable_slots(cutoff):
+    return TimeSlot.objects.filter(end__lt=cutoff).exclude(
+        Exists(Appointment.objects.filter(timeslot=OuterRef("pk")))
+    )
+
+
+def _locked_batch(queryset, batch_size, *fields):
+    return list(
+        queryset.order_by("pk")
+        .select_for_update(skip_locked=True, of=("self",))
+        .values(*fields)[:batch_size]
+    )
+
+
+# =========================================================
+# 🔹 BATCHES
+# =========================================================
+def archive_appointment_batch(cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive up to batch_size appointments; returns how many moved."""
+    with transaction.atomic():
+        rows = _locked_batch(
+            archivable_appointments(cutoff), batch_size, *_APPT_FIELDS, "timeslot__start", "timeslot__end",
+        )
+        if not rows:
+            return 0
+        AppointmentArchive.objects.bulk_create(
+            [
+                AppointmentArchive(
+                    **{f: r[f] for f in _APPT_FIELDS},
+                    slot_start=r["timeslot__start"],
+                    slot_end=r["timeslot__end"],
+                    month=_month(r["timeslot__start"] or r["created_at"]),
+                )
+                for r in rows
+            ],
+            ignore_conflicts=True,  # a retried batch may find some rows already archived
+        )
+        ids = [r["id"] for r in rows]
+        Reminder.objects.filter(appointment_id__in=ids).delete()
+        # raw delete: no per-row post_delete receivers (see module docstring)
+        qs = Appointment.objects.filter(pk__in=ids)
+        qs._raw_delete(qs.db)
+    return len(rows)
+
+
+def archive_slot_batch(cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive booked / drop free past slots, up to batch_size; returns (archived, deleted)."""
+    with transaction.atomic():
+        rows = _locked_batch(archivable_slots(cutoff), batch_size, "id", "doctor_id", "clinic_id", "start", "end", "is_booked")
+        if not rows:
+            return 0, 0
+        booked = [r for r in rows if r["is_booked"]]
+        TimeSlotArchive.objects.bulk_create(
+            [
+                TimeSlotArchive(
+                    id=r["id"], doctor_id=r["doctor_id"], clinic_id=r["clinic_id"],
+                    start=r["start"], end=r["end"], month=_month(r["start"]),
+                )
+                for r in booked
+            ],
+            ignore_conflicts=True,
+        )
+        qs = TimeSlot.objects.filter(pk__in=[r["id"] for r in rows])
+        qs._raw_delete(qs.db)
+    return len(booked), len(rows) - len(booked)
+
+
+# =========================================================
+# 🔹 RUN
+# =========================================================
+def archive_history(cutoff=None, batch_size=ARCHIVE_BATCH_SIZE, max_batches=None, pause=0.0):
+    """
+    Appointments first (so their slots become unreferenced), then slots.
+    Stops when both are drained or after max_batches; sleeps `pause`
+    seconds between batches to leave the database room.
+    """
+    cutoff = cutoff or archive_cutoff()
+    stats = {"appointments": 0, "slots_archived": 0, "slots_deleted": 0, "batches": 0}
+
+    def more():
+        return max_batches is None or stats["batches"] < max_batches
+
+    def step():
+        stats["batches"] += 1
+        if pause:
+            time.sleep(pause)
+
+    while more():
+        moved = archive_appointment_batch(cutoff, batch_size)
+        if not moved:
+            break
+        stats["appointments"] += moved
+        step()
+        if moved < batch_size:
+            break
+
+    while more():
+        archived, deleted = archive_slot_batch(cutoff, batch_size)
+        if not archived + deleted:
+            break
+        stats["slots_archived"] += archived
+        stats["slots_deleted"] += deleted
+        step()
+        if archived + deleted < batch_size:
+            break
+    return stats
+
+
+def pending_counts(cutoff=None):
+    cutoff = cutoff or archive_cutoff()
+    slots = archivable_slots(cutoff)
+    return {
+        "appointments": archivable_appointments(cutoff).count(),
+        "slots_booked": slots.filter(is_booked=True).count(),
+        "slots_free": slots.filter(is_booked=False).count(),
+    }
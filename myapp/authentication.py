@@ -0,0 +1,203 @@
+# myapp/authentication.py
+"""
+JWTs that carry who the user is, so reads don't need the users table.
+
+Tokens issued by verify_otp / password_login / the token endpoints carry:
+    role, email, full_name, is_staff, is_superuser,
+    doctor_profile_id, patient_profile_id, clinic_ids, ver
+
+ClaimsJWTAuthentication rebuilds an unsaved User from those claims for safe
+(GET/HEAD/OPTIONS) requests; writes still load the row from the DB.
+
+Freshness:
+  * access tokens are short-lived (SIMPLE_JWT ACCESS_TOKEN_LIFETIME), and a
+    refresh re-reads the user, so claims are rebuilt at least that often;
+  * `ver` must equal User.token_version (served from the shared cache).
+    Bumping it revokes every access token at once. This happens on role /
+    active / staff / superuser / password changes and when the owner's clinic set changes.
+"""
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Clinic, DoctorProfile, PatientProfile, User
+
+TOKEN_VERSION_CACHE_SECONDS = 60 * 60
+
+
+def _version_key(user_id):
+    return f"tokver:{user_id}"
+
+
+def current_token_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # primary: a lagging replica would cache a pre-revocation version
+        version = User.objects.using("default").filter(pk=user_id).values_list("token_version", flat=True).first()
+        if version is None:
+            return None
+        cache.set(key, version, TOKEN_VERSION_CACHE_SECONDS)
+    return version
+
+
+def revoke_tokens(user_ids):
+    """Invalidate every access token already issued to these users."""
+    user_ids = list(user_ids)
+    User.objects.filter(pk__in=user_ids).update(token_version=F("token_version") + 1)
+    cache.delete_many([_version_key(pk) for pk in user_ids])
+
+
+# =========================================================
+# 🔹 ISSUING
+# =========================================================
+def add_user_claims(token, user):
+    token["role"] = user.role
+    token["email"] = user.email
+    token["full_name"] = user.full_name
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token["doctor_profile_id"] = DoctorProfile.objects.filter(user=user).values_list("id", flat=True).first()
+    token["patient_profile_id"] = PatientProfile.objects.filter(user=user).values_list("id", flat=True).first()
+    token["clinic_ids"] = (
+        list(Clinic.objects.filter(owner=user).order_by("id").values_list("id", flat=True))
+        if user.role == User.ROLE_CLINIC_OWNER else []
+    )
+    token["ver"] = current_token_version(user.pk)  # not the instance: a revoke may have just run
+    return token
+
+
+def tokens_for(user):
+    """(access, refresh) strings with the identity claims baked in."""
+    refresh = add_user_claims(RefreshToken.for_user(user), user)
+    return str(refresh.access_token), str(refresh)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh re-reads the user, so the new access token carries current claims."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        add_user_claims(refresh, user)
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:  # blacklist app not installed
+                    pass
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+        return data
+
+
+# =========================================================
+# 🔹 AUTHENTICATION
+# =========================================================
+def user_from_claims(token):
+    """Unsaved User carrying the claims; pk-based queries (filter(user=...)) work as usual."""
+    user = User(
+        id=User._meta.pk.to_python(token[api_settings.USER_ID_CLAIM]),  # simplejwt writes the claim as a string
+        email=token["email"],
+        full_name=token.get("full_name", ""),
+        role=token["role"],
+        is_staff=token.get("is_staff", False),
+        is_superuser=token.get("is_superuser", False),
+        is_active=True,
+        token_version=token.get("ver", 0),
+    )
+    user._state.adding = False
+    user._state.db = "default"
+    user.doctor_profile_id = token.get("doctor_profile_id")
+    user.patient_profile_id = token.get("patient_profile_id")
+    user.clinic_ids = token.get("clinic_ids", [])
+    user.from_claims = True
+    user.save = _read_only_save
+    return user
+
+
+def _read_only_save(*args, **kwargs):
+    raise RuntimeError("This user was built from token claims; load it from the DB to modify it.")
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Safe methods: user rebuilt from claims (one cache read for the revocation
+    check, no DB). Unsafe methods and tokens without claims: regular DB lookup.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        token = self.get_validated_token(raw_token)
+        if "role" not in token or "ver" not in token:
+            return self.get_user(token), token  # issued before claims existed
+
+        user_id = token[api_settings.USER_ID_CLAIM]
+        if token["ver"] != current_token_version(user_id):
+            raise AuthenticationFailed("Token has been revoked.", code="token_revoked")
+
+        if request.method in SAFE_METHODS:
+            return user_from_claims(token), token
+        return self.get_user(token), token
+
+
+# =========================================================
+# 🔹 REVOCATION TRIGGERS
+# =========================================================
+# changing any of these revokes issued tokens (role / staff flags are also claims)
+_REVOKING_FIELDS = ("role", "is_active", "is_staff", "is_superuser", "password")
+
+
+def _user_pre_save(sender, instance, **kwargs):
+    if instance._state.adding or getattr(instance, "from_claims", False):
+        return
+    old = User.objects.filter(pk=instance.pk).values_list(*_REVOKING_FIELDS).first()
+    if old and old != tuple(getattr(instance, field) for field in _REVOKING_FIELDS):
+        instance.token_version = (instance.token_version or 0) + 1
+        instance._token_version_changed = True
+
+
+def _user_post_save(sender, instance, update_fields=None, **kwargs):
+    if getattr(instance, "_token_version_changed", False):
+        if update_fields is not None and "token_version" not in update_fields:
+            # save(update_fields=["is_staff"]) didn't write the bump
+            User.objects.filter(pk=instance.pk).update(token_version=instance.token_version)
+        cache.delete(_version_key(instance.pk))
+        instance._token_version_changed = False
+
+
+def _clinic_set_changed(sender, instance, created=True, **kwargs):
+    if created:
+        revoke_tokens([instance.owner_id])
+
+
+pre_save.connect(_user_pre_save, sender=User, dispatch_uid="auth-user-pre-save")
+post_save.connect(_user_post_save, sender=User, dispatch_uid="auth-user-post-save")
+post_save.connect(_clinic_set_changed, sender=Clinic, dispatch_uid="auth-clinic-save")
+post_delete.connect(_clinic_set_changed, sender=Clinic, dispatch_uid="auth-clinic-delete")
@@ -0,0 +1,258 @@
+# myapp/bitmaps.py
+"""
+Per-(doctor, clinic, local date) free/busy bitmaps over TimeSlot.
+
+A day is 288 cells of CELL_MINUTES. Each DoctorDayBitmap row holds two
+288-bit masks packed into 36 bytes:
+
+  * free — cells where an unbooked slot starts (plus free_count, the number
+    of unbooked slots). Reads AND it with the cells still ahead of now, so
+    today's counts and dates drop slots that have already started, as the
+    virtual slot engine does; later days just use free_count;
+  * busy — cells covered by booked slots, so "is the doctor free from A to B"
+    is one OR across the day's clinics and an AND with the query mask.
+
+Slots that don't sit on the 5-minute grid are widened to whole cells, so busy
+checks err towards "taken". A slot counts as free on the local date it starts
+on; a booked one running past midnight also marks the next day's busy cells.
+
+The TimeSlot receivers below refresh the touched day from its rows inside the
+writing transaction, so the index is as current as the rows it was built
+from. Queryset .update() / bulk writes skip them — call touch() for the days
+they change; inside batched() every touched day is refreshed once at the end. `manage.py rebuild_slot_bitmaps` rebuilds any range from
+TimeSlot.
+"""
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import DoctorDayBitmap, TimeSlot
+
+CELL_MINUTES = 5
+CELLS = 24 * 60 // CELL_MINUTES
+_BYTES = CELLS // 8
+
+_state = threading.local()
+
+
+def to_int(value):
+    return int.from_bytes(bytes(value or b""), "big")
+
+
+def to_bytes(mask):
+    return mask.to_bytes(_BYTES, "big")
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def cell_range(start, end, day):
+    """[first, last) cells of `day` covered by start..end, widened to whole cells."""
+    origin = _day_start(day)
+    cell = timedelta(minutes=CELL_MINUTES)
+    first = max(0, (start - origin) // cell)
+    last = min(CELLS, -(-(end - origin) // cell))
+    return first, max(first, last)
+
+
+def span_mask(first, last):
+    return ((1 << (last - first)) - 1) << first if last > first else 0
+
+
+def local_date(dt):
+    # a naive datetime on an unsaved-then-saved instance is local time (USE_TZ reads it that way)
+    return dt.date() if timezone.is_naive(dt) else timezone.localtime(dt).date()
+
+
+def days_of(start, end):
+    """Local dates start..end touches (end exclusive)."""
+    day, last = local_date(start), local_date(max(start, end - timedelta(microseconds=1)))
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+# =========================================================
+# 🔹 BUILD / REFRESH
+# =========================================================
+def build(day, rows):
+    """(free, busy, free_count) of one day from (start, end, is_booked) rows overlapping it."""
+    origin = _day_start(day)
+    free = busy = free_count = 0
+    for start, end, is_booked in rows:
+        first, last = cell_range(start, end, day)
+        if is_booked:
+            busy |= span_mask(first, last)
+        elif start >= origin and first < CELLS:  # yesterday's spill-over isn't a free start today
+            free |= 1 << first
+            free_count += 1
+    return free, busy, free_count
+
+
+@transaction.atomic
+def refresh(doctor_id, clinic_id, day):
+    """
+    Recompute one bitmap from its TimeSlot rows. The bitmap row is locked
+    before the rows are read, so two transactions refreshing the same day take
+    turns and the later one builds from what the earlier one committed.
+    """
+    key = {"doctor_id": doctor_id, "clinic_id": clinic_id, "date": day}
+    DoctorDayBitmap.objects.get_or_create(**key, defaults={"free": to_bytes(0), "busy": to_bytes(0)})
+    bitmap = DoctorDayBitmap.objects.select_for_update().get(**key)
+
+    day_start = _day_start(day)
+    rows = TimeSlot.objects.filter(
+        doctor_id=doctor_id, clinic_id=clinic_id, start__lt=day_start + timedelta(days=1), end__gt=day_start,
+    ).values_list("start", "end", "is_booked")
+    free, busy, bitmap.free_count = build(day, rows)
+    if not (bitmap.free_count or busy):
+        bitmap.delete()
+        return
+    bitmap.free, bitmap.busy = to_bytes(free), to_bytes(busy)
+    bitmap.save(update_fields=["free", "busy", "free_count", "updated_at"])
+
+
+@contextmanager
+def batched():
+    """Refresh each touched day once, when the block ends, instead of per slot write."""
+    if getattr(_state, "pending", None) is not None:  # nested: the outer block flushes
+        yield
+        return
+    _state.pending = set()
+    try:
+        yield
+        pending = _state.pending
+    finally:
+        _state.pending = None
+    for key in sorted(pending):
+        refresh(*key)
+
+
+def touch(doctor_id, clinic_id, day):
+    """Refresh a day now, or when the enclosing batched() block ends."""
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending.add((doctor_id, clinic_id, day))
+    else:
+        refresh(doctor_id, clinic_id, day)
+
+
+def _slot_changed(sender, instance, **kwargs):
+    for day in days_of(instance.start, instance.end):
+        touch(instance.doctor_id, instance.clinic_id, day)
+
+
+post_save.connect(_slot_changed, sender=TimeSlot, dispatch_uid="bitmap-save-TimeSlot")
+post_delete.connect(_slot_changed, sender=TimeSlot, dispatch_uid="bitmap-delete-TimeSlot")
+
+
+def rebuild(doctor_id=None, first_day=None, last_day=None, batch_size=1000):
+    """
+    Rebuild every bitmap in the range from TimeSlot (all days when no range
+    is given). Returns (days written, days dropped).
+    """
+    slots = TimeSlot.objects.all()
+    bitmaps = DoctorDayBitmap.objects.all()
+    if doctor_id is not None:
+        slots, bitmaps = slots.filter(doctor_id=doctor_id), bitmaps.filter(doctor_id=doctor_id)
+    if first_day is not None:
+        slots, bitmaps = slots.filter(end__gt=_day_start(first_day)), bitmaps.filter(date__gte=first_day)
+    if last_day is not None:
+        slots = slots.filter(start__lt=_day_start(last_day + timedelta(days=1)))
+        bitmaps = bitmaps.filter(date__lte=last_day)
+
+    days = {}
+    for doctor, clinic, start, end, is_booked in slots.values_list(
+        "doctor_id", "clinic_id", "start", "end", "is_booked",
+    ).iterator(chunk_size=batch_size):
+        for day in days_of(start, end):  # a slot past midnight can reach outside the range
+            if (first_day is None or day >= first_day) and (last_day is None or day <= last_day):
+                days.setdefault((doctor, clinic, day), []).append((start, end, is_booked))
+
+    with transaction.atomic():
+        existing = set(bitmaps.values_list("doctor_id", "clinic_id", "date"))
+        bitmaps.delete()
+        rows = []
+        for (doctor, clinic, day), spans in days.items():
+            free, busy, free_count = build(day, spans)
+            if not (free_count or busy):
+                continue
+            rows.append(DoctorDayBitmap(
+                doctor_id=doctor, clinic_id=clinic, date=day,
+                free=to_bytes(free), busy=to_bytes(busy), free_count=free_count,
+            ))
+        DoctorDayBitmap.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows), len(existing - {(r.doctor_id, r.clinic_id, r.date) for r in rows})
+
+
+# =========================================================
+# 🔹 READS
+# =========================================================
+def upcoming_mask(day, now):
+    """Cells of `day` starting at or after `now`: all of a later day, none of an earlier one."""
+    first = -(-(now - _day_start(day)) // timedelta(minutes=CELL_MINUTES))
+    return span_mask(min(max(first, 0), CELLS), CELLS)
+
+
+def free_ahead(day, free, free_count, now):
+    """Unbooked slots of one bitmap row that haven't started by `now`."""
+    mask = to_int(free)
+    ahead = mask & upcoming_mask(day, now)
+    # one bit per start cell: exact count only while nothing has been masked off
+    return free_count if ahead == mask else ahead.bit_count()
+
+
+def free_counts(doctor_ids, day, clinic_ids=None, now=None):
+    """{doctor_id: unbooked slots on day, from now on} — clinic_ids: {doctor_id: allowed clinic ids}."""
+    now = now or timezone.now()
+    rows = DoctorDayBitmap.objects.filter(doctor_id__in=doctor_ids, date=day, free_count__gt=0)
+    counts = {}
+    for doctor_id, clinic_id, free, n in rows.values_list("doctor_id", "clinic_id", "free", "free_count"):
+        if clinic_ids is None or clinic_id in clinic_ids.get(doctor_id, ()):
+            n = free_ahead(day, free, n, now)
+            if n:
+                counts[doctor_id] = counts.get(doctor_id, 0) + n
+    return counts
+
+
+def free_count(doctor_id, day, clinic_ids=None, now=None):
+    now = now or timezone.now()
+    rows = DoctorDayBitmap.objects.filter(doctor_id=doctor_id, date=day, free_count__gt=0)
+    if clinic_ids is not None:
+        rows = rows.filter(clinic_id__in=clinic_ids)
+    return sum(free_ahead(day, free, n, now) for free, n in rows.values_list("free", "free_count"))
+
+
+def has_free(doctor_id, day, now=None):
+    return free_count(doctor_id, day, now=now) > 0
+
+
+def dates_with_free(doctor_id, first_day, now=None):
+    """Local dates from first_day on with an unbooked slot that hasn't started yet."""
+    now = now or timezone.now()
+    rows = (
+        DoctorDayBitmap.objects.filter(doctor_id=doctor_id, date__gte=first_day, free_count__gt=0)
+        .order_by("date").values_list("date", "free", "free_count")
+    )
+    dates = []
+    for day, free, n in rows:
+        if (not dates or dates[-1] != day) and free_ahead(day, free, n, now):
+            dates.append(day)
+    return dates
+
+
+def is_free(doctor_id, start, end):
+    """True when no booked slot of the doctor, at any clinic, overlaps start..end."""
+    for day in days_of(start, end):
+        first, last = cell_range(start, end, day)
+        busy = 0
+        for mask in DoctorDayBitmap.objects.filter(doctor_id=doctor_id, date=day).values_list("busy", flat=True):
+            busy |= to_int(mask)
+        if busy & span_mask(first, last):
+            return False
+    return True
@@ -0,0 +1,233 @@
+# myapp/cache.py
+"""
+Response cache for the public read endpoints.
+
+Keys embed per-namespace version counters that live in the shared cache
+backend (Redis in production). A write anywhere bumps the relevant counter
+through the post_save / post_delete receivers below, and because every
+gunicorn worker reads the same counters, the bump is the cross-worker
+invalidation: old entries simply stop being addressed and expire by TTL.
+Misses are rebuilt from the primary, so a replica that has not yet seen
+the write behind a bump cannot refill the new version with old rows.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+
+from .db_router import read_from
+from .models import (
+    Clinic,
+    ClinicDoctorRequest,
+    DoctorAvailability,
+    DoctorFeeManagement,
+    DoctorProfile,
+    HomeImage,
+    Specialization,
+    Symptom,
+    TimeSlot,
+)
+
+PUBLIC_CACHE_SECONDS = getattr(settings, "PUBLIC_CACHE_SECONDS", 5 * 60)
+SLOT_CACHE_SECONDS = getattr(settings, "SLOT_CACHE_SECONDS", 5)
+
+# namespaces
+SPECIALIZATIONS = "specializations"
+SYMPTOMS = "symptoms"
+HOME_IMAGES = "home_images"
+DOCTOR_LIST = "doctor_list"
+DOCTOR_SHARED = "doctor_shared"   # data shown on every doctor page (clinic / specialization names)
+CLINIC_SHARED = "clinic_shared"   # data shown on every clinic page (doctor profiles)
+
+
+def doctor_ns(doctor_id):
+    return f"doctor:{doctor_id}"
+
+
+def clinic_ns(clinic_id):
+    return f"clinic:{clinic_id}"
+
+
+def slots_ns(doctor_id):
+    return f"slots:{doctor_id}"
+
+
+def _version_key(namespace):
+    return f"ns:{namespace}"
+
+
+def get_versions(*namespaces):
+    """Current version of each namespace, in one cache round trip."""
+    keys = [_version_key(ns) for ns in namespaces]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            # seeded from the clock so a flushed/evicted counter never reuses an old version
+            cache.add(key, time.time_ns(), None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def bump(*namespaces):
+    for ns in namespaces:
+        key = _version_key(ns)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def response_cache_key(request, namespaces):
+    versions = get_versions(*namespaces)
+    # absolute URI: serializers embed host-specific image URLs
+    raw = request.build_absolute_uri() + "|" + "|".join(f"{ns}={v}" for ns, v in zip(namespaces, versions))
+    return "resp:" + hashlib.md5(raw.encode()).hexdigest()
+
+
+class CachedResponseMixin:
+    """
+    Cache successful GET responses of a DRF view under versioned keys.
+    Views list the namespaces they depend on in cache_namespaces
+    (or override get_cache_namespaces for per-object namespaces).
+    """
+    cache_namespaces = ()
+    cache_timeout = PUBLIC_CACHE_SECONDS
+
+    def get_cache_namespaces(self):
+        return self.cache_namespaces
+
+    def get(self, request, *args, **kwargs):
+        key = response_cache_key(request, self.get_cache_namespaces())
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        with read_from(None):  # never cache what a lagging replica returned
+            response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
+
+
+# =========================================================
+# 🔹 MICRO-CACHE + SINGLE-FLIGHT (hot slot endpoints)
+# =========================================================
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Concurrent callers asking for the same key in this process share one
+    execution of fn: the first caller runs it, the rest wait for its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+
+_micro_flight = SingleFlight()
+
+
+def micro_cached(namespace, key_suffix, builder, timeout=SLOT_CACHE_SECONDS):
+    """
+    Short-TTL cache for very hot reads. The key carries the namespace
+    version, so a bump (booking, cancellation, slot edit) retires the entry
+    immediately; concurrent misses in one worker coalesce into one build.
+    """
+    (version,) = get_versions(namespace)
+    key = f"micro:{namespace}:{version}:{key_suffix}"
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    def load():
+        # a previous leader (or another worker) may have filled it meanwhile
+        fresh = cache.get(key)
+        if fresh is None:
+            with read_from(None):
+                fresh = builder()
+            cache.set(key, fresh, timeout)
+        return fresh
+
+    return _micro_flight.do(key, load)
+
+
+# =========================================================
+# 🔹 SIGNAL-DRIVEN INVALIDATION
+# =========================================================
+def _namespaces_for(instance):
+    if isinstance(instance, DoctorProfile):
+        return [doctor_ns(instance.pk), DOCTOR_LIST, CLINIC_SHARED]
+    if isinstance(instance, Clinic):
+        return [clinic_ns(instance.pk), DOCTOR_SHARED]
+    if isinstance(instance, ClinicDoctorRequest):
+        return [doctor_ns(instance.doctor_id), clinic_ns(instance.clinic_id), DOCTOR_LIST]
+    if isinstance(instance, DoctorFeeManagement):
+        return [doctor_ns(instance.doctor_id), DOCTOR_LIST]
+    if isinstance(instance, DoctorAvailability):
+        # windows are the slot source in SLOT_MODE=virtual
+        return [doctor_ns(instance.doctor_id), slots_ns(instance.doctor_id), DOCTOR_LIST]
+    if isinstance(instance, TimeSlot):
+        return [slots_ns(instance.doctor_id), DOCTOR_LIST]
+    if isinstance(instance, Specialization):
+        return [SPECIALIZATIONS, DOCTOR_SHARED, CLINIC_SHARED]
+    if isinstance(instance, Symptom):
+        return [SYMPTOMS]
+    if isinstance(instance, HomeImage):
+        return [HOME_IMAGES]
+    return []
+
+
+def invalidate(*namespaces):
+    bump(*namespaces)
+    # bump again once committed, so a read racing the open transaction can't pin stale data
+    transaction.on_commit(lambda: bump(*namespaces))
+
+
+def invalidate_for_instance(sender, instance, **kwargs):
+    invalidate(*_namespaces_for(instance))
+
+
+for _model in (
+    DoctorProfile, Clinic, ClinicDoctorRequest, DoctorFeeManagement,
+    DoctorAvailability, TimeSlot, Specialization, Symptom, HomeImage,
+):
+    post_save.connect(invalidate_for_instance, sender=_model, dispatch_uid=f"cache-save-{_model.__name__}")
+    post_delete.connect(invalidate_for_instance, sender=_model, dispatch_uid=f"cache-delete-{_model.__name__}")
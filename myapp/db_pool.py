@@ -0,0 +1,59 @@
+# myapp/db_pool.py
+"""
+Connection pool metrics.
+
+Pooling itself is configured in settings (DB_POOL / DB_POOL_*): Django 5.1
+builds one psycopg_pool.ConnectionPool per alias per worker process. Pools
+are per process, so these numbers describe the worker that answers.
+
+psycopg_pool counters are cumulative since the pool opened:
+  requests_num       connections handed out
+  requests_queued    checkouts that had to wait for a free connection
+  requests_wait_ms   total time spent waiting
+  requests_errors    checkouts that timed out
+  returns_bad        connections discarded on return (broken / mid-transaction)
+"""
+from django.db import connections
+
+
+def _ratio(part, whole, digits=3):
+    return round(part / whole, digits) if whole else 0.0
+
+
+def alias_stats(alias):
+    wrapper = connections[alias]
+    pool = getattr(wrapper, "pool", None)  # only the postgresql backend has one
+    if pool is None:
+        return {"pooled": False, "vendor": wrapper.vendor}
+
+    raw = pool.get_stats()
+    size = raw.get("pool_size", 0)
+    in_use = size - raw.get("pool_available", 0)
+    requests = raw.get("requests_num", 0)
+    queued = raw.get("requests_queued", 0)
+    wait_ms = raw.get("requests_wait_ms", 0)
+    return {
+        "pooled": True,
+        "vendor": wrapper.vendor,
+        "min_size": raw.get("pool_min"),
+        "max_size": raw.get("pool_max"),
+        "size": size,
+        "in_use": in_use,
+        "available": raw.get("pool_available", 0),
+        "utilization": _ratio(in_use, raw.get("pool_max", 0)),
+        "waiting_now": raw.get("requests_waiting", 0),
+        "checkouts": requests,
+        "checkouts_queued": queued,
+        "queued_ratio": _ratio(queued, requests),
+        "wait_avg_ms": _ratio(wait_ms, requests, 2),
+        "wait_avg_queued_ms": _ratio(wait_ms, queued, 2),
+        "timeouts": raw.get("requests_errors", 0),
+        "connections_opened": raw.get("connections_num", 0),
+        "connect_avg_ms": _ratio(raw.get("connections_ms", 0), raw.get("connections_num", 0), 2),
+        "connections_lost": raw.get("connections_lost", 0),
+        "bad_returns": raw.get("returns_bad", 0),
+    }
+
+
+def pool_stats():
+    return {alias: alias_stats(alias) for alias in connections}
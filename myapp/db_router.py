@@ -0,0 +1,136 @@
+# myapp/db_router.py
+"""
+Primary / read-replica routing.
+
+settings.DATABASE_REPLICAS lists the replica aliases (built from
+DATABASE_REPLICA_URLS). With none configured everything stays on "default".
+
+  * ReplicaRoutingMiddleware picks the read database once per request:
+    a replica for safe methods (GET/HEAD/OPTIONS), the primary otherwise.
+  * After a successful write (booking, payment, profile edit, ...) the caller is
+    pinned to the primary for READ_YOUR_WRITES_SECONDS, keyed by user id, or
+    by client IP for anonymous writes such as OTP login. The marker lives in
+    the shared cache, so it holds across workers.
+  * Reads that fill the shared response cache go to the primary (see
+    myapp.cache): a lagging replica would otherwise store pre-write data
+    under the freshly bumped namespace version.
+  * PrimaryReplicaRouter sends every write to the primary, and every read to
+    the primary while a transaction is open on it.
+
+Local two-database setup: point DATABASE_REPLICA_URLS at a second database
+and run `manage.py migrate --database replica1` once. Tests mirror replicas
+onto the test "default" database (TEST MIRROR).
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .throttling import client_ip
+
+READ_YOUR_WRITES_SECONDS = getattr(settings, "READ_YOUR_WRITES_SECONDS", 15)
+
+_read_alias = contextvars.ContextVar("db_read_alias", default=None)
+
+
+def replicas():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+@contextmanager
+def read_from(alias):
+    """Route reads in this block to `alias` (None → primary)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+# =========================================================
+# 🔹 READ-YOUR-WRITES MARKERS
+# =========================================================
+def _pin_key(ident):
+    return f"dbpin:{ident}"
+
+
+def pin_to_primary(*idents, seconds=None):
+    seconds = READ_YOUR_WRITES_SECONDS if seconds is None else seconds
+    cache.set_many({_pin_key(i): 1 for i in idents if i}, seconds)
+
+
+def is_pinned(*idents):
+    keys = [_pin_key(i) for i in idents if i]
+    return bool(keys) and bool(cache.get_many(keys))
+
+
+def _token_user_id(request):
+    """User id from the bearer token, unverified: it only picks a database, authentication comes later."""
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    parts = header.split()
+    if len(parts) != 2 or parts[0] not in api_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        return AccessToken(parts[1], verify=False).get(api_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+
+# =========================================================
+# 🔹 MIDDLEWARE
+# =========================================================
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pool = replicas()
+        if not pool:
+            return self.get_response(request)
+
+        ip = client_ip(request)
+        alias = None
+        if request.method in SAFE_METHODS:
+            user_id = _token_user_id(request)
+            if not is_pinned(f"u{user_id}" if user_id else None, f"ip{ip}"):
+                alias = random.choice(pool)
+
+        with read_from(alias):
+            response = self.get_response(request)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user = getattr(request, "user", None)  # DRF copies the authenticated user here
+            if user is not None and user.is_authenticated:
+                pin_to_primary(f"u{user.pk}")
+            else:
+                # only anonymous writes (OTP login) pin the address: a shared
+                # NAT would otherwise send every neighbour to the primary
+                pin_to_primary(f"ip{ip}")
+        return response
+
+
+# =========================================================
+# 🔹 ROUTER
+# =========================================================
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections["default"].in_atomic_block:
+            return "default"
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {"default", *replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
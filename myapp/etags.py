@@ -0,0 +1,185 @@
+# myapp/etags.py
+"""
+Conditional GET for the screens mobile clients re-fetch on every focus.
+
+Each resource gets a cheap content version built from the version /
+updated_at stamps maintained on write, so an If-None-Match hit is answered
+with a 304 after one small query and without running any serializer.
+Writes to related rows (clinic links, fees, availability, bookings) move
+the owning stamp with a single queryset update from the receivers below;
+touch_doctors / touch_clinics also bump the response-cache namespaces, which
+queryset updates don't reach through signals.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import cache as public_cache
+from .models import (
+    Appointment,
+    Clinic,
+    ClinicDoctorRequest,
+    DoctorAvailability,
+    DoctorFeeManagement,
+    DoctorProfile,
+    Specialization,
+    TimeSlot,
+    User,
+)
+
+
+def _etag(*parts):
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def _stamp(value):
+    return value.isoformat() if value else None
+
+
+# =========================================================
+# 🔹 RESOURCE VERSIONS
+# =========================================================
+def doctor_etag(request, pk):
+    row = DoctorProfile.objects.filter(pk=pk).values_list("version", "updated_at").first()
+    if row is None:
+        return None
+    return _etag("doctor", pk, row[0], _stamp(row[1]))
+
+
+def clinic_etag(request, pk):
+    row = (
+        Clinic.objects.filter(pk=pk)
+        .annotate(
+            links=Count("doctor_requests"),
+            links_at=Max("doctor_requests__updated_at"),
+            doctors_at=Max(
+                "doctor_requests__doctor__updated_at", filter=Q(doctor_requests__status="approved")
+            ),
+        )
+        .values_list("updated_at", "links", "links_at", "doctors_at")
+        .first()
+    )
+    if row is None:
+        return None
+    return _etag("clinic", pk, *(_stamp(v) if hasattr(v, "isoformat") else v for v in row))
+
+
+def schedule_etag(request, doctor_id):
+    row = Appointment.objects.filter(doctor_id=doctor_id, status__in=["pending", "confirmed"]).aggregate(
+        n=Count("id"),
+        last_id=Max("id"),
+        slots_version=Sum("timeslot__version"),
+        slots_at=Max("timeslot__updated_at"),
+        clinics_at=Max("clinic__updated_at"),
+    )
+    # patient age is computed against today, so the version rolls over daily
+    return _etag(
+        "schedule", doctor_id, timezone.localdate(), row["n"], row["last_id"],
+        row["slots_version"], _stamp(row["slots_at"]), _stamp(row["clinics_at"]),
+    )
+
+
+def specializations_etag(request):
+    (version,) = public_cache.get_versions(public_cache.SPECIALIZATIONS)
+    # icon URLs are absolute, so the host is part of the representation
+    return _etag("specializations", version, request.get_host())
+
+
+def conditional_get(etag_func, cache_control="no-cache"):
+    """
+    Wrap a view's get(): compute the ETag first and return 304 when the client
+    already holds it. etag_func(view, request, *args, **kwargs) may return None
+    (e.g. unknown object) to fall through to the normal response.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            etag = etag_func(view, request, *args, **kwargs)
+            if etag is not None:
+                client_etags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+                if etag in client_etags or "*" in client_etags:
+                    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                    response["ETag"] = etag
+                    response["Cache-Control"] = cache_control
+                    return response
+
+            response = method(view, request, *args, **kwargs)
+            if etag is not None and response.status_code == 200:
+                response["ETag"] = etag
+                response["Cache-Control"] = cache_control
+            return response
+        return wrapper
+    return decorator
+
+
+# =========================================================
+# 🔹 STAMP MAINTENANCE (related writes)
+# =========================================================
+def touch_doctors(**filters):
+    # queryset update: no post_save, so no cascade back into these receivers —
+    # and none into the response cache either, so its namespaces move here
+    doctors = DoctorProfile.objects.filter(**filters)
+    ids = list(doctors.values_list("pk", flat=True).distinct())
+    if not ids:
+        return
+    DoctorProfile.objects.filter(pk__in=ids).update(version=F("version") + 1, updated_at=timezone.now())
+    public_cache.invalidate(
+        *(public_cache.doctor_ns(pk) for pk in ids), public_cache.DOCTOR_LIST, public_cache.CLINIC_SHARED,
+    )
+
+
+def touch_clinics(**filters):
+    ids = list(Clinic.objects.filter(**filters).values_list("pk", flat=True))
+    if not ids:
+        return
+    Clinic.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+    public_cache.invalidate(*(public_cache.clinic_ns(pk) for pk in ids), public_cache.DOCTOR_SHARED)
+
+
+def touch_timeslot(timeslot_id):
+    if timeslot_id:
+        TimeSlot.objects.filter(pk=timeslot_id).update(version=F("version") + 1, updated_at=timezone.now())
+
+
+def _doctor_related_changed(sender, instance, **kwargs):
+    touch_doctors(pk=instance.doctor_id)
+
+
+def _clinic_changed(sender, instance, **kwargs):
+    touch_doctors(clinic_requests__clinic_id=instance.pk, clinic_requests__status="approved")
+
+
+def _specialization_changed(sender, instance, **kwargs):
+    touch_doctors(specialization_id=instance.pk)
+
+
+def _user_changed(sender, instance, **kwargs):
+    # names / emails are shown on doctor and clinic pages
+    if instance.role == User.ROLE_DOCTOR:
+        touch_doctors(user_id=instance.pk)
+    elif instance.role == User.ROLE_CLINIC_OWNER:
+        touch_clinics(owner_id=instance.pk)
+
+
+def _appointment_changed(sender, instance, **kwargs):
+    touch_timeslot(instance.timeslot_id)
+
+
+for _model in (ClinicDoctorRequest, DoctorAvailability, DoctorFeeManagement):
+    post_save.connect(_doctor_related_changed, sender=_model, dispatch_uid=f"etag-save-{_model.__name__}")
+    post_delete.connect(_doctor_related_changed, sender=_model, dispatch_uid=f"etag-delete-{_model.__name__}")
+
+post_save.connect(_clinic_changed, sender=Clinic, dispatch_uid="etag-save-Clinic")
+post_save.connect(_specialization_changed, sender=Specialization, dispatch_uid="etag-save-Specialization")
+# before the delete, while doctors still point at it (the FK is SET_NULL)
+pre_delete.connect(_specialization_changed, sender=Specialization, dispatch_uid="etag-delete-Specialization")
+post_save.connect(_user_changed, sender=User, dispatch_uid="etag-save-User")
+post_save.connect(_appointment_changed, sender=Appointment, dispatch_uid="etag-save-Appointment")
+post_delete.connect(_appointment_changed, sender=Appointment, dispatch_uid="etag-delete-Appointment")
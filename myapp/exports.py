@@ -0,0 +1,70 @@
+# myapp/exports.py
+import csv
+import json
+from datetime import datetime
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """File-like object whose write() just hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def parse_date_range(request):
+    """
+    Read ?from=YYYY-MM-DD&to=YYYY-MM-DD (both optional, inclusive).
+    Raises ValueError on a malformed date.
+    """
+    start = request.query_params.get("from")
+    end = request.query_params.get("to")
+    start = datetime.strptime(start, "%Y-%m-%d").date() if start else None
+    end = datetime.strptime(end, "%Y-%m-%d").date() if end else None
+    return start, end
+
+
+def _stringify(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat()
+    return str(value)
+
+
+def _csv_rows(header, rows):
+    writer = csv.writer(_Echo())
+    # header goes out before the query even runs
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_stringify(v) for v in row])
+
+
+def _ndjson_rows(header, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), default=_stringify) + "\n"
+
+
+def streaming_export(header, rows, output, filename):
+    """
+    Wrap an iterable of row tuples (ideally a values_list().iterator()) in a
+    StreamingHttpResponse so memory stays flat no matter how many rows there are.
+    """
+    if output == "ndjson":
+        body = _ndjson_rows(header, rows)
+    else:
+        output = "csv"
+        body = _csv_rows(header, rows)
+
+    response = StreamingHttpResponse(body, content_type=EXPORT_CONTENT_TYPES[output])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{output}"'
+    return response
@@ -0,0 +1,374 @@
+# myapp/llm.py
+"""
+LLM access for symptom analysis and the homepage chatbot.
+
+Symptom descriptions repeat a lot ("fever and cough", "cough, fever"), so the
+parsed analysis (conditions / specialist / advice) is cached per normalized
+symptom text in a per-process LRU with a TTL. Doctor matching is not part of
+the cached value and always runs against the live DB.
+
+The OpenAI clients are created lazily, once per process, over a pooled httpx
+client. Sync calls are capped by a semaphore, identical in-flight prompts are
+coalesced, and a slow provider surfaces as LLMUnavailable so views can fall back.
+
+LLM_BACKEND=fake swaps OpenAI for a deterministic local model (offline dev/tests);
+a dotted path to a factory(kind) plugs in any other client.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .cache import SingleFlight
+
+LLM_MODEL = getattr(settings, "LLM_MODEL", "gpt-4o-mini")
+LLM_CACHE_MAX_ENTRIES = getattr(settings, "LLM_CACHE_MAX_ENTRIES", 1024)
+LLM_CACHE_TTL_SECONDS = getattr(settings, "LLM_CACHE_TTL_SECONDS", 6 * 60 * 60)
+LLM_MAX_CONCURRENT = getattr(settings, "LLM_MAX_CONCURRENT", 8)          # provider calls in flight per process
+LLM_QUEUE_SECONDS = getattr(settings, "LLM_QUEUE_SECONDS", 2)            # wait for a free slot before giving up
+LLM_TIMEOUT_SECONDS = getattr(settings, "LLM_TIMEOUT_SECONDS", 15)
+LLM_CONNECT_TIMEOUT_SECONDS = getattr(settings, "LLM_CONNECT_TIMEOUT_SECONDS", 5)
+LLM_MAX_CONNECTIONS = getattr(settings, "LLM_MAX_CONNECTIONS", 16)
+LLM_MAX_RETRIES = getattr(settings, "LLM_MAX_RETRIES", 1)
+
+ANALYSIS_SYSTEM_PROMPT = (
+    "You are a medical diagnosis assistant. "
+    "Given symptoms, respond ONLY in this format:\n\n"
+    "Possible Conditions:\n"
+    "- condition 1\n"
+    "- condition 2\n"
+    "Suggested Specialist: <name>\n"
+    "Advice: <short advice>"
+)
+CHATBOT_SYSTEM_PROMPT = "You are WELLORA assistant. Help visitors politely."
+
+DEFAULT_SPECIALIST = "General Physician"
+DEFAULT_ADVICE = "Consult a doctor for proper diagnosis."
+CHATBOT_FALLBACK = "Sorry, our assistant is busy right now. Please try again in a moment."
+
+# LLM wording → Specialization.name in our DB
+SPECIALIST_MAP = {
+    "general physician": "General Physician",
+    "primary care physician": "General Physician",
+    "doctor": "General Physician",
+    "family doctor": "General Physician",
+
+    "dentist": "Dentist",
+    "orthopedist": "Orthopedist",
+    "physiotherapist": "Physiotherapist",
+    "psychiatrist": "Psychiatrist",
+
+    "dermatologist": "Dermatology",
+    "skin specialist": "Dermatology",
+
+    "gynecologist": "Gynecologist",
+    "women specialist": "Gynecologist",
+}
+
+# filler words that don't change what the patient describes. Severity / intensity
+# words ("severe", "mild", "very", "little") stay in the key: they change the triage.
+_STOPWORDS = {
+    "a", "an", "and", "the", "i", "im", "i'm", "me", "my", "have", "has", "having", "had",
+    "with", "of", "some", "since", "am", "is", "are", "feel", "feeling", "also",
+    "to", "in", "on", "for", "from", "getting", "got",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize_symptoms(text):
+    """Order/case/punctuation-insensitive key: 'Fever and Cough!' == 'cough, fever'."""
+    tokens = {t.strip("'") for t in _TOKEN_RE.findall(text.lower())}
+    return " ".join(sorted(t for t in tokens if t and t not in _STOPWORDS))
+
+
+# =========================================================
+# 🔹 LRU + TTL CACHE
+# =========================================================
+class TTLLRUCache:
+    """Thread-safe LRU with per-entry expiry and hit/miss counters."""
+
+    def __init__(self, max_entries=LLM_CACHE_MAX_ENTRIES, ttl=LLM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+analysis_cache = TTLLRUCache()
+
+
+# =========================================================
+# 🔹 CLIENTS
+# =========================================================
+class FakeLLM:
+    """
+    Offline stand-in with the same chat.completions.create() surface as the
+    OpenAI client. Answers deterministically from a few keywords.
+    """
+    _RULES = [
+        (("tooth", "teeth", "gum", "jaw"), ["Dental caries", "Gingivitis"], "Dentist"),
+        (("rash", "itch", "skin", "acne", "pimple"), ["Dermatitis", "Allergic reaction"], "Dermatologist"),
+        (("knee", "joint", "back", "fracture", "sprain"), ["Sprain", "Arthritis"], "Orthopedist"),
+        (("anxiety", "depressed", "depression", "sleep", "panic"), ["Anxiety disorder", "Insomnia"], "Psychiatrist"),
+        (("period", "pregnancy", "pelvic", "menstrual"), ["Hormonal imbalance", "PCOS"], "Gynecologist"),
+    ]
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _reply(self, messages):
+        prompt = messages[-1]["content"].lower()
+        if messages[0]["content"] != ANALYSIS_SYSTEM_PROMPT:
+            return "Hello from WELLORA! You can search doctors, book appointments and check your symptoms here."
+        conditions, specialist = ["Viral fever", "Common cold"], "General Physician"
+        for keywords, rule_conditions, rule_specialist in self._RULES:
+            if any(k in prompt for k in keywords):
+                conditions, specialist = rule_conditions, rule_specialist
+                break
+        lines = ["Possible Conditions:", *(f"- {c}" for c in conditions),
+                 f"Suggested Specialist: {specialist}", f"Advice: {DEFAULT_ADVICE}"]
+        return "\n".join(lines)
+
+    def _create(self, model=None, messages=(), max_tokens=None, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self._reply(messages))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    async def astream(self, messages):
+        self.calls += 1
+        for word in re.findall(r"\S+\s*", self._reply(messages)):
+            await asyncio.sleep(0)
+            yield word
+
+
+_fake_llm = FakeLLM()
+
+
+class LLMUnavailable(Exception):
+    """Provider slow, failing or saturated; callers answer with a fallback."""
+
+
+_client_lock = threading.Lock()
+_clients = {}
+_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENT)
+_flight = SingleFlight()
+_stats = {"calls": 0, "coalesced": 0, "rejected": 0, "failures": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _timeout():
+    import httpx
+
+    return httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS)
+
+
+def _limits():
+    import httpx
+
+    return httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+
+
+def _build_client(kind):
+    backend = getattr(settings, "LLM_BACKEND", "openai")
+    if backend == "fake":
+        return _fake_llm
+    if backend != "openai":
+        # dotted path to a factory(kind) → client, e.g. for tests
+        return import_string(backend)(kind)
+
+    import httpx
+    import openai
+
+    if kind == "async":
+        return openai.AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"), max_retries=LLM_MAX_RETRIES,
+            http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout()),
+        )
+    return openai.OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"), max_retries=LLM_MAX_RETRIES,
+        http_client=httpx.Client(limits=_limits(), timeout=_timeout()),
+    )
+
+
+def _shared(kind):
+    # built on first use, not at import: no key needed to boot, one pool per process
+    client = _clients.get(kind)
+    if client is None:
+        with _client_lock:
+            client = _clients.get(kind)
+            if client is None:
+                client = _clients[kind] = _build_client(kind)
+    return client
+
+
+def get_client():
+    return _shared("sync")
+
+
+def get_async_client():
+    return _shared("async")
+
+
+def reset_clients():
+    """Forget the shared clients (after changing LLM_BACKEND in tests)."""
+    with _client_lock:
+        _clients.clear()
+
+
+def client_stats():
+    with _stats_lock:
+        return {**_stats, "max_concurrent": LLM_MAX_CONCURRENT, "timeout_seconds": LLM_TIMEOUT_SECONDS}
+
+
+async def stream_completion(system_prompt, user_text, max_tokens):
+    """Yield the completion text piece by piece as the provider sends it."""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_text},
+    ]
+    client = get_async_client()
+    if isinstance(client, FakeLLM):
+        async for piece in client.astream(messages):
+            yield piece
+        return
+
+    stream = await client.chat.completions.create(
+        model=LLM_MODEL, messages=messages, max_tokens=max_tokens, stream=True
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def _call(messages, max_tokens):
+    if not _slots.acquire(timeout=LLM_QUEUE_SECONDS):
+        _count("rejected")
+        raise LLMUnavailable("Too many LLM requests in flight.")
+    try:
+        _count("calls")
+        response = get_client().chat.completions.create(
+            model=LLM_MODEL, messages=messages, max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+    except Exception as e:
+        _count("failures")
+        raise LLMUnavailable(str(e)) from e
+    finally:
+        _slots.release()
+
+
+def complete(system_prompt, user_text, max_tokens, fallback=None):
+    """
+    One completion through the shared client. Identical prompts already in
+    flight in this process share a single provider call. Raises LLMUnavailable
+    on timeout / error / saturation unless a fallback text is given.
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_text},
+    ]
+    key = hashlib.sha1(f"{system_prompt}\0{user_text}\0{max_tokens}".encode()).hexdigest()
+    leader = []
+
+    def run():
+        leader.append(True)
+        return _call(messages, max_tokens)
+
+    try:
+        return _flight.do(key, run)
+    except LLMUnavailable:
+        if fallback is None:
+            raise
+        return fallback
+    finally:
+        if not leader:
+            _count("coalesced")
+
+
+# =========================================================
+# 🔹 SYMPTOM ANALYSIS
+# =========================================================
+def parse_analysis(text):
+    """LLM text → {"conditions", "specialist", "advice"} with the specialist mapped to our DB names."""
+    text = text.strip()
+    conditions = re.findall(r"- (.+)", text)
+    specialist_match = re.search(r"Suggested Specialist:\s*(.+)", text)
+    advice_match = re.search(r"Advice:\s*(.+)", text)
+
+    specialist_raw = specialist_match.group(1).strip() if specialist_match else DEFAULT_SPECIALIST
+    return {
+        "conditions": conditions,
+        "specialist": SPECIALIST_MAP.get(specialist_raw.lower(), DEFAULT_SPECIALIST),
+        "advice": advice_match.group(1).strip() if advice_match else DEFAULT_ADVICE,
+    }
+
+
+def analyze_symptoms(symptoms):
+    """
+    Parsed analysis for the symptom text, served from cache when possible.
+    Returns (analysis, cached); raises LLMUnavailable (nothing is cached then).
+    """
+    key = normalize_symptoms(symptoms) or symptoms.strip().lower()
+    analysis = analysis_cache.get(key)
+    if analysis is not None:
+        return analysis, True
+
+    analysis = parse_analysis(complete(ANALYSIS_SYSTEM_PROMPT, symptoms, max_tokens=400))
+    analysis_cache.set(key, analysis)
+    return analysis, False
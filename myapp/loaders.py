@@ -0,0 +1,180 @@
+# myapp/loaders.py
+"""
+Request-scoped identity map.
+
+A view and the serializers it calls tend to resolve the same rows again and
+again: the caller's DoctorProfile / PatientProfile, the clinics they own, and
+the approved ClinicDoctorRequest links of each doctor on the page. A
+RequestLoader memoizes those lookups for the lifetime of one request.
+
+The loader hangs off the underlying HttpRequest, so the DRF Request wrapper
+and every serializer that receives context={"request": ...} share it. Nothing
+outlives the request, so cached entries only need to be dropped (forget())
+when the view itself changes one of them.
+
+Claims users (see authentication.user_from_claims) already carry
+doctor_profile_id, patient_profile_id and clinic_ids; the loader uses them
+and skips the query.
+"""
+from .models import Clinic, ClinicDoctorRequest, DoctorProfile, PatientProfile
+
+_ATTR = "_wellora_loader"
+_MISSING = object()
+
+
+class RequestLoader:
+    def __init__(self, user=None):
+        self.user = user
+        self._memo = {}
+        self._approved = {}  # doctor_id -> [ClinicDoctorRequest] (clinic joined)
+        self._clinic_links = {}  # clinic_id -> [ClinicDoctorRequest] (doctor, user, specialization joined)
+
+    def get(self, key, load):
+        """Memoize any per-request lookup under `key` (load() runs at most once)."""
+        value = self._memo.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._memo[key] = load()
+        return value
+
+    def put(self, key, value):
+        """Seed an entry up front (batch loaders fill many keys with one query)."""
+        self._memo[key] = value
+
+    def _user_id(self):
+        user = self.user
+        return user.pk if user is not None and user.is_authenticated else None
+
+    def forget(self, *keys):
+        """Drop memoized entries ("doctor_profile", "patient_profile", "owned_clinic_ids") or everything."""
+        if not keys:
+            self._memo.clear()
+            self._approved.clear()
+            self._clinic_links.clear()
+        for key in keys:
+            self._memo.pop(key, None)
+
+    # =========================================================
+    # 🔹 THE CALLER
+    # =========================================================
+    def doctor_profile(self):
+        """The caller's DoctorProfile (user + specialization joined) or None."""
+        def load():
+            user_id = self._user_id()
+            if user_id is None:
+                return None
+            profile = DoctorProfile.objects.select_related("user", "specialization").filter(user_id=user_id).first()
+            if profile is not None and not getattr(self.user, "from_claims", False):
+                profile.user = self.user  # same row; keeps edits to request.user visible
+            return profile
+
+        return self.get("doctor_profile", load)
+
+    def doctor_profile_id(self):
+        claimed = getattr(self.user, "doctor_profile_id", None)
+        if claimed is not None and "doctor_profile" not in self._memo:
+            return claimed
+        profile = self.doctor_profile()
+        return profile.id if profile else None
+
+    def patient_profile(self, create=False):
+        """The caller's PatientProfile; created on demand when `create` is set."""
+        profile = self.get("patient_profile", lambda: PatientProfile.objects.filter(user_id=self._user_id()).first())
+        if profile is None and create and self._user_id() is not None:
+            profile, _ = PatientProfile.objects.get_or_create(user_id=self._user_id())
+            self._memo["patient_profile"] = profile
+        return profile
+
+    def patient_profile_id(self):
+        claimed = getattr(self.user, "patient_profile_id", None)
+        if claimed is not None and "patient_profile" not in self._memo:
+            return claimed
+        profile = self.patient_profile()
+        return profile.id if profile else None
+
+    def owned_clinic_ids(self):
+        """Ids of the clinics the caller owns (from the token when it carries them)."""
+        def load():
+            if getattr(self.user, "from_claims", False):
+                return list(self.user.clinic_ids)
+            user_id = self._user_id()
+            if user_id is None:
+                return []
+            return list(Clinic.objects.filter(owner_id=user_id).order_by("id").values_list("id", flat=True))
+
+        return self.get("owned_clinic_ids", load)
+
+    # =========================================================
+    # 🔹 APPROVED CLINICS PER DOCTOR
+    # =========================================================
+    def prime_approved(self, doctor_ids):
+        """Load the approved links of many doctors in one query (list pages)."""
+        missing = {pk for pk in doctor_ids if pk not in self._approved}
+        if not missing:
+            return
+        for pk in missing:
+            self._approved[pk] = []
+        links = (
+            ClinicDoctorRequest.objects.filter(doctor_id__in=missing, status="approved")
+            .select_related("clinic")
+            .order_by("id")
+        )
+        for link in links:
+            self._approved[link.doctor_id].append(link)
+
+    def approved_links(self, doctor_id):
+        if doctor_id not in self._approved:
+            self.prime_approved([doctor_id])
+        return self._approved[doctor_id]
+
+    def approved_clinics(self, doctor_id):
+        return [link.clinic for link in self.approved_links(doctor_id)]
+
+    def approved_clinic_ids(self, doctor_id):
+        return [link.clinic_id for link in self.approved_links(doctor_id)]
+
+    def is_approved(self, doctor_id, clinic_id):
+        try:
+            clinic_id = int(clinic_id)
+        except (TypeError, ValueError):
+            return False
+        return clinic_id in self.approved_clinic_ids(doctor_id)
+
+    # =========================================================
+    # 🔹 DOCTOR LINKS PER CLINIC
+    # =========================================================
+    def prime_clinic_links(self, clinic_ids):
+        """Every join request (any status) of many clinics in one query."""
+        missing = {pk for pk in clinic_ids if pk not in self._clinic_links}
+        if not missing:
+            return
+        for pk in missing:
+            self._clinic_links[pk] = []
+        links = (
+            ClinicDoctorRequest.objects.filter(clinic_id__in=missing)
+            .select_related("doctor__user", "doctor__specialization")
+            .order_by("id")
+        )
+        for link in links:
+            self._clinic_links[link.clinic_id].append(link)
+
+    def clinic_links(self, clinic_id, status=None):
+        if clinic_id not in self._clinic_links:
+            self.prime_clinic_links([clinic_id])
+        links = self._clinic_links[clinic_id]
+        return links if status is None else [link for link in links if link.status == status]
+
+
+def get_loader(request):
+    """The loader for this request; a throwaway one when there is no request."""
+    if request is None:
+        return RequestLoader()
+    http_request = getattr(request, "_request", request)  # DRF Request wraps HttpRequest
+    loader = getattr(http_request, _ATTR, None)
+    if loader is None:
+        loader = RequestLoader(getattr(request, "user", None))
+        setattr(http_request, _ATTR, loader)
+    elif getattr(loader.user, "pk", None) != getattr(getattr(request, "user", None), "pk", None):
+        # created before authentication ran (middleware / anonymous): rebind
+        loader.user = getattr(request, "user", None)
+        loader.forget()
+    return loader
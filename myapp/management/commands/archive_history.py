@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from myapp.archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, archive_cutoff, archive_history, pending_counts
+
+
+class Command(BaseCommand):
+    help = "Move past slots and unpaid appointments older than the horizon into the archive tables, in bounded batches (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="Archive what ended more than this many days ago")
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would move")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["days"])
+        if options["dry_run"]:
+            counts = pending_counts(cutoff)
+            self.stdout.write(
+                f"Before {cutoff:%Y-%m-%d %H:%M}: {counts['appointments']} appointment(s), "
+                f"{counts['slots_booked']} booked and {counts['slots_free']} free slot(s) would move."
+            )
+            return
+
+        stats = archive_history(
+            cutoff, batch_size=options["batch_size"], max_batches=options["max_batches"], pause=options["pause"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {stats['appointments']} appointment(s) and {stats['slots_archived']} booked slot(s), "
+            f"deleted {stats['slots_deleted']} free slot(s) in {stats['batches']} batch(es)."
+        ))
@@ -0,0 +1,130 @@
+import importlib.util
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from myapp.db_pool import alias_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request connection overhead: a new connection per request, persistent "
+        "per-thread connections, and the psycopg pool, under N threads (like gunicorn gthread workers)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Alias whose settings are benchmarked")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=200, help="Requests per thread")
+        parser.add_argument("--pool-size", type=int, default=None, help="Pool max_size (default: DB_POOL_MAX_SIZE)")
+        parser.add_argument("--modes", default="direct,persistent,pool")
+
+    def handle(self, *args, **options):
+        if options["database"] not in connections:
+            raise CommandError(f"Unknown database {options['database']!r}.")
+        base = connections[options["database"]].settings_dict
+
+        for mode in [m.strip() for m in options["modes"].split(",") if m.strip()]:
+            db = self._settings_for(mode, base, options)
+            if db is None:
+                continue
+            alias = f"bench_{mode}"
+            connections.settings[alias] = db
+            try:
+                self._report(mode, self._run(alias, options["threads"], options["requests"]))
+            finally:
+                self._teardown(alias)
+
+    # ---------- setup ----------
+    def _settings_for(self, mode, base, options):
+        db = {**base, "OPTIONS": {k: v for k, v in base.get("OPTIONS", {}).items() if k != "pool"}}
+        if mode == "direct":
+            db["CONN_MAX_AGE"] = 0
+        elif mode == "persistent":
+            db["CONN_MAX_AGE"] = 600
+        elif mode == "pool":
+            if db["ENGINE"] != "django.db.backends.postgresql":
+                self.stdout.write(self.style.WARNING("pool: skipped, pooling needs PostgreSQL."))
+                return None
+            if not all(importlib.util.find_spec(m) for m in ("psycopg", "psycopg_pool")):
+                self.stdout.write(self.style.WARNING("pool: skipped, psycopg / psycopg_pool not installed."))
+                return None
+            pool = dict(getattr(settings, "DB_POOL_OPTIONS", {}))
+            if options["pool_size"]:
+                pool["max_size"] = options["pool_size"]
+            db.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=True)
+            db["OPTIONS"]["pool"] = pool
+        else:
+            raise CommandError(f"Unknown mode {mode!r} (direct, persistent, pool).")
+        return db
+
+    def _teardown(self, alias):
+        wrapper = connections[alias]
+        wrapper.close()
+        if getattr(wrapper, "pool", None) is not None:
+            wrapper.close_pool()
+        del connections[alias]
+        del connections.settings[alias]
+
+    # ---------- run ----------
+    def _run(self, alias, threads, per_thread):
+        latencies, lock = [], threading.Lock()
+        opened = [0]
+
+        def count_connect(sender, connection, **kwargs):
+            if connection.alias == alias:
+                with lock:
+                    opened[0] += 1
+
+        def worker():
+            mine = []
+            conn = connections[alias]  # one wrapper per thread, like a gthread worker
+            for _ in range(per_thread):
+                started = time.perf_counter()
+                conn.close_if_unusable_or_obsolete()  # request_started
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                conn.close_if_unusable_or_obsolete()  # request_finished
+                mine.append((time.perf_counter() - started) * 1000)
+            conn.close()
+            with lock:
+                latencies.extend(mine)
+
+        connection_created.connect(count_connect)
+        try:
+            workers = [threading.Thread(target=worker) for _ in range(threads)]
+            started = time.perf_counter()
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count_connect)
+
+        return {"latencies": latencies, "elapsed": elapsed, "connects": opened[0], "pool": alias_stats(alias)}
+
+    # ---------- output ----------
+    def _report(self, mode, result):
+        lat = sorted(result["latencies"])
+        p95 = lat[max(0, int(len(lat) * 0.95) - 1)]
+        line = (
+            f"{mode:<10} {len(lat)} requests in {result['elapsed']:.2f}s "
+            f"({len(lat) / result['elapsed']:.0f} req/s)  "
+            f"p50 {statistics.median(lat):.2f}ms  p95 {p95:.2f}ms  "
+        )
+        pool = result["pool"]
+        if pool["pooled"]:
+            line += (
+                f"connections opened {pool['connections_opened']} for {pool['checkouts']} checkouts  "
+                f"wait avg {pool['wait_avg_ms']}ms  queued {pool['checkouts_queued']}  timeouts {pool['timeouts']}"
+            )
+        else:
+            line += f"connections opened {result['connects']}"
+        self.stdout.write(self.style.SUCCESS(line))
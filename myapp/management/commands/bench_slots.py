@@ -0,0 +1,126 @@
+import random
+import statistics
+import time
+from datetime import time as time_cls, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from myapp import bitmaps
+from myapp import slots as slot_engine
+from myapp.models import Clinic, DoctorAvailability, DoctorProfile, TimeSlot
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare free-slot reads with materialized TimeSlot rows vs virtual slots computed from "
+        "DoctorAvailability windows. Seeds throwaway data inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--doctors", type=int, default=20)
+        parser.add_argument("--days", type=int, default=30, help="Days of availability per doctor")
+        parser.add_argument("--windows", type=int, default=2, help="Windows (clinics) per doctor per day")
+        parser.add_argument("--booked", type=float, default=0.25, help="Share of slots already booked")
+        parser.add_argument("--runs", type=int, default=200, help="Reads per case")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                doctor_ids, rows = self._seed(options)
+                self.stdout.write(
+                    f"seeded {len(doctor_ids)} doctors × {options['days']} days × {options['windows']} windows: "
+                    f"materialized {rows['materialized']} TimeSlot rows, virtual {rows['virtual']} "
+                    f"(booked only) + {rows['windows']} windows"
+                )
+                self._bench(doctor_ids, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    # ---------- seed ----------
+    def _seed(self, options):
+        rng = random.Random(42)
+        tag = timezone.now().strftime("%H%M%S%f")
+        owner = User.objects.create_user(email=f"bench-owner-{tag}@slots.test", role="clinic_owner", full_name="Bench")
+        clinics = [
+            Clinic.objects.create(owner=owner, name=f"Bench Clinic {i}", address="-", is_verified=True)
+            for i in range(options["windows"])
+        ]
+        first_day = timezone.localdate() + timedelta(days=1)
+        windows, free_rows, booked_rows = [], [], []
+        doctor_ids = []
+        for d in range(options["doctors"]):
+            user = User.objects.create_user(email=f"bench-doc-{tag}-{d}@slots.test", role="doctor", full_name=f"Doc {d}")
+            doctor = DoctorProfile.objects.create(user=user, is_verified=True)
+            doctor_ids.append(doctor.id)
+            for day_offset in range(options["days"]):
+                day = first_day + timedelta(days=day_offset)
+                for i, clinic in enumerate(clinics):
+                    # back-to-back 4h windows at different clinics: 09-13, 14-18, ...
+                    start_hour = 9 + i * 5
+                    if start_hour + 4 > 24:
+                        break
+                    windows.append(DoctorAvailability(
+                        doctor=doctor, clinic=clinic, date=day, start_time=time_cls(start_hour),
+                        end_time=time_cls(start_hour + 4), slot_duration=30, status="approved",
+                    ))
+                    window_start, _ = slot_engine.window_bounds(day, time_cls(start_hour), time_cls(start_hour))
+                    for k in range(8):
+                        start = window_start + timedelta(minutes=30 * k)
+                        row = TimeSlot(doctor=doctor, clinic=clinic, start=start, end=start + timedelta(minutes=30))
+                        if rng.random() < options["booked"]:
+                            row.is_booked = True
+                            booked_rows.append(row)
+                        else:
+                            free_rows.append(row)
+        DoctorAvailability.objects.bulk_create(windows, batch_size=1000)
+        TimeSlot.objects.bulk_create(booked_rows + free_rows, batch_size=1000)
+        bitmaps.rebuild(first_day=first_day)  # bulk_create skips the bitmap receivers
+        return doctor_ids, {
+            "materialized": len(booked_rows) + len(free_rows),
+            "virtual": len(booked_rows),
+            "windows": len(windows),
+        }
+
+    # ---------- run ----------
+    def _bench(self, doctor_ids, options):
+        rng = random.Random(7)
+        first_day = timezone.localdate() + timedelta(days=1)
+        days = [first_day + timedelta(days=rng.randrange(options["days"])) for _ in range(options["runs"])]
+        doctors = [rng.choice(doctor_ids) for _ in range(options["runs"])]
+
+        # same answer from both paths before timing them
+        sample_doctor, sample_day = doctors[0], days[0]
+        same = (
+            [(s["start"], s["clinic_id"]) for s in slot_engine.materialized_day_slots(sample_doctor, sample_day)]
+            == [(s["start"], s["clinic_id"]) for s in slot_engine.virtual_day_slots(sample_doctor, sample_day)]
+        )
+        self.stdout.write(f"day slots agree: {'yes' if same else 'NO'}")
+
+        cases = [
+            ("day slots", "materialized", lambda i: slot_engine.materialized_day_slots(doctors[i], days[i])),
+            ("day slots", "virtual", lambda i: slot_engine.virtual_day_slots(doctors[i], days[i])),
+            ("dates", "materialized", lambda i: slot_engine.materialized_available_dates(doctors[i])),
+            ("dates", "virtual", lambda i: slot_engine.virtual_available_dates(doctors[i])),
+        ]
+        for name, mode, fn in cases:
+            runs = min(options["runs"], 50) if name == "dates" else options["runs"]
+            latencies = []
+            for i in range(runs):
+                started = time.perf_counter()
+                fn(i)
+                latencies.append((time.perf_counter() - started) * 1000)
+            latencies.sort()
+            p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+            self.stdout.write(self.style.SUCCESS(
+                f"{name:<10} {mode:<13} {runs} reads  p50 {statistics.median(latencies):.2f}ms  p95 {p95:.2f}ms"
+            ))
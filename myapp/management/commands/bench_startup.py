@@ -0,0 +1,81 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: boot the WSGI app the way a gunicorn worker does,
+# serve one request straight through it, report timestamps and peak RSS.
+CHILD = r"""
+import json, resource, sys, time
+from wsgiref.util import setup_testing_defaults
+
+from django.core.wsgi import get_wsgi_application
+
+application = get_wsgi_application()
+booted_at = time.time()
+booted_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+environ = {"PATH_INFO": sys.argv[1], "HTTP_HOST": sys.argv[2]}
+setup_testing_defaults(environ)
+status = []
+body = b"".join(application(environ, lambda s, h, exc_info=None: status.append(s)))
+served_at = time.time()
+
+print(json.dumps({
+    "booted_at": booted_at, "served_at": served_at, "status": status[0],
+    "boot_rss_kb": booted_rss, "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure worker startup: time and peak RSS from process start to the first served "
+        "request, with lazily imported views (default) and with EAGER_VIEWS=1."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="/api/specializations/", help="Path of the first request")
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--modes", default="lazy,eager")
+
+    def handle(self, *args, **options):
+        host = next((h for h in settings.ALLOWED_HOSTS if h and "*" not in h and not h.startswith(".")), "localhost")
+        for mode in [m.strip() for m in options["modes"].split(",") if m.strip()]:
+            if mode not in ("lazy", "eager"):
+                raise CommandError(f"Unknown mode {mode!r} (lazy, eager).")
+            runs = [self._run(mode, options["url"], host) for _ in range(options["runs"])]
+            self._report(mode, options["url"], runs)
+
+    def _run(self, mode, url, host):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "docproject.settings"),
+            "EAGER_VIEWS": "1" if mode == "eager" else "0",
+        }
+        started_at = time.time()
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD, url, host],
+            env=env, cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(f"{mode}: worker failed to start\n{proc.stderr[-2000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["boot_ms"] = (result["booted_at"] - started_at) * 1000
+        result["first_request_ms"] = (result["served_at"] - started_at) * 1000
+        return result
+
+    def _report(self, mode, url, runs):
+        median = lambda key: statistics.median(r[key] for r in runs)  # noqa: E731
+        self.stdout.write(self.style.SUCCESS(
+            f"{mode:<6} {len(runs)} runs, GET {url} → {runs[-1]['status']}  "
+            f"boot {median('boot_ms'):.0f}ms ({median('boot_rss_kb') / 1024:.1f} MB)  "
+            f"first request {median('first_request_ms'):.0f}ms ({median('rss_kb') / 1024:.1f} MB peak RSS)  "
+            f"{median('modules'):.0f} modules"
+        ))
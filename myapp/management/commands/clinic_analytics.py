@@ -0,0 +1,30 @@
+import json
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from myapp.analytics import clinic_report
+from myapp.models import Clinic
+
+
+class Command(BaseCommand):
+    help = "Compute (and cache) the utilization / no-show report for a clinic."
+
+    def add_arguments(self, parser):
+        parser.add_argument("clinic_id", type=int)
+        parser.add_argument("--from", dest="start", help="YYYY-MM-DD (default: 30 days before --to)")
+        parser.add_argument("--to", dest="end", help="YYYY-MM-DD (default: today)")
+        parser.add_argument("--refresh", action="store_true", help="Ignore the cached report")
+
+    def handle(self, *args, **options):
+        if not Clinic.objects.filter(pk=options["clinic_id"]).exists():
+            raise CommandError("Clinic not found.")
+        try:
+            end = datetime.strptime(options["end"], "%Y-%m-%d").date() if options["end"] else timezone.localdate()
+            start = datetime.strptime(options["start"], "%Y-%m-%d").date() if options["start"] else end - timedelta(days=30)
+        except ValueError:
+            raise CommandError("Dates must be YYYY-MM-DD.")
+
+        report = clinic_report(options["clinic_id"], start, end, refresh=options["refresh"])
+        self.stdout.write(json.dumps(report, indent=2))
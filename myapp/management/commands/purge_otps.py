@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from myapp.models import EmailOTP
+
+
+class Command(BaseCommand):
+    help = "Delete expired email OTP codes in bounded batches (run from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches")
+
+    def handle(self, *args, **options):
+        deleted = EmailOTP.sweep_expired(batch_size=options["batch_size"], max_batches=options["max_batches"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired OTP(s)."))
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.bitmaps import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per doctor/clinic/day free-busy bitmaps from TimeSlot (all days unless a range is given)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--doctor", type=int, default=None, help="DoctorProfile id")
+        parser.add_argument("--from", dest="first_day", default=None, help="YYYY-MM-DD (local date)")
+        parser.add_argument("--to", dest="last_day", default=None, help="YYYY-MM-DD (local date, inclusive)")
+
+    def handle(self, *args, **options):
+        try:
+            first_day, last_day = (
+                datetime.strptime(options[k], "%Y-%m-%d").date() if options[k] else None
+                for k in ("first_day", "last_day")
+            )
+        except ValueError:
+            raise CommandError("Dates must be YYYY-MM-DD.")
+
+        written, dropped = rebuild(options["doctor"], first_day, last_day)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} day bitmap(s), dropped {dropped} stale one(s)."))
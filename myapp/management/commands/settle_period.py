@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.settlement import SettlementError, settle_period
+
+
+class Command(BaseCommand):
+    help = "Settle all paid appointments of a period into immutable payout statements."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", help="Month to settle, YYYY-MM")
+        parser.add_argument("--start", help="Period start, YYYY-MM-DD")
+        parser.add_argument("--end", help="Period end, YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        try:
+            if options["month"]:
+                start = datetime.strptime(options["month"], "%Y-%m").date()
+                end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            else:
+                start = datetime.strptime(options["start"] or "", "%Y-%m-%d").date()
+                end = datetime.strptime(options["end"] or "", "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError("Pass --month YYYY-MM or --start/--end YYYY-MM-DD.")
+
+        started = datetime.now()
+        try:
+            run = settle_period(start, end)
+        except SettlementError as e:
+            raise CommandError(str(e))
+
+        elapsed = (datetime.now() - started).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Settled {start} → {end}: {run.appointment_count} appointments, "
+            f"{run.statements.count()} statements, doctors ₹{run.doctor_payout}, "
+            f"clinics ₹{run.clinic_share} ({elapsed:.2f}s)"
+        ))
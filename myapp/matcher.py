@@ -0,0 +1,216 @@
+# myapp/matcher.py
+"""
+Offline symptom → specialization matcher.
+
+One in-memory phrase index is built from the Symptom and Specialization
+tables, the built-in keyword list and the LLM specialist map. Matching is a
+single pass over the tokens of the text (longest phrase first), so it answers
+in microseconds; analyze_symptoms only falls back to the LLM when the match
+confidence is below MATCHER_MIN_CONFIDENCE. A confident answer lists the
+Symptom rows it matched for the chosen specialization as its conditions.
+
+The index is rebuilt lazily: local Symptom / Specialization writes mark it
+dirty right away, and other workers notice the shared cache namespace bump
+within MATCHER_REFRESH_SECONDS.
+"""
+import re
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+from . import cache as public_cache
+from .llm import SPECIALIST_MAP
+from .models import Specialization, Symptom
+
+MATCHER_MIN_CONFIDENCE = getattr(settings, "MATCHER_MIN_CONFIDENCE", 0.6)
+MATCHER_REFRESH_SECONDS = getattr(settings, "MATCHER_REFRESH_SECONDS", 30)
+
+# phrase weights per source
+SYMPTOM_WEIGHT = 1.0
+SPECIALIST_WEIGHT = 0.9
+KEYWORD_WEIGHT = 0.8
+
+SYMPTOM_KEYWORDS = {
+    "fever": "General Physician",
+    "cold": "General Physician",
+    "cough": "General Physician",
+    "headache": "Neurologist",
+    "migraine": "Neurologist",
+    "skin": "Dermatologist",
+    "rash": "Dermatologist",
+    "itch": "Dermatologist",
+    "heart": "Cardiologist",
+    "chest": "Cardiologist",
+    "eye": "Ophthalmologist",
+    "tooth": "Dentist",
+    "pain": "Orthopedic",
+    "bone": "Orthopedic",
+    "stomach": "Gastroenterologist",
+    "digest": "Gastroenterologist",
+    "mental": "Psychiatrist",
+    "anxiety": "Psychiatrist",
+}
+
+# patient wording → the token used in the index
+SYNONYMS = {
+    "teeth": "tooth",
+    "toothache": "tooth",
+    "molar": "tooth",
+    "tummy": "stomach",
+    "belly": "stomach",
+    "abdomen": "stomach",
+    "abdominal": "stomach",
+    "digestion": "digest",
+    "indigestion": "digest",
+    "temperature": "fever",
+    "pyrexia": "fever",
+    "feverish": "fever",
+    "coughing": "cough",
+    "itchy": "itch",
+    "itching": "itch",
+    "eyes": "eye",
+    "vision": "eye",
+    "bones": "bone",
+    "anxious": "anxiety",
+    "cardiac": "heart",
+    "palpitations": "heart",
+    "painful": "pain",
+}
+
+_STOPWORDS = {
+    "a", "an", "and", "or", "the", "i", "im", "me", "my", "have", "has", "having", "had",
+    "with", "of", "some", "since", "am", "is", "are", "feel", "feeling", "also", "very",
+    "bit", "little", "lot", "to", "in", "on", "for", "from", "getting", "got", "need", "days",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+Match = namedtuple("Match", ["specialization", "confidence", "matched", "scores", "conditions"])
+NO_MATCH = Match(None, 0.0, [], {}, [])
+
+
+def _stem(token):
+    token = SYNONYMS.get(token, token)
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        token = SYNONYMS.get(token[:-1], token[:-1])
+    return token
+
+
+def tokenize(text):
+    return [_stem(t) for t in _TOKEN_RE.findall(text.lower())]
+
+
+class SymptomIndex:
+    """
+    Phrases keyed by their first token; each phrase carries (specialization,
+    weight, label). Entries are (phrase, specialization, weight[, label]);
+    the label — a Symptom row's name — is reported back as a condition.
+    """
+
+    def __init__(self, entries):
+        self._by_first = defaultdict(list)
+        for phrase, specialization, weight, *label in entries:
+            tokens = tuple(tokenize(phrase))
+            if tokens:
+                self._by_first[tokens[0]].append((tokens, specialization, weight, label[0] if label else None))
+        for candidates in self._by_first.values():
+            candidates.sort(key=lambda c: (len(c[0]), c[2]), reverse=True)  # longest, strongest first
+
+    def match(self, text):
+        tokens = tokenize(text)
+        content = sum(1 for t in tokens if t not in _STOPWORDS)
+        scores = defaultdict(float)
+        matched, labels, covered = [], [], 0
+
+        i = 0
+        while i < len(tokens):
+            for phrase, specialization, weight, label in self._by_first.get(tokens[i], ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase:
+                    scores[specialization] += weight
+                    matched.append(" ".join(phrase))
+                    if label:
+                        labels.append((label, specialization))
+                    covered += len(phrase)
+                    i += len(phrase)
+                    break
+            else:
+                i += 1
+
+        if not scores:
+            return NO_MATCH
+
+        best = max(scores, key=scores.get)
+        share = scores[best] / sum(scores.values())
+        coverage = min(1.0, covered / content) if content else 0.0
+        # agreeing phrases that explain most of the text → high confidence
+        confidence = round(share * (0.5 + 0.5 * coverage), 4)
+        conditions = list(dict.fromkeys(label for label, specialization in labels if specialization == best))
+        return Match(best, confidence, matched, dict(scores), conditions)
+
+
+def _canonical(label, db_names):
+    """Map a keyword / LLM label onto an existing Specialization.name where possible."""
+    lowered = label.lower()
+    if lowered in db_names:
+        return db_names[lowered]
+    mapped = SPECIALIST_MAP.get(lowered)
+    if mapped:
+        return db_names.get(mapped.lower(), mapped)
+    for name_lower, name in db_names.items():
+        # "Dermatologist" ↔ "Dermatology", "Orthopedic" ↔ "Orthopedist"
+        if len(lowered) >= 6 and name_lower[:6] == lowered[:6]:
+            return name
+    return label
+
+
+def build_index():
+    db_names = {name.lower(): name for name in Specialization.objects.values_list("name", flat=True)}
+    entries = [(name, name, SPECIALIST_WEIGHT) for name in db_names.values()]
+    entries += [(label, _canonical(target, db_names), SPECIALIST_WEIGHT) for label, target in SPECIALIST_MAP.items()]
+    entries += [(keyword, _canonical(target, db_names), KEYWORD_WEIGHT) for keyword, target in SYMPTOM_KEYWORDS.items()]
+    entries += [
+        (name, specialization, SYMPTOM_WEIGHT, name)
+        for name, specialization in Symptom.objects.values_list("name", "specialization__name")
+    ]
+    return SymptomIndex(entries)
+
+
+# =========================================================
+# 🔹 PROCESS-WIDE INDEX
+# =========================================================
+_lock = threading.Lock()
+_state = {"index": None, "versions": None, "checked_at": 0.0}
+
+
+def _source_versions():
+    return public_cache.get_versions(public_cache.SPECIALIZATIONS, public_cache.SYMPTOMS)
+
+
+def get_index():
+    now = time.monotonic()
+    index = _state["index"]
+    if index is not None and now - _state["checked_at"] < MATCHER_REFRESH_SECONDS:
+        return index
+
+    with _lock:
+        versions = _source_versions()
+        if _state["index"] is None or versions != _state["versions"]:
+            _state["index"] = build_index()
+            _state["versions"] = versions
+        _state["checked_at"] = now
+        return _state["index"]
+
+
+def invalidate(*args, **kwargs):
+    _state["index"] = None
+
+
+def match(text):
+    return get_index().match(text)
+
+
+for _model in (Specialization, Symptom):
+    post_save.connect(invalidate, sender=_model, dispatch_uid=f"matcher-save-{_model.__name__}")
+    post_delete.connect(invalidate, sender=_model, dispatch_uid=f"matcher-delete-{_model.__name__}")
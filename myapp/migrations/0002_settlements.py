@@ -0,0 +1,66 @@
+# Generated by Django 5.1.7 on 2026-10-19 02:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SettlementRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('appointment_count', models.PositiveIntegerField(default=0)),
+                ('total_fee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('clinic_share', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('doctor_payout', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-period_start'],
+                'unique_together': {('period_start', 'period_end')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SettlementStatement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('appointment_count', models.PositiveIntegerField(default=0)),
+                ('total_fee', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('clinic_share', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('doctor_payout', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('clinic', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='settlement_statements', to='myapp.clinic')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='settlement_statements', to='myapp.doctorprofile')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='statements', to='myapp.settlementrun')),
+            ],
+            options={
+                'unique_together': {('run', 'doctor', 'clinic')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SettlementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token_no', models.CharField(max_length=50)),
+                ('visit_at', models.DateTimeField()),
+                ('total_fee', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('clinic_share', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('doctor_payout', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('appointment', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='settlement_line', to='myapp.appointment')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lines', to='myapp.settlementstatement')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 02:57
+
+import myapp.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_version_stamps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailotp',
+            name='expires_at',
+            field=models.DateTimeField(default=myapp.models._otp_expiry),
+        ),
+        migrations.AddIndex(
+            model_name='emailotp',
+            index=models.Index(fields=['email', '-created_at'], name='emailotp_email_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailotp',
+            index=models.Index(fields=['expires_at'], name='emailotp_expires_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-19 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0005_user_token_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'status', 'timeslot'], name='appt_doctor_status_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['clinic', 'timeslot'], name='appt_clinic_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clinicdoctorrequest',
+            index=models.Index(fields=['doctor', 'status'], name='cdr_doctor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clinicdoctorrequest',
+            index=models.Index(fields=['clinic', 'status'], name='cdr_clinic_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='doctoravailability',
+            index=models.Index(fields=['doctor', 'date'], name='avail_doctor_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at'], name='notif_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(fields=['doctor', 'is_booked', 'start'], name='slot_doctor_booked_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(condition=models.Q(('is_booked', False)), fields=['doctor', 'start'], name='slot_open_doctor_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(fields=['clinic', 'start'], name='slot_clinic_start_idx'),
+        ),
+    ]
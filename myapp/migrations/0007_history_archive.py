@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-19 03:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('patient_id', models.BigIntegerField()),
+                ('doctor_id', models.BigIntegerField()),
+                ('clinic_id', models.BigIntegerField(null=True)),
+                ('timeslot_id', models.BigIntegerField(null=True)),
+                ('slot_start', models.DateTimeField(null=True)),
+                ('slot_end', models.DateTimeField(null=True)),
+                ('status', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('notes', models.TextField(blank=True)),
+                ('amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=8)),
+                ('paid', models.BooleanField(default=False)),
+                ('token_no', models.CharField(db_index=True, max_length=50)),
+                ('month', models.DateField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'clinic_id'], name='apptarch_month_clinic_idx'), models.Index(fields=['doctor_id', 'month'], name='apptarch_doctor_month_idx'), models.Index(fields=['patient_id', 'month'], name='apptarch_patient_month_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TimeSlotArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('doctor_id', models.BigIntegerField()),
+                ('clinic_id', models.BigIntegerField()),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('month', models.DateField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'doctor_id'], name='slotarch_month_doctor_idx'), models.Index(fields=['month', 'clinic_id'], name='slotarch_month_clinic_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.7 on 2026-10-19 03:25
+
+from datetime import datetime, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+CELL_MINUTES, CELLS = 5, 288
+
+
+def build_upcoming(apps, schema_editor):
+    """Index today's and future slots; older days are never read (rebuild_slot_bitmaps covers them)."""
+    TimeSlot = apps.get_model("myapp", "TimeSlot")
+    DoctorDayBitmap = apps.get_model("myapp", "DoctorDayBitmap")
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+    cell = timedelta(minutes=CELL_MINUTES)
+
+    days = {}
+    rows = TimeSlot.objects.filter(start__gte=today).values_list("doctor_id", "clinic_id", "start", "end", "is_booked")
+    for doctor_id, clinic_id, start, end, is_booked in rows.iterator():
+        day = timezone.localtime(start).date()
+        origin = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+        first = (start - origin) // cell
+        last = max(first, min(CELLS, -(-(end - origin) // cell)))
+        entry = days.setdefault((doctor_id, clinic_id, day), [0, 0, 0])
+        if is_booked:
+            entry[1] |= ((1 << (last - first)) - 1) << first
+        else:
+            entry[0] |= 1 << first
+            entry[2] += 1
+
+    DoctorDayBitmap.objects.bulk_create(
+        [
+            DoctorDayBitmap(
+                doctor_id=doctor_id, clinic_id=clinic_id, date=day,
+                free=free.to_bytes(CELLS // 8, "big"), busy=busy.to_bytes(CELLS // 8, "big"), free_count=n,
+            )
+            for (doctor_id, clinic_id, day), (free, busy, n) in days.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_history_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorDayBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('free', models.BinaryField(max_length=36)),
+                ('busy', models.BinaryField(max_length=36)),
+                ('free_count', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('clinic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_bitmaps', to='myapp.clinic')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_bitmaps', to='myapp.doctorprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doctor', 'date'], name='bitmap_doctor_date_idx')],
+                'unique_together': {('doctor', 'clinic', 'date')},
+            },
+        ),
+        migrations.RunPython(build_upcoming, migrations.RunPython.noop),
+    ]
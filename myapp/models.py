@@ -1,7 +1,9 @@
 from decimal import Decimal
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from datetime import timedelta
 import uuid, random
 from django.db.models.signals import post_save
@@ -68,6 +70,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_verified = models.BooleanField(default=False)
     is_approved = models.BooleanField(default=False)
+    # bumped to revoke every issued access token (see myapp/authentication.py)
+    token_version = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["full_name"]
@@ -76,31 +80,124 @@ class User(AbstractBaseUser, PermissionsMixin):
         return f"{self.full_name} ({self.role})"
 
 
+# =========================================================
+# 🔹 VERSION STAMP (cheap ETags)
+# =========================================================
+
+class VersionedModel(models.Model):
+    """
+    Keeps a version counter + updated_at that move on every save, so readers
+    can build an ETag without serializing anything. Related writes bump it
+    with a queryset update (see myapp/etags.py).
+    """
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version = (self.version or 0) + 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {"version", "updated_at"}
+        super().save(*args, **kwargs)
+
+
 # =========================================================
 # 🔹 EMAIL OTP
 # =========================================================
 
+OTP_TTL_MINUTES = getattr(settings, "OTP_EXPIRY_MINUTES", 10)
+OTP_MAX_ATTEMPTS = 5
+OTP_SWEEP_PROBABILITY = 0.01  # issue() also clears one small batch of expired rows now and then
+
+
+def _otp_expiry():
+    return timezone.now() + timedelta(minutes=OTP_TTL_MINUTES)
+
+
 class EmailOTP(models.Model):
+    """
+    One live code per email: issuing a new code deletes the older ones, and
+    verification only ever looks at the newest row via (email, created_at).
+    Each guess bumps `attempts` atomically; OTP_MAX_ATTEMPTS locks the code.
+    """
+    VERIFIED = "verified"
+    INVALID = "invalid"
+    EXPIRED = "expired"
+    LOCKED = "locked"
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     email = models.EmailField()
     code = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(default=_otp_expiry)
     attempts = models.IntegerField(default=0)
     verified = models.BooleanField(default=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["email", "-created_at"], name="emailotp_email_created_idx"),
+            models.Index(fields=["expires_at"], name="emailotp_expires_idx"),
+        ]
 
-    def is_valid(self, ttl_minutes=10):
-        if self.verified:
+    def is_valid(self):
+        if self.verified or self.attempts >= OTP_MAX_ATTEMPTS:
             return False
-        return timezone.now() < (self.created_at + timedelta(minutes=ttl_minutes))
+        return timezone.now() < self.expires_at
+
+    @classmethod
+    def issue(cls, email):
+        """New code for email; every older code for it stops working."""
+        code = f"{random.SystemRandom().randint(0, 999999):06d}"
+        with transaction.atomic():
+            cls.objects.filter(email=email).delete()
+            cls.objects.create(email=email, code=code)
+        if random.random() < OTP_SWEEP_PROBABILITY:
+            cls.sweep_expired(batch_size=500, max_batches=1)
+        return code
 
     @staticmethod
     def generate_otp(email):
-        code = f"{random.randint(0, 999999):06d}"
-        EmailOTP.objects.create(email=email, code=code)
-        return code
+        return EmailOTP.issue(email)
+
+    @classmethod
+    def verify(cls, email, code):
+        """Check a guess against the newest code; returns VERIFIED / INVALID / EXPIRED / LOCKED."""
+        otp = cls.objects.filter(email=email).order_by("-created_at").first()
+        if otp is None or otp.verified or otp.expires_at <= timezone.now():
+            return cls.EXPIRED
+
+        # the guard in the UPDATE makes the attempt count race-free across workers
+        counted = cls.objects.filter(pk=otp.pk, verified=False, attempts__lt=OTP_MAX_ATTEMPTS).update(
+            attempts=models.F("attempts") + 1
+        )
+        if not counted:
+            return cls.LOCKED
+        if not constant_time_compare(otp.code, str(code).strip()):
+            return cls.LOCKED if otp.attempts + 1 >= OTP_MAX_ATTEMPTS else cls.INVALID
+
+        # only one concurrent request may consume the code
+        consumed = cls.objects.filter(pk=otp.pk, verified=False).update(verified=True)
+        return cls.VERIFIED if consumed else cls.EXPIRED
+
+    @classmethod
+    def sweep_expired(cls, batch_size=5000, max_batches=None, now=None):
+        """Delete expired codes in bounded batches (index range scan on expires_at). Returns rows deleted."""
+        now = now or timezone.now()
+        deleted = batches = 0
+        while max_batches is None or batches < max_batches:
+            ids = list(cls.objects.filter(expires_at__lt=now).values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += cls.objects.filter(pk__in=ids).delete()[0]
+            batches += 1
+            if len(ids) < batch_size:
+                break
+        return deleted
 
 
 # =========================================================
@@ -141,7 +238,7 @@ class Clinic(models.Model):
         return self.name
 
 
-class DoctorProfile(models.Model):
+class DoctorProfile(VersionedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="doctor_profile")
     profile_image = models.ImageField(upload_to="doctor_profiles/", blank=True, null=True)
     specialization = models.ForeignKey(Specialization, on_delete=models.SET_NULL, null=True, blank=True)
@@ -175,6 +272,10 @@ class ClinicDoctorRequest(models.Model):
 
     class Meta:
         unique_together = ("doctor", "clinic")
+        indexes = [
+            models.Index(fields=["doctor", "status"], name="cdr_doctor_status_idx"),
+            models.Index(fields=["clinic", "status"], name="cdr_clinic_status_idx"),
+        ]
 
     def __str__(self):
         return f"{self.doctor.user.full_name} → {self.clinic.name} [{self.status}]"
@@ -204,12 +305,15 @@ class DoctorAvailability(models.Model):
 
     class Meta:
         unique_together = ("doctor", "clinic", "date", "start_time", "end_time")
+        indexes = [
+            models.Index(fields=["doctor", "date"], name="avail_doctor_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.doctor.user.full_name} - {self.clinic.name} - {self.date}"
 
 
-class TimeSlot(models.Model):
+class TimeSlot(VersionedModel):
     doctor = models.ForeignKey("DoctorProfile", on_delete=models.CASCADE)
     clinic = models.ForeignKey("Clinic", on_delete=models.CASCADE)
     start = models.DateTimeField()
@@ -217,10 +321,42 @@ class TimeSlot(models.Model):
     is_booked = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["doctor", "is_booked", "start"], name="slot_doctor_booked_start_idx"),
+            # public slot pickers only ever look at free slots; booked ones pile up behind them
+            models.Index(fields=["doctor", "start"], condition=models.Q(is_booked=False), name="slot_open_doctor_start_idx"),
+            models.Index(fields=["clinic", "start"], name="slot_clinic_start_idx"),
+        ]
+
     def __str__(self):
         return f"{self.doctor.user.full_name} ({self.start})"
 
 
+class DoctorDayBitmap(models.Model):
+    """
+    Free/busy index of one doctor's TimeSlots at one clinic on one local date,
+    at 5-minute cells (see myapp/bitmaps.py). Derived data: maintained by the
+    TimeSlot receivers, rebuilt with `manage.py rebuild_slot_bitmaps`.
+    """
+    doctor = models.ForeignKey("DoctorProfile", on_delete=models.CASCADE, related_name="day_bitmaps")
+    clinic = models.ForeignKey("Clinic", on_delete=models.CASCADE, related_name="day_bitmaps")
+    date = models.DateField()
+    free = models.BinaryField(max_length=36)   # cells where an unbooked slot starts
+    busy = models.BinaryField(max_length=36)   # cells covered by booked slots
+    free_count = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("doctor", "clinic", "date")
+        indexes = [
+            models.Index(fields=["doctor", "date"], name="bitmap_doctor_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.doctor_id}@{self.clinic_id} {self.date} ({self.free_count} free)"
+
+
 class WeeklyAvailability(models.Model):
     doctor = models.ForeignKey(User, on_delete=models.CASCADE)
     day_of_week = models.CharField(max_length=9)
@@ -273,6 +409,20 @@ class DoctorFeeManagement(models.Model):
         clinic_share = self.calculate_clinic_share()
         return Decimal(self.consultation_fee) - clinic_share
 
+    def split_amount(self, total_fee):
+        """
+        Split an amount actually paid into (clinic_share, doctor_earning).
+        Fixed clinic fee wins when set (capped at the amount), else percentage.
+        Same rule as settlement.split_vectorized, which applies it in bulk.
+        """
+        total_fee = Decimal(total_fee or 0)
+        if self.clinic_fixed_fee is not None:
+            clinic_share = min(Decimal(self.clinic_fixed_fee), total_fee)
+        else:
+            percent = Decimal(self.clinic_share_percent or 0)
+            clinic_share = (total_fee * percent / Decimal("100")).quantize(Decimal("0.01"))
+        return clinic_share, total_fee - clinic_share
+
 
 # =========================================================
 # 🔹 APPOINTMENT / PAYMENT / REVIEW
@@ -296,6 +446,12 @@ class Appointment(models.Model):
     paid = models.BooleanField(default=False)
     token_no = models.CharField(max_length=50, unique=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["doctor", "status", "timeslot"], name="appt_doctor_status_slot_idx"),
+            models.Index(fields=["clinic", "timeslot"], name="appt_clinic_slot_idx"),
+        ]
+
     def __str__(self):
         return f"{self.patient.full_name} -> {self.doctor.user.full_name}"
 
@@ -341,6 +497,120 @@ class ClinicRevenue(models.Model):
         return f"{self.clinic.name} ← {self.doctor.user.full_name}"
 
 
+# =========================================================
+# 🔹 SETTLEMENTS (PAYOUT STATEMENTS)
+# =========================================================
+
+class ImmutableModel(models.Model):
+    """Rows can be inserted once and never changed or deleted afterwards."""
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError(f"{type(self).__name__} records are immutable.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError(f"{type(self).__name__} records are immutable.")
+
+
+class SettlementRun(ImmutableModel):
+    period_start = models.DateField()
+    period_end = models.DateField()
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    appointment_count = models.PositiveIntegerField(default=0)
+    total_fee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    clinic_share = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    doctor_payout = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("period_start", "period_end")
+        ordering = ["-period_start"]
+
+    def __str__(self):
+        return f"Settlement {self.period_start} → {self.period_end}"
+
+
+class SettlementStatement(ImmutableModel):
+    run = models.ForeignKey(SettlementRun, on_delete=models.PROTECT, related_name="statements")
+    doctor = models.ForeignKey("DoctorProfile", on_delete=models.PROTECT, related_name="settlement_statements")
+    clinic = models.ForeignKey("Clinic", on_delete=models.PROTECT, related_name="settlement_statements")
+    appointment_count = models.PositiveIntegerField(default=0)
+    total_fee = models.DecimalField(max_digits=12, decimal_places=2)
+    clinic_share = models.DecimalField(max_digits=12, decimal_places=2)
+    doctor_payout = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("run", "doctor", "clinic")
+
+    def __str__(self):
+        return f"{self.run} - doctor #{self.doctor_id} @ clinic #{self.clinic_id}"
+
+
+class SettlementLine(ImmutableModel):
+    statement = models.ForeignKey(SettlementStatement, on_delete=models.PROTECT, related_name="lines")
+    # one line per appointment ever → an appointment can't be paid out twice
+    appointment = models.OneToOneField("Appointment", on_delete=models.PROTECT, related_name="settlement_line")
+    token_no = models.CharField(max_length=50)
+    visit_at = models.DateTimeField()
+    total_fee = models.DecimalField(max_digits=8, decimal_places=2)
+    clinic_share = models.DecimalField(max_digits=8, decimal_places=2)
+    doctor_payout = models.DecimalField(max_digits=8, decimal_places=2)
+
+
+# =========================================================
+# 🔹 ARCHIVE (PAST SLOTS / APPOINTMENTS)
+# =========================================================
+# Filled by myapp/archive.py (manage.py archive_history). Rows keep their
+# original ids; `month` is the local month of the visit, the unit
+# archived history is read and pruned by. Plain id columns, no FKs: archive
+# rows never block deletes on, or take locks in, the hot tables.
+
+class TimeSlotArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    doctor_id = models.BigIntegerField()
+    clinic_id = models.BigIntegerField()
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    month = models.DateField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["month", "doctor_id"], name="slotarch_month_doctor_idx"),
+            models.Index(fields=["month", "clinic_id"], name="slotarch_month_clinic_idx"),
+        ]
+
+
+class AppointmentArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    patient_id = models.BigIntegerField()
+    doctor_id = models.BigIntegerField()
+    clinic_id = models.BigIntegerField(null=True)
+    timeslot_id = models.BigIntegerField(null=True)
+    slot_start = models.DateTimeField(null=True)
+    slot_end = models.DateTimeField(null=True)
+    status = models.CharField(max_length=20)
+    created_at = models.DateTimeField()
+    notes = models.TextField(blank=True)
+    amount = models.DecimalField(max_digits=8, decimal_places=2, default=0.00)
+    paid = models.BooleanField(default=False)
+    token_no = models.CharField(max_length=50, db_index=True)
+    month = models.DateField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["month", "clinic_id"], name="apptarch_month_clinic_idx"),
+            models.Index(fields=["doctor_id", "month"], name="apptarch_doctor_month_idx"),
+            models.Index(fields=["patient_id", "month"], name="apptarch_patient_month_idx"),
+        ]
+
+
 # =========================================================
 # 🔹 PATIENT PROFILE / REPORT / REMINDER
 # =========================================================
@@ -412,6 +682,11 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="notif_user_created_idx"),
+        ]
+
     def __str__(self):
         return f"Notification for {self.user.email}"
 
@@ -457,12 +732,9 @@ def myapp_handle_payment_completed(sender, instance, created, **kwargs):
 
         if fee_record:
             try:
-                clinic_share = fee_record.calculate_clinic_share()
+                clinic_share, doctor_earning = fee_record.split_amount(total_fee)
             except:
-                clinic_share = Decimal("0.00")
-
-            clinic_share = min(clinic_share, total_fee)
-            doctor_earning = total_fee - clinic_share
+                clinic_share, doctor_earning = Decimal("0.00"), total_fee
 
         with transaction.atomic():
             ClinicRevenue.objects.create(
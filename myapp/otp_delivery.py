@@ -0,0 +1,326 @@
+# myapp/otp_delivery.py
+"""
+Asynchronous OTP delivery over email and SMS.
+
+send_otp only enqueues an OTPMessage and returns. A background worker thread
+in each process drains the queue, groups what it took by channel, and hands
+each group to its provider in one batch (one SMTP connection for the emails,
+one Twilio client for the texts). Each channel's batch runs on that channel's
+own small thread pool and must finish within OTP_BATCH_DEADLINE_SECONDS, so a
+stalled SMS provider can't hold up email OTPs. Messages a provider fails on,
+or that miss the deadline, fail over to the other channel when the user has an
+address there (a late provider may then still deliver a duplicate of the code).
+
+OTP_CHANNELS sets the preference order ("sms", "email"). OTP_DELIVERY_BACKEND
+"fake" swaps both providers for in-memory outboxes (offline dev / tests).
+"""
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+from .utils import build_otp_email
+
+OTP_CHANNELS = getattr(settings, "OTP_CHANNELS", ["sms", "email"])
+OTP_BATCH_SIZE = getattr(settings, "OTP_BATCH_SIZE", 50)
+OTP_BATCH_WAIT_SECONDS = getattr(settings, "OTP_BATCH_WAIT_SECONDS", 0.05)
+OTP_PROVIDER_TIMEOUT_SECONDS = getattr(settings, "OTP_PROVIDER_TIMEOUT_SECONDS", 10)
+OTP_BATCH_DEADLINE_SECONDS = getattr(settings, "OTP_BATCH_DEADLINE_SECONDS", 15)
+OTP_CHANNEL_WORKERS = getattr(settings, "OTP_CHANNEL_WORKERS", 2)
+OTP_SMS_DEFAULT_COUNTRY_CODE = getattr(settings, "OTP_SMS_DEFAULT_COUNTRY_CODE", "+91")
+
+OTPMessage = namedtuple("OTPMessage", ["email", "phone", "code", "channels", "enqueued_at"])
+
+
+class DeliveryError(Exception):
+    pass
+
+
+def _past(deadline):
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def normalize_phone(phone):
+    """'98765 43210' → '+919876543210'; None when there is nothing usable."""
+    if not phone:
+        return None
+    digits = "".join(ch for ch in str(phone) if ch.isdigit())
+    if str(phone).strip().startswith("+"):
+        return "+" + digits
+    if len(digits) == 10:
+        return OTP_SMS_DEFAULT_COUNTRY_CODE + digits
+    return "+" + digits if len(digits) > 10 else None
+
+
+# =========================================================
+# 🔹 CHANNELS
+# =========================================================
+class EmailChannel:
+    name = "email"
+
+    def address(self, message):
+        return message.email
+
+    def send_batch(self, messages, deadline=None):
+        """Send over one SMTP connection; returns the messages that failed (or weren't tried by the deadline)."""
+        connection = get_connection(timeout=OTP_PROVIDER_TIMEOUT_SECONDS)
+        failed = []
+        try:
+            connection.open()
+            for i, message in enumerate(messages):
+                if _past(deadline):
+                    failed.extend(messages[i:])
+                    break
+                try:
+                    build_otp_email(message.email, message.code, connection=connection).send()
+                except Exception as e:
+                    print(f"❌ OTP email to {message.email} failed:", e)
+                    failed.append(message)
+        except Exception as e:
+            print("❌ SMTP connection failed:", e)
+            return list(messages)
+        finally:
+            connection.close()
+        return failed
+
+
+class TwilioSMSChannel:
+    name = "sms"
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def configured(self):
+        return all(getattr(settings, key, None) for key in ("TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_FROM_NUMBER"))
+
+    def address(self, message):
+        return message.phone
+
+    def _get_client(self):
+        if self._client is None:
+            from twilio.http.http_client import TwilioHttpClient
+            from twilio.rest import Client
+
+            self._client = Client(
+                settings.TWILIO_ACCOUNT_SID,
+                settings.TWILIO_AUTH_TOKEN,
+                http_client=TwilioHttpClient(timeout=OTP_PROVIDER_TIMEOUT_SECONDS),
+            )
+        return self._client
+
+    def send_batch(self, messages, deadline=None):
+        if not self.configured:
+            return list(messages)
+        client, failed = self._get_client(), []
+        for i, message in enumerate(messages):
+            if _past(deadline):
+                failed.extend(messages[i:])
+                break
+            try:
+                client.messages.create(
+                    to=message.phone,
+                    from_=settings.TWILIO_FROM_NUMBER,
+                    body=f"Your Wellora OTP is {message.code}. Do not share it with anyone.",
+                )
+            except Exception as e:
+                print(f"❌ OTP SMS to {message.phone} failed:", e)
+                failed.append(message)
+        return failed
+
+
+class FakeChannel:
+    """
+    In-memory provider; set `failing = True` to exercise failover, or `delay`
+    (seconds per batch) to stall it past the batch deadline.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.outbox = []
+        self.failing = False
+        self.delay = 0
+        self.configured = True
+
+    def address(self, message):
+        return message.email if self.name == "email" else message.phone
+
+    def send_batch(self, messages, deadline=None):
+        if self.delay:
+            time.sleep(self.delay)
+        if self.failing:
+            return list(messages)
+        self.outbox.extend(messages)
+        return []
+
+
+def _build_channels():
+    if getattr(settings, "OTP_DELIVERY_BACKEND", "live") == "fake":
+        return {"email": FakeChannel("email"), "sms": FakeChannel("sms")}
+    return {"email": EmailChannel(), "sms": TwilioSMSChannel()}
+
+
+# =========================================================
+# 🔹 DISPATCHER
+# =========================================================
+class OTPDispatcher:
+    def __init__(self, channels=None, batch_deadline=OTP_BATCH_DEADLINE_SECONDS):
+        self.channels = channels or _build_channels()
+        self.batch_deadline = batch_deadline
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        # rounds: a batch waiting on its deadline doesn't stop the next one being picked up
+        self._rounds = ThreadPoolExecutor(max_workers=4, thread_name_prefix="otp-round")
+        self._pools = {
+            name: ThreadPoolExecutor(max_workers=OTP_CHANNEL_WORKERS, thread_name_prefix=f"otp-{name}")
+            for name in self.channels
+        }
+        self._latency = {name: deque(maxlen=500) for name in self.channels}
+        self._counts = {name: {"sent": 0, "failed": 0, "timed_out": 0, "failover_in": 0} for name in self.channels}
+        self.undelivered = 0
+
+    def channel_order(self, message):
+        usable = []
+        for name in message.channels:
+            channel = self.channels.get(name)
+            if channel and getattr(channel, "configured", True) and channel.address(message):
+                usable.append(name)
+        return usable
+
+    def enqueue(self, email, code, phone=None, prefer=None):
+        """Queue one OTP and return at once; returns the channel it will try first."""
+        order = list(OTP_CHANNELS)
+        if prefer in order:
+            order.remove(prefer)
+            order.insert(0, prefer)
+        message = OTPMessage(email, normalize_phone(phone), code, tuple(order), time.monotonic())
+        usable = self.channel_order(message)
+        self._ensure_worker()
+        self._queue.put(message)
+        return usable[0] if usable else None
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name="otp-delivery", daemon=True)
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + OTP_BATCH_WAIT_SECONDS
+            while len(batch) < OTP_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._rounds.submit(self._deliver_queued, batch)
+
+    def _deliver_queued(self, batch):
+        try:
+            self.deliver(batch)
+        except Exception as e:
+            print("❌ OTP delivery worker error:", e)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def deliver(self, messages):
+        """Try each message on its channels in order, one provider batch per round."""
+        pending = [(m, self.channel_order(m)) for m in messages]
+        first_round = True
+        while pending:
+            by_channel = {}
+            for message, order in pending:
+                if order:
+                    by_channel.setdefault(order[0], []).append((message, order[1:]))
+                else:
+                    self._undeliverable(message)
+
+            pending = []
+            for name, (items, failed, finished_at) in self._send_round(by_channel).items():
+                for message, rest in items:
+                    if id(message) in failed:
+                        self._record(name, "failed")
+                        pending.append((message, rest))
+                    else:
+                        self._record(name, "sent", latency=finished_at - message.enqueued_at)
+                        if not first_round:
+                            self._record(name, "failover_in")
+            first_round = False
+
+    def _send_round(self, by_channel):
+        """
+        One provider batch per channel, all channels at once on their own pools.
+        A batch still running at the deadline counts as failed in full.
+        Returns {channel: (items, ids of failed messages, when the batch finished)}.
+        """
+        deadline = time.monotonic() + self.batch_deadline
+        finished = {}
+        futures = {}
+        for name, items in by_channel.items():
+            futures[name] = self._pools[name].submit(self.channels[name].send_batch, [m for m, _ in items], deadline)
+            # latency is the channel's own, not the slowest channel's in the round
+            futures[name].add_done_callback(lambda _, name=name: finished.setdefault(name, time.monotonic()))
+        wait(futures.values(), timeout=self.batch_deadline)
+
+        results = {}
+        for name, future in futures.items():
+            items = by_channel[name]
+            if not future.done():
+                print(f"❌ OTP {name} batch missed its {self.batch_deadline}s deadline, failing over")
+                self._record(name, "timed_out", n=len(items))
+                failed = {id(m) for m, _ in items}
+            elif future.exception() is not None:
+                print(f"❌ OTP {name} batch failed:", future.exception())
+                failed = {id(m) for m, _ in items}
+            else:
+                failed = {id(m) for m in future.result()}
+            results[name] = (items, failed, finished.get(name, time.monotonic()))
+        return results
+
+    def _undeliverable(self, message):
+        with self._stats_lock:
+            self.undelivered += 1
+        print(f"❌ OTP for {message.email} could not be delivered on any channel")
+        if settings.DEBUG:
+            print(f"OTP for {message.email} = {message.code}")
+
+    def _record(self, name, counter, latency=None, n=1):
+        with self._stats_lock:
+            self._counts[name][counter] += n
+            if latency is not None:
+                self._latency[name].append(latency)
+
+    def flush(self, timeout=5):
+        """Block until everything queued so far was handled (tests / shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def stats(self):
+        with self._stats_lock:
+            channels = {}
+            for name, counts in self._counts.items():
+                samples = sorted(self._latency[name])
+                channels[name] = {
+                    **counts,
+                    "latency_avg_ms": round(1000 * sum(samples) / len(samples), 1) if samples else None,
+                    "latency_p95_ms": round(1000 * samples[int(0.95 * (len(samples) - 1))], 1) if samples else None,
+                }
+            return {"queued": self._queue.qsize(), "undelivered": self.undelivered, "channels": channels}
+
+
+dispatcher = OTPDispatcher()
+
+
+def deliver_otp(email, code, phone=None, prefer=None):
+    return dispatcher.enqueue(email, code, phone=phone, prefer=prefer)
@@ -1,10 +1,14 @@
+from django.db.models import F, Min, Q
 from django.utils import timezone
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from . import bitmaps
+from . import slots as slot_engine
+from .loaders import get_loader
 from .models import (
     ClinicDoctorRequest, ClinicRevenue, DoctorFeeManagement, DoctorProfile, Appointment, Notification, Payment, 
     PatientProfile, MedicalReport, Reminder, Review, DoctorAvailability, 
-    TimeSlot, HomeImage, Specialization, Clinic
+    TimeSlot, HomeImage, Specialization, Clinic, SettlementRun, SettlementStatement
 )
 
 User = get_user_model()
@@ -81,7 +85,7 @@ class DoctorDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_clinics(self, obj):
-        approved = ClinicDoctorRequest.objects.filter(doctor=obj, status="approved").select_related("clinic")
+        approved = get_loader(self.context.get("request")).approved_links(obj.id)
         return [
             {
                 "id": r.clinic.id,
@@ -188,11 +192,63 @@ class DoctorListSerializer(serializers.ModelSerializer):
             return obj.profile_image.url
         return None
 
+    @staticmethod
+    def prime(request, doctors):
+        """
+        Batch-load what the per-doctor fields need, so a page of doctors costs
+        a fixed number of queries instead of several per doctor.
+        """
+        loader = get_loader(request)
+        ids = [d.id for d in doctors]
+        if not ids:
+            return
+        loader.prime_approved(ids)
+
+        latest_fee = {}
+        for record in DoctorFeeManagement.objects.filter(doctor_id__in=ids).order_by("doctor_id", "-updated_at"):
+            latest_fee.setdefault(record.doctor_id, record)
+
+        if slot_engine.is_virtual():
+            today = timezone.localdate()
+            today_free = slot_engine.virtual_free_slots(ids, today, today, approved_only=True)
+            next_slots = slot_engine.first_free_slots(ids, today, approved_only=True)
+            for pk in ids:
+                loader.put(("fee_record", pk), latest_fee.get(pk))
+                loader.put(("today_slots", pk), len(today_free.get(pk, [])))
+                loader.put(("next_slot", pk), next_slots.get(pk))
+            return
+
+        # open slots at clinics the doctor is approved at (one ClinicDoctorRequest per doctor/clinic)
+        open_slots = TimeSlot.objects.filter(
+            doctor_id__in=ids,
+            is_booked=False,
+            clinic__doctor_requests__doctor=F("doctor"),
+            clinic__doctor_requests__status="approved",
+        )
+        today_counts = bitmaps.free_counts(
+            ids, timezone.localdate(), {pk: set(loader.approved_clinic_ids(pk)) for pk in ids},
+        )
+        first_starts = dict(
+            open_slots.filter(start__gte=timezone.now())
+            .values("doctor_id").annotate(first=Min("start")).values_list("doctor_id", "first")
+        )
+        next_slots = {}
+        if first_starts:
+            match = Q()
+            for doctor_id, start in first_starts.items():
+                match |= Q(doctor_id=doctor_id, start=start)
+            for slot in open_slots.filter(match).select_related("clinic").order_by("id"):
+                next_slots.setdefault(slot.doctor_id, slot)
+
+        for pk in ids:
+            loader.put(("fee_record", pk), latest_fee.get(pk))
+            loader.put(("today_slots", pk), today_counts.get(pk, 0))
+            loader.put(("next_slot", pk), next_slots.get(pk))
+
     def get_consultation_fee(self, obj):
-        fee_record = (
-            DoctorFeeManagement.objects.filter(doctor=obj)
-            .order_by("-updated_at")
-            .first()
+        fee_record = get_loader(self.context.get("request")).get(
+            ("fee_record", obj.id),
+            lambda: DoctorFeeManagement.objects.filter(doctor=obj).order_by("-updated_at").first(),
         )
         if fee_record and fee_record.consultation_fee:
             return float(fee_record.consultation_fee or 0)
@@ -202,9 +258,7 @@ class DoctorListSerializer(serializers.ModelSerializer):
     # NEW: Clinics (approved)
     # ===========================================
     def get_clinics(self, obj):
-        links = ClinicDoctorRequest.objects.filter(
-            doctor=obj, status="approved"
-        ).select_related("clinic")
+        links = get_loader(self.context.get("request")).approved_links(obj.id)
 
         return [
             {
@@ -218,81 +272,60 @@ class DoctorListSerializer(serializers.ModelSerializer):
     # NEW: Primary clinic name
     # ===========================================
     def get_primary_clinic_name(self, obj):
-        links = ClinicDoctorRequest.objects.filter(
-            doctor=obj, status="approved"
-        ).select_related("clinic")
+        links = get_loader(self.context.get("request")).approved_links(obj.id)
 
         if not links:
             return None
 
-        return links.first().clinic.name
+        return links[0].clinic.name
 
     # ===========================================
     # NEW: Today's slot count
     # ===========================================
     def get_today_slots(self, obj):
-        today = timezone.localdate()
+        loader = get_loader(self.context.get("request"))
 
-        # approved clinics
-        clinic_ids = ClinicDoctorRequest.objects.filter(
-            doctor=obj, status="approved"
-        ).values_list("clinic_id", flat=True)
+        def load():
+            if slot_engine.is_virtual():
+                today = timezone.localdate()
+                return len(slot_engine.virtual_free_slots([obj.id], today, today, approved_only=True).get(obj.id, []))
+            # approved clinics
+            clinic_ids = loader.approved_clinic_ids(obj.id)
+            return bitmaps.free_count(obj.id, timezone.localdate(), clinic_ids)
 
-        qs = TimeSlot.objects.filter(
-            doctor=obj,
-            clinic_id__in=clinic_ids,
-            is_booked=False,
-            start__date=today,
-        ).count()
-
-        return qs
+        return loader.get(("today_slots", obj.id), load)
 
     # ===========================================
     # NEW: Next available slot datetime
     # ===========================================
-    def get_next_available(self, obj):
-        now = timezone.now()
-
-        clinic_ids = ClinicDoctorRequest.objects.filter(
-            doctor=obj, status="approved"
-        ).values_list("clinic_id", flat=True)
-
-        slot = (
-            TimeSlot.objects.filter(
-                doctor=obj,
-                clinic_id__in=clinic_ids,
-                is_booked=False,
-                start__gte=now,
+    def _next_slot(self, obj):
+        def load():
+            if slot_engine.is_virtual():
+                return slot_engine.first_free_slots([obj.id], timezone.localdate(), approved_only=True).get(obj.id)
+            clinic_ids = get_loader(self.context.get("request")).approved_clinic_ids(obj.id)
+            return (
+                TimeSlot.objects.filter(
+                    doctor=obj,
+                    clinic_id__in=clinic_ids,
+                    is_booked=False,
+                    start__gte=timezone.now(),
+                )
+                .select_related("clinic")
+                .order_by("start")
+                .first()
             )
-            .select_related("clinic")
-            .order_by("start")
-            .first()
-        )
 
+        return get_loader(self.context.get("request")).get(("next_slot", obj.id), load)
+
+    def get_next_available(self, obj):
+        slot = self._next_slot(obj)
         return slot.start.isoformat() if slot else None
 
     # ===========================================
     # NEW: Next available clinic name
     # ===========================================
     def get_next_available_clinic(self, obj):
-        now = timezone.now()
-
-        clinic_ids = ClinicDoctorRequest.objects.filter(
-            doctor=obj, status="approved"
-        ).values_list("clinic_id", flat=True)
-
-        slot = (
-            TimeSlot.objects.filter(
-                doctor=obj,
-                clinic_id__in=clinic_ids,
-                is_booked=False,
-                start__gte=now,
-            )
-            .select_related("clinic")
-            .order_by("start")
-            .first()
-        )
-
+        slot = self._next_slot(obj)
         return slot.clinic.name if slot and slot.clinic else None
 
 
@@ -318,7 +351,7 @@ class DoctorScheduleSerializer(serializers.ModelSerializer):
     clinic = serializers.CharField(source="clinic.name", read_only=True)
     clinic_id = serializers.IntegerField(source="clinic.id", read_only=True)
 
-    doctor_id = serializers.IntegerField(source="doctor.id", read_only=True)
+    doctor_id = serializers.IntegerField(read_only=True)
     timeslot_id = serializers.IntegerField(source="timeslot.id", read_only=True)
 
     date = serializers.SerializerMethodField()
@@ -399,14 +432,11 @@ class ClinicSerializer(serializers.ModelSerializer):
 
     # ✅ Total doctors (approved + pending)
     def get_total_doctors(self, obj):
-        return ClinicDoctorRequest.objects.filter(clinic=obj).count()
+        return len(get_loader(self.context.get("request")).clinic_links(obj.id))
 
     # ✅ Approved doctors → full DoctorProfile data
     def get_approved_doctors(self, obj):
-        approved_requests = (
-            ClinicDoctorRequest.objects.filter(clinic=obj, status="approved")
-            .select_related("doctor__user", "doctor__specialization")
-        )
+        approved_requests = get_loader(self.context.get("request")).clinic_links(obj.id, status="approved")
 
         doctors = [r.doctor for r in approved_requests]
         if not doctors:
@@ -415,7 +445,7 @@ class ClinicSerializer(serializers.ModelSerializer):
 
     # ✅ Pending requests count
     def get_pending_requests(self, obj):
-        return ClinicDoctorRequest.objects.filter(clinic=obj, status="pending").count()
+        return len(get_loader(self.context.get("request")).clinic_links(obj.id, status="pending"))
 
     # ✅ Custom create method to auto-assign logged-in owner
     def create(self, validated_data):
@@ -487,6 +517,31 @@ class ClinicRevenueSerializer(serializers.ModelSerializer):
         except Exception:
             return None
 
+# ---------------------- SETTLEMENTS ----------------------
+class SettlementStatementSerializer(serializers.ModelSerializer):
+    doctor_name = serializers.CharField(source="doctor.user.full_name", read_only=True)
+    clinic_name = serializers.CharField(source="clinic.name", read_only=True)
+    period_start = serializers.DateField(source="run.period_start", read_only=True)
+    period_end = serializers.DateField(source="run.period_end", read_only=True)
+
+    class Meta:
+        model = SettlementStatement
+        fields = [
+            "id", "run", "period_start", "period_end",
+            "doctor", "doctor_name", "clinic", "clinic_name",
+            "appointment_count", "total_fee", "clinic_share", "doctor_payout", "created_at",
+        ]
+
+
+class SettlementRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SettlementRun
+        fields = [
+            "id", "period_start", "period_end", "appointment_count",
+            "total_fee", "clinic_share", "doctor_payout", "created_at",
+        ]
+
+
 # ---------------------- REVIEW ----------------------
 class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,187 @@
+# myapp/settlement.py
+"""
+Batch settlement: split every paid appointment of a period between doctor and
+clinic in one vectorized pass and persist immutable payout statements.
+"""
+import csv
+import io
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import (
+    Appointment,
+    DoctorFeeManagement,
+    SettlementLine,
+    SettlementRun,
+    SettlementStatement,
+)
+
+LINE_BATCH_SIZE = 1000
+
+_APPT_COLUMNS = ["appointment_id", "doctor_id", "clinic_id", "token_no", "visit_at", "amount"]
+_FEE_COLUMNS = ["doctor_id", "clinic_id", "clinic_share_percent", "clinic_fixed_fee"]
+
+
+class SettlementError(Exception):
+    pass
+
+
+def _paise(series):
+    """Decimal/None column → int64 paise, so the maths stays exact."""
+    return (pd.to_numeric(series, errors="coerce").fillna(0) * 100).round().astype("int64")
+
+
+def split_vectorized(amount_paise, percent, fixed_paise):
+    """
+    Vectorized twin of DoctorFeeManagement.split_amount:
+    fixed fee (capped at the amount) when set, otherwise a percentage.
+    Returns (clinic_share_paise, doctor_payout_paise).
+    """
+    amount_paise = np.asarray(amount_paise, dtype="int64")
+    percent = np.nan_to_num(np.asarray(percent, dtype="float64"))
+    fixed = np.asarray(fixed_paise, dtype="float64")
+
+    by_percent = np.rint(amount_paise * percent / 100.0).astype("int64")
+    by_fixed = np.minimum(np.rint(np.nan_to_num(fixed)).astype("int64"), amount_paise)  # 19.99 * 100 = 1998.999…
+    clinic_share = np.where(np.isnan(fixed), by_percent, by_fixed)
+    return clinic_share, amount_paise - clinic_share
+
+
+def _to_money(paise):
+    return Decimal(int(paise)) / 100
+
+
+def load_period_frame(period_start, period_end):
+    """All paid, not-yet-settled appointments visited within the period (local dates)."""
+    rows = (
+        Appointment.objects.filter(
+            paid=True,
+            clinic__isnull=False,
+            timeslot__start__date__gte=period_start,
+            timeslot__start__date__lte=period_end,
+            settlement_line__isnull=True,
+        )
+        .exclude(status="cancelled")
+        .values_list("id", "doctor_id", "clinic_id", "token_no", "timeslot__start", "amount")
+    )
+    appts = pd.DataFrame.from_records(list(rows), columns=_APPT_COLUMNS)
+    if appts.empty:
+        return appts
+
+    fees = pd.DataFrame.from_records(
+        list(DoctorFeeManagement.objects.values_list(*_FEE_COLUMNS)), columns=_FEE_COLUMNS
+    )
+    df = appts.merge(fees, on=["doctor_id", "clinic_id"], how="left")
+
+    # no fee configuration → whole amount goes to the doctor (same as the payment signal)
+    percent = pd.to_numeric(df["clinic_share_percent"], errors="coerce").fillna(0).to_numpy()
+    fixed = pd.to_numeric(df["clinic_fixed_fee"], errors="coerce").to_numpy(dtype="float64") * 100
+    df["amount_paise"] = _paise(df["amount"])
+    df["clinic_paise"], df["doctor_paise"] = split_vectorized(df["amount_paise"].to_numpy(), percent, fixed)
+    return df
+
+
+def settle_period(period_start, period_end, created_by=None):
+    if period_end < period_start:
+        raise SettlementError("period_end must not be before period_start.")
+    if SettlementRun.objects.filter(period_start=period_start, period_end=period_end).exists():
+        raise SettlementError("This period has already been settled.")
+
+    df = load_period_frame(period_start, period_end)
+
+    with transaction.atomic():
+        if df.empty:
+            return SettlementRun.objects.create(
+                period_start=period_start, period_end=period_end, created_by=created_by
+            )
+
+        grouped = (
+            df.groupby(["doctor_id", "clinic_id"], sort=True)
+            .agg(
+                appointment_count=("appointment_id", "size"),
+                amount_paise=("amount_paise", "sum"),
+                clinic_paise=("clinic_paise", "sum"),
+                doctor_paise=("doctor_paise", "sum"),
+            )
+            .reset_index()
+        )
+
+        run = SettlementRun.objects.create(
+            period_start=period_start,
+            period_end=period_end,
+            created_by=created_by,
+            appointment_count=len(df),
+            total_fee=_to_money(df["amount_paise"].sum()),
+            clinic_share=_to_money(df["clinic_paise"].sum()),
+            doctor_payout=_to_money(df["doctor_paise"].sum()),
+        )
+
+        SettlementStatement.objects.bulk_create(
+            [
+                SettlementStatement(
+                    run=run,
+                    doctor_id=int(g.doctor_id),
+                    clinic_id=int(g.clinic_id),
+                    appointment_count=int(g.appointment_count),
+                    total_fee=_to_money(g.amount_paise),
+                    clinic_share=_to_money(g.clinic_paise),
+                    doctor_payout=_to_money(g.doctor_paise),
+                )
+                for g in grouped.itertuples(index=False)
+            ],
+            batch_size=LINE_BATCH_SIZE,
+        )
+
+        # one query to map (doctor, clinic) → statement id; works on every backend
+        statement_ids = {
+            (d, c): pk
+            for pk, d, c in SettlementStatement.objects.filter(run=run).values_list("id", "doctor_id", "clinic_id")
+        }
+
+        SettlementLine.objects.bulk_create(
+            [
+                SettlementLine(
+                    statement_id=statement_ids[(int(r.doctor_id), int(r.clinic_id))],
+                    appointment_id=int(r.appointment_id),
+                    token_no=r.token_no,
+                    visit_at=r.visit_at,
+                    total_fee=_to_money(r.amount_paise),
+                    clinic_share=_to_money(r.clinic_paise),
+                    doctor_payout=_to_money(r.doctor_paise),
+                )
+                for r in df.itertuples(index=False)
+            ],
+            batch_size=LINE_BATCH_SIZE,
+        )
+
+    return run
+
+
+def statement_csv(statement):
+    """Render one statement (summary + its appointment lines) as CSV text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["statement_id", "period_start", "period_end", "doctor", "clinic"])
+    writer.writerow([
+        statement.id,
+        statement.run.period_start,
+        statement.run.period_end,
+        statement.doctor.user.full_name,
+        statement.clinic.name,
+    ])
+    writer.writerow([])
+    writer.writerow(["token_no", "visit_at", "total_fee", "clinic_share", "doctor_payout"])
+    for token_no, visit_at, *amounts in statement.lines.order_by("visit_at").values_list(
+        "token_no", "visit_at", "total_fee", "clinic_share", "doctor_payout"
+    ):
+        writer.writerow([token_no, timezone.localtime(visit_at).strftime("%Y-%m-%d %H:%M"), *amounts])
+    totals = statement.lines.aggregate(
+        total_fee=Sum("total_fee"), clinic_share=Sum("clinic_share"), doctor_payout=Sum("doctor_payout")
+    )
+    writer.writerow(["TOTAL", "", totals["total_fee"], totals["clinic_share"], totals["doctor_payout"]])
+    return buffer.getvalue()
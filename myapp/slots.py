@@ -0,0 +1,472 @@
+# myapp/slots.py
+"""
+Free-slot lookup for the public slot pickers, the doctor list and booking,
+and the TimeSlot writes behind availability windows.
+
+Two modes (settings.SLOT_MODE):
+
+  * "materialized" (default): every availability window is exploded into
+    TimeSlot rows when it is saved; free slots are the rows with
+    is_booked=False.
+  * "virtual": windows are stored as-is and free slots are computed on read as
+    DoctorAvailability minus the doctor's booked TimeSlots (any clinic), cut
+    on each window's slot_duration grid. A TimeSlot row only exists once a
+    slot is booked: claim() materializes it under a lock on the window.
+    Virtual slot ids look like "v<clinic>-<YYYYmmddHHMM local>-<minutes>".
+
+`manage.py bench_slots` compares read latency and row counts of the two.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import bitmaps
+from . import cache as public_cache
+from .models import DoctorAvailability, DoctorProfile, TimeSlot
+
+VIRTUAL_HORIZON_DAYS = getattr(settings, "VIRTUAL_SLOT_HORIZON_DAYS", 60)
+
+_VIRTUAL_ID = re.compile(r"^v(\d+)-(\d{12})-(\d+)$")
+
+
+def is_virtual():
+    return getattr(settings, "SLOT_MODE", "materialized") == "virtual"
+
+
+class VirtualSlot(namedtuple("VirtualSlot", "id doctor_id clinic_id clinic_name start end")):
+    """Read-side stand-in for a TimeSlot row (start, end, clinic.name)."""
+    __slots__ = ()
+
+    @property
+    def clinic(self):
+        return SimpleNamespace(id=self.clinic_id, name=self.clinic_name)
+
+
+def virtual_slot_id(clinic_id, start, minutes):
+    return f"v{clinic_id}-{timezone.localtime(start):%Y%m%d%H%M}-{minutes}"
+
+
+def parse_virtual_slot_id(value):
+    """→ (clinic_id, aware start, minutes), or None when value isn't a virtual id."""
+    match = _VIRTUAL_ID.match(str(value or ""))
+    if not match:
+        return None
+    clinic_id, stamp, minutes = match.groups()
+    try:
+        start = timezone.make_aware(datetime.strptime(stamp, "%Y%m%d%H%M"))
+    except ValueError:
+        return None
+    return int(clinic_id), start, int(minutes)
+
+
+def local_day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    return start, start + timedelta(days=1)
+
+
+def window_bounds(day, start_time, end_time):
+    return (
+        timezone.make_aware(datetime.combine(day, start_time)),
+        timezone.make_aware(datetime.combine(day, end_time)),
+    )
+
+
+# =========================================================
+# 🔹 INTERVAL SUBTRACTION
+# =========================================================
+def merge_intervals(intervals):
+    """Sorted, non-overlapping union of (start, end) pairs."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(window, busy, busy_ends=None):
+    """
+    window minus busy, where busy is merge_intervals() output. Starts at the
+    first busy interval ending after the window opens (bisect), so each call
+    is O(log n + overlaps).
+    """
+    start, end = window
+    if busy_ends is None:
+        busy_ends = [e for _, e in busy]
+    free, cursor = [], start
+    i = bisect_right(busy_ends, start)
+    while i < len(busy) and busy[i][0] < end:
+        busy_start, busy_end = busy[i]
+        if busy_start > cursor:
+            free.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+        i += 1
+    if cursor < end:
+        free.append((cursor, end))
+    return free
+
+
+def grid_starts(origin, step, free):
+    """Starts of the origin + k*step cells that fit entirely inside a free interval."""
+    for free_start, free_end in free:
+        k = max(0, -(-(free_start - origin) // step))  # ceil
+        cursor = origin + k * step
+        while cursor + step <= free_end:
+            yield cursor
+            cursor += step
+
+
+# =========================================================
+# 🔹 WINDOW OVERLAPS (one doctor, across clinics)
+# =========================================================
+Window = namedtuple("Window", "id clinic_id clinic_name start end")
+
+
+class WindowIndex:
+    """
+    A doctor's availability windows sorted by start, with the running maximum
+    end ("reach"), so overlap lookups are a bisect plus the hits themselves:
+    everything before the insertion point of `end` starts early enough, and
+    walking back stops as soon as the reach falls to `start`.
+    """
+
+    def __init__(self, windows):
+        self.windows = sorted(windows, key=lambda w: (w.start, w.end))
+        self.starts = [w.start for w in self.windows]
+        self.reach, top = [], None
+        for w in self.windows:
+            top = w.end if top is None or w.end > top else top
+            self.reach.append(top)
+
+    @classmethod
+    def for_doctor(cls, doctor_id, first_day, last_day, exclude=None):
+        """Pending and approved windows on first_day..last_day (one query)."""
+        rows = DoctorAvailability.objects.filter(
+            doctor_id=doctor_id, date__gte=first_day, date__lte=last_day,
+        ).exclude(status="rejected")
+        if exclude is not None:
+            rows = rows.exclude(exclude)
+        return cls(
+            Window(pk, clinic_id, clinic_name, *window_bounds(day, start_time, end_time))
+            for pk, clinic_id, clinic_name, day, start_time, end_time in rows.values_list(
+                "id", "clinic_id", "clinic__name", "date", "start_time", "end_time",
+            )
+        )
+
+    def overlapping(self, start, end):
+        hits = []
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.reach[i] > start:
+            if self.windows[i].end > start:
+                hits.append(self.windows[i])
+            i -= 1
+        hits.reverse()
+        return hits
+
+
+def window_conflict(window):
+    local_start, local_end = timezone.localtime(window.start), timezone.localtime(window.end)
+    return {
+        "availability_id": window.id,
+        "clinic_id": window.clinic_id,
+        "clinic_name": window.clinic_name,
+        "date": local_start.date().isoformat(),
+        "start_time": local_start.strftime("%H:%M"),
+        "end_time": local_end.strftime("%H:%M"),
+    }
+
+
+# =========================================================
+# 🔹 VIRTUAL MODE
+# =========================================================
+def _busy_by_doctor(doctor_ids, lo, hi):
+    busy = defaultdict(list)
+    rows = TimeSlot.objects.filter(
+        doctor_id__in=doctor_ids, is_booked=True, start__lt=hi, end__gt=lo,
+    ).values_list("doctor_id", "start", "end")
+    for doctor_id, start, end in rows:
+        busy[doctor_id].append((start, end))
+    return {doctor_id: merge_intervals(spans) for doctor_id, spans in busy.items()}
+
+
+def _open_windows(doctor_ids, first_day, last_day, now=None, approved_only=False):
+    """
+    Yield (doctor_id, clinic_id, clinic_name, minutes, free starts) per approved
+    window in the date range; `free starts` is a lazy generator of grid starts
+    >= now that don't overlap any of the doctor's booked slots.
+    """
+    now = now or timezone.now()
+    windows = DoctorAvailability.objects.filter(
+        doctor_id__in=doctor_ids, date__gte=first_day, date__lte=last_day, status="approved",
+    )
+    if approved_only:
+        # only clinics the doctor is (still) approved at, like the materialized doctor list
+        windows = windows.filter(
+            clinic__doctor_requests__doctor=F("doctor"), clinic__doctor_requests__status="approved",
+        )
+    windows = windows.values_list(
+        "doctor_id", "clinic_id", "clinic__name", "date", "start_time", "end_time", "slot_duration",
+    )
+
+    lo, _ = local_day_bounds(first_day)
+    _, hi = local_day_bounds(last_day)
+    busy = _busy_by_doctor(doctor_ids, lo, hi)
+    busy_ends = {doctor_id: [e for _, e in spans] for doctor_id, spans in busy.items()}
+
+    for doctor_id, clinic_id, clinic_name, day, start_time, end_time, minutes in windows:
+        minutes = minutes or 30
+        window_start, window_end = window_bounds(day, start_time, end_time)
+        if window_end <= now:
+            continue
+        # nothing before `now` can be booked: clip the window, keep its grid origin
+        gaps = subtract_intervals(
+            (max(window_start, now), window_end), busy.get(doctor_id, []), busy_ends.get(doctor_id, []),
+        )
+        yield doctor_id, clinic_id, clinic_name, minutes, grid_starts(window_start, timedelta(minutes=minutes), gaps)
+
+
+def virtual_free_slots(doctor_ids, first_day, last_day, now=None, approved_only=False):
+    """{doctor_id: [VirtualSlot, ...] by start} for the days first_day..last_day, from now on."""
+    free = defaultdict(list)
+    for doctor_id, clinic_id, clinic_name, minutes, starts in _open_windows(
+        doctor_ids, first_day, last_day, now, approved_only,
+    ):
+        step = timedelta(minutes=minutes)
+        free[doctor_id].extend(
+            VirtualSlot(virtual_slot_id(clinic_id, start, minutes), doctor_id, clinic_id, clinic_name, start, start + step)
+            for start in starts
+        )
+    for slots in free.values():
+        slots.sort(key=lambda s: (s.start, s.clinic_id))
+    return free
+
+
+def first_free_slots(doctor_ids, first_day, days=VIRTUAL_HORIZON_DAYS, chunk=7, now=None, approved_only=False):
+    """{doctor_id: earliest VirtualSlot} within `days`, expanding `chunk` days at a time."""
+    first = {}
+    pending = list(doctor_ids)
+    day, last_day = first_day, first_day + timedelta(days=days)
+    while pending and day <= last_day:
+        chunk_end = min(day + timedelta(days=chunk - 1), last_day)
+        found = virtual_free_slots(pending, day, chunk_end, now=now, approved_only=approved_only)
+        for doctor_id, slots in found.items():
+            first[doctor_id] = slots[0]
+        pending = [doctor_id for doctor_id in pending if doctor_id not in first]
+        day = chunk_end + timedelta(days=1)
+    return first
+
+
+@transaction.atomic
+def claim(slot_ref, doctor_id, clinic_id=None):
+    """
+    Book virtual slot `slot_ref` for doctor_id: returns the booked TimeSlot,
+    or None when the id is malformed, off-grid, in the past, outside every
+    approved window or overlapping a booked slot (at any clinic).
+
+    The doctor's row is locked (SELECT … FOR UPDATE, as availability edits do),
+    so concurrent claims for one doctor run one after another whatever clinic
+    or duration they target, and the overlap check (the day's busy bitmaps,
+    refreshed inside the booking transaction) stays valid.
+    """
+    parsed = parse_virtual_slot_id(slot_ref)
+    if parsed is None:
+        return None
+    slot_clinic_id, start, minutes = parsed
+    if clinic_id is not None and int(clinic_id) != slot_clinic_id:
+        return None
+    if start < timezone.now():
+        return None
+
+    if DoctorProfile.objects.select_for_update().filter(pk=doctor_id).first() is None:
+        return None
+
+    step = timedelta(minutes=minutes)
+    end = start + step
+    windows = DoctorAvailability.objects.filter(
+        doctor_id=doctor_id, clinic_id=slot_clinic_id, date=timezone.localtime(start).date(),
+        status="approved", slot_duration=minutes,
+    )
+    on_grid = False
+    for window in windows:
+        window_start, window_end = window_bounds(window.date, window.start_time, window.end_time)
+        if window_start <= start and end <= window_end and (start - window_start) % step == timedelta(0):
+            on_grid = True
+    if not on_grid:
+        return None
+
+    if not bitmaps.is_free(doctor_id, start, end):
+        return None
+
+    slot = TimeSlot.objects.filter(
+        doctor_id=doctor_id, clinic_id=slot_clinic_id, start=start, end=end, is_booked=False,
+    ).first()
+    if slot is None:
+        return TimeSlot.objects.create(doctor_id=doctor_id, clinic_id=slot_clinic_id, start=start, end=end, is_booked=True)
+    slot.is_booked = True
+    slot.save(update_fields=["is_booked"])
+    return slot
+
+
+# =========================================================
+# 🔹 WRITES (materialized rows for a window)
+# =========================================================
+def window_slots(day, start_time, end_time, minutes):
+    """(start, end) of every slot of a window, on its slot_duration grid."""
+    window = window_bounds(day, start_time, end_time)
+    step = timedelta(minutes=minutes)
+    return [(start, start + step) for start in grid_starts(window[0], step, [window])]
+
+
+def _day_rows(doctor_id, day, clinic_id=None):
+    lo, hi = local_day_bounds(day)
+    rows = TimeSlot.objects.filter(doctor_id=doctor_id, start__gte=lo, start__lt=hi)
+    if clinic_id is not None:
+        rows = rows.filter(clinic_id=clinic_id)
+    return list(rows.values_list("id", "start", "end", "is_booked"))
+
+
+def _slots_written(doctor_id, clinic_id, day):
+    # bulk_create sends no signals
+    bitmaps.touch(doctor_id, clinic_id, day)
+    public_cache.bump(public_cache.slots_ns(doctor_id), public_cache.DOCTOR_LIST)
+
+
+def add_window_slots(doctor_id, clinic_id, day, start_time, end_time, minutes):
+    """Create the window's missing slots in one insert; returns how many."""
+    taken = {(start, end) for _, start, end, _ in _day_rows(doctor_id, day)}
+    new = [(start, end) for start, end in window_slots(day, start_time, end_time, minutes) if (start, end) not in taken]
+    if new:
+        TimeSlot.objects.bulk_create(
+            [TimeSlot(doctor_id=doctor_id, clinic_id=clinic_id, start=start, end=end) for start, end in new]
+        )
+        _slots_written(doctor_id, clinic_id, day)
+    return len(new)
+
+
+def diff_window_slots(rows, window, minutes):
+    """
+    Plan moving a clinic-day's rows (id, start, end, is_booked) to one window.
+
+    → (create, delete_ids, stray_booked). Booked rows are never touched: new
+    slots skip whatever they cover, and booked rows outside the window are
+    returned as stray_booked for the caller to refuse the edit.
+    """
+    step = timedelta(minutes=minutes)
+    booked = [(start, end) for _, start, end, is_booked in rows if is_booked]
+    stray = [(pk, start, end) for pk, start, end, is_booked in rows if is_booked and (start < window[0] or end > window[1])]
+    busy = merge_intervals(booked)
+    wanted = {(start, start + step) for start in grid_starts(window[0], step, subtract_intervals(window, busy))}
+
+    free = {}
+    delete_ids = []
+    for pk, start, end, is_booked in rows:
+        if is_booked:
+            continue
+        if (start, end) in wanted and (start, end) not in free:
+            free[(start, end)] = pk
+        else:
+            delete_ids.append(pk)  # off the new grid, or a duplicate
+    create = sorted(wanted - set(free))
+    return create, delete_ids, stray
+
+
+def sync_window_slots(doctor_id, clinic_id, day, start_time, end_time, minutes):
+    """
+    Make the clinic-day's slots match the window, writing only the
+    difference. Returns (changes, stray_booked); nothing is written when
+    stray_booked is non-empty. In virtual mode there are no free rows to
+    keep in step, only booked ones to protect.
+    """
+    rows = _day_rows(doctor_id, day, clinic_id)
+    window = window_bounds(day, start_time, end_time)
+    create, delete_ids, stray = diff_window_slots(rows, window, minutes)
+    if stray:
+        return None, [{
+            "id": pk,
+            "start": timezone.localtime(start).strftime("%H:%M"),
+            "end": timezone.localtime(end).strftime("%H:%M"),
+        } for pk, start, end in stray]
+    if is_virtual():
+        return {"created": 0, "deleted": 0, "kept": 0, "booked": sum(1 for r in rows if r[3])}, []
+
+    with bitmaps.batched():
+        if delete_ids:
+            TimeSlot.objects.filter(pk__in=delete_ids).delete()
+        if create:
+            TimeSlot.objects.bulk_create(
+                [TimeSlot(doctor_id=doctor_id, clinic_id=clinic_id, start=start, end=end) for start, end in create]
+            )
+            _slots_written(doctor_id, clinic_id, day)
+    booked = sum(1 for r in rows if r[3])
+    return {
+        "created": len(create),
+        "deleted": len(delete_ids),
+        "kept": len(rows) - booked - len(delete_ids),
+        "booked": booked,
+    }, []
+
+
+# =========================================================
+# 🔹 READS (mode-independent entry points)
+# =========================================================
+def _slot_dict(slot_id, start, end, clinic_id, clinic_name, local_tz):
+    return {
+        "id": slot_id,
+        "start": start.astimezone(local_tz).strftime("%H:%M"),
+        "end": end.astimezone(local_tz).strftime("%H:%M"),
+        "clinic_id": clinic_id,
+        "clinic_name": clinic_name or "Unknown Clinic",
+    }
+
+
+def materialized_day_slots(doctor_id, day):
+    local_tz = timezone.get_current_timezone()
+    day_start, day_end = local_day_bounds(day)
+    slots = (
+        TimeSlot.objects.filter(
+            doctor_id=doctor_id, is_booked=False, start__gte=day_start, start__lt=day_end
+        )
+        .order_by("start")
+        .values_list("id", "start", "end", "clinic_id", "clinic__name")
+    )
+    return [_slot_dict(*row, local_tz) for row in slots]
+
+
+def virtual_day_slots(doctor_id, day):
+    local_tz = timezone.get_current_timezone()
+    slots = virtual_free_slots([doctor_id], day, day).get(doctor_id, [])
+    return [_slot_dict(s.id, s.start, s.end, s.clinic_id, s.clinic_name, local_tz) for s in slots]
+
+
+def day_slots(doctor_id, day):
+    """Free slots of a doctor on a local date, as the public slot picker shows them."""
+    return virtual_day_slots(doctor_id, day) if is_virtual() else materialized_day_slots(doctor_id, day)
+
+
+def materialized_available_dates(doctor_id):
+    # one bitmap row per doctor/clinic/day instead of every future free slot
+    return [d.isoformat() for d in bitmaps.dates_with_free(doctor_id, timezone.localdate())]
+
+
+def virtual_available_dates(doctor_id):
+    today = timezone.localdate()
+    dates = set()
+    for *_, starts in _open_windows([doctor_id], today, today + timedelta(days=VIRTUAL_HORIZON_DAYS)):
+        first = next(starts, None)  # one free cell is enough for the date
+        if first is not None:
+            dates.add(timezone.localtime(first).date().isoformat())
+    return sorted(dates)
+
+
+def available_dates(doctor_id):
+    """Local dates, from today on, with at least one free slot."""
+    return virtual_available_dates(doctor_id) if is_virtual() else materialized_available_dates(doctor_id)
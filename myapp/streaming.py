@@ -0,0 +1,140 @@
+# myapp/streaming.py
+"""
+Server-Sent Events plumbing for the async chat / symptom endpoints.
+
+Run under an ASGI server (uvicorn workers) so a slow completion parks a
+coroutine instead of a WSGI thread. Two guards keep chat traffic from
+starving booking requests on the same worker:
+  * STREAM_MAX_CONCURRENT  - streams open at once per worker (semaphore)
+  * RATE_LIMITS["chat_stream:ip"] / ["chat_stream:user"] - new streams per
+    client IP and per signed-in user (sliding window)
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .authentication import ClaimsJWTAuthentication
+from .throttling import client_ip, limiter
+
+STREAM_MAX_CONCURRENT = getattr(settings, "STREAM_MAX_CONCURRENT", 32)
+STREAM_QUEUE_SECONDS = getattr(settings, "STREAM_QUEUE_SECONDS", 2)
+
+_semaphore = None
+
+
+def _get_semaphore():
+    # created on first use, inside the worker's event loop
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(STREAM_MAX_CONCURRENT)
+    return _semaphore
+
+
+def _user_identity(request):
+    """Same identity as UserThrottle: the bearer token's user, else the client IP."""
+    try:
+        result = ClaimsJWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        result = None
+    return f"u{result[0].pk}" if result else f"ip{client_ip(request)}"
+
+
+async def rate_limit(request):
+    """(allowed, retry_after) for a new stream: per client IP, then per user."""
+    rates = getattr(settings, "RATE_LIMITS", {})
+    for kind, identity in (("ip", client_ip), ("user", _user_identity)):
+        rate = rates.get(f"chat_stream:{kind}")
+        if not rate:
+            continue
+        ident = await sync_to_async(identity)(request)
+        allowed, retry_after = await sync_to_async(limiter.hit)(f"chat_stream:{kind}", ident, rate)
+        if not allowed:
+            return False, retry_after
+    return True, 0
+
+
+def sse(data, event=None):
+    payload = data if isinstance(data, str) else json.dumps(data)
+    lines = [f"event: {event}"] if event else []
+    lines += [f"data: {line}" for line in payload.split("\n")]
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_json_body(request):
+    try:
+        return json.loads(request.body or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+async def open_stream(request, events):
+    """
+    Apply the per-IP limit and the per-worker concurrency cap, then stream the
+    async iterator `events` (already SSE-formatted strings) to the client.
+    """
+    allowed, retry_after = await rate_limit(request)
+    if not allowed:
+        response = JsonResponse({"error": "Too many requests. Please slow down."}, status=429)
+        response["Retry-After"] = str(retry_after)
+        return response
+
+    semaphore = _get_semaphore()
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=STREAM_QUEUE_SECONDS)
+    except asyncio.TimeoutError:
+        response = JsonResponse({"error": "Assistant is busy. Please retry shortly."}, status=503)
+        response["Retry-After"] = str(STREAM_QUEUE_SECONDS)
+        return response
+    slot = _StreamSlot(semaphore)
+
+    async def guarded():
+        try:
+            async for chunk in events:
+                yield chunk
+        except Exception as e:
+            print("❌ Stream error:", e)
+            yield sse({"error": "The assistant is unavailable right now."}, event="error")
+        finally:
+            slot.release()
+
+    response = EventStreamResponse(guarded(), on_close=slot.release)
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: flush each event
+    return response
+
+
+class _StreamSlot:
+    """
+    One acquired semaphore permit, released once: when the stream ends, or when
+    the response is closed without ever being iterated (client gone before the
+    first chunk, so the generator's finally never runs).
+    """
+
+    def __init__(self, semaphore):
+        self.semaphore = semaphore
+        self.loop = asyncio.get_running_loop()
+        self.held = True
+
+    def release(self):
+        if self.held:
+            self.held = False
+            # response.close() runs in a sync_to_async thread; the semaphore isn't thread-safe
+            self.loop.call_soon_threadsafe(self.semaphore.release)
+
+
+class EventStreamResponse(StreamingHttpResponse):
+    def __init__(self, events, on_close):
+        super().__init__(events, content_type="text/event-stream")
+        self._on_close = on_close
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._on_close()
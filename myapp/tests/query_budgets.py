@@ -0,0 +1,204 @@
+"""
+Per-endpoint query budgets.
+
+Each QueryBudget names a GET endpoint, who calls it, the most queries it may
+run, and a seeder that adds `n` more of the rows the endpoint lists. The
+runner (test_query_budgets) calls every endpoint with 1 row and then with
+N rows: the count must not grow with N, and must stay within the budget.
+
+Add an entry here when adding a list/detail endpoint.
+"""
+import itertools
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from myapp.models import (
+    Appointment, Clinic, ClinicDoctorRequest, ClinicRevenue, DoctorAvailability,
+    DoctorFeeManagement, DoctorProfile, MedicalReport, Notification, PatientProfile,
+    Payment, Review, Specialization, TimeSlot, User,
+)
+
+QueryBudget = namedtuple("QueryBudget", ["name", "url", "as_user", "budget", "seed"])
+
+_ids = itertools.count(1)
+
+
+class World:
+    """The rows every endpoint needs: one clinic, its owner, a doctor and a patient."""
+
+    def __init__(self):
+        self.specialization = Specialization.objects.create(name="Cardiologist")
+        self.owner = make_user("clinic_owner", is_active=True)
+        self.clinic = make_clinic(self.owner)
+        self.doctor = make_doctor(self.specialization)
+        approve(self.doctor, self.clinic)
+        self.patient = make_user("patient")
+        PatientProfile.objects.create(user=self.patient, full_name="Patient")
+
+
+# =========================================================
+# 🔹 FACTORIES
+# =========================================================
+def make_user(role, **extra):
+    n = next(_ids)
+    return User.objects.create_user(email=f"{role}{n}@budget.test", role=role, full_name=f"{role} {n}", **extra)
+
+
+def make_clinic(owner=None):
+    owner = owner or make_user("clinic_owner", is_active=True)
+    return Clinic.objects.create(owner=owner, name=f"Clinic {next(_ids)}", address="-", is_verified=True)
+
+
+def make_doctor(specialization=None):
+    return DoctorProfile.objects.create(user=make_user("doctor"), specialization=specialization, is_verified=True)
+
+
+def approve(doctor, clinic, status="approved"):
+    return ClinicDoctorRequest.objects.create(doctor=doctor, clinic=clinic, status=status)
+
+
+def make_slot(doctor, clinic, days=1, booked=False):
+    start = timezone.now().replace(microsecond=0) + timedelta(days=days, minutes=next(_ids))
+    return TimeSlot.objects.create(doctor=doctor, clinic=clinic, start=start, end=start + timedelta(minutes=30), is_booked=booked)
+
+
+def make_appointment(doctor, clinic, patient=None, status="confirmed"):
+    if patient is None:
+        patient = make_user("patient")
+        PatientProfile.objects.create(user=patient, full_name=patient.full_name, dob="1990-01-01")
+    return Appointment.objects.create(
+        patient=patient, doctor=doctor, clinic=clinic, timeslot=make_slot(doctor, clinic, booked=True),
+        status=status, token_no=f"BUDGET-{next(_ids)}", amount=Decimal("500"),
+    )
+
+
+# =========================================================
+# 🔹 SEEDERS  (world, n) → add n listed rows
+# =========================================================
+def seed_doctors(w, n):
+    for _ in range(n):
+        doctor = make_doctor(w.specialization)
+        approve(doctor, w.clinic)
+        make_slot(doctor, w.clinic, days=0)
+        make_slot(doctor, w.clinic, days=2)
+        DoctorFeeManagement.objects.create(doctor=doctor, clinic=w.clinic, consultation_fee=Decimal("400"))
+
+
+def seed_clinics(w, n):
+    for _ in range(n):
+        clinic = make_clinic()
+        approve(make_doctor(w.specialization), clinic)
+        approve(make_doctor(w.specialization), clinic, status="pending")
+
+
+def seed_clinic_doctors(w, n):
+    for _ in range(n):
+        approve(make_doctor(w.specialization), w.clinic)
+
+
+def seed_doctor_clinics(w, n):
+    for _ in range(n):
+        clinic = make_clinic()
+        approve(w.doctor, clinic)
+        DoctorFeeManagement.objects.create(doctor=w.doctor, clinic=clinic, consultation_fee=Decimal("300"))
+        DoctorAvailability.objects.create(
+            doctor=w.doctor, clinic=clinic, date=timezone.localdate() + timedelta(days=1),
+            start_time="09:00", end_time="12:00", status="approved",
+        )
+
+
+def seed_doctor_requests(w, n):
+    for _ in range(n):
+        approve(w.doctor, make_clinic(), status="pending")
+
+
+def seed_owner_requests(w, n):
+    for _ in range(n):
+        approve(make_doctor(w.specialization), w.clinic, status="pending")
+
+
+def seed_doctor_appointments(w, n):
+    for _ in range(n):
+        make_appointment(w.doctor, w.clinic)
+
+
+def seed_patient_appointments(w, n):
+    for _ in range(n):
+        doctor = make_doctor(w.specialization)
+        make_appointment(doctor, make_clinic(), patient=w.patient)
+
+
+def seed_clinic_appointments(w, n):
+    for _ in range(n):
+        make_appointment(make_doctor(w.specialization), w.clinic)
+
+
+def seed_payments(w, n):
+    for _ in range(n):
+        appointment = make_appointment(make_doctor(w.specialization), make_clinic(), patient=w.patient)
+        Payment.objects.create(appointment=appointment, order_id=f"order_{next(_ids)}", amount=appointment.amount)
+
+
+def seed_revenues(w, n):
+    for _ in range(n):
+        doctor = make_doctor(w.specialization)
+        appointment = make_appointment(doctor, w.clinic)
+        ClinicRevenue.objects.create(
+            clinic=w.clinic, doctor=doctor, appointment=appointment,
+            total_fee=Decimal("500"), clinic_share=Decimal("100"), doctor_earning=Decimal("400"),
+        )
+
+
+def seed_availabilities(w, n):
+    for _ in range(n):
+        clinic = make_clinic()
+        approve(w.doctor, clinic)
+        DoctorAvailability.objects.create(
+            doctor=w.doctor, clinic=clinic, date=timezone.localdate() + timedelta(days=1),
+            start_time="09:00", end_time="12:00", status="approved",
+        )
+
+
+def seed_notifications(w, n):
+    for _ in range(n):
+        Notification.objects.create(user=w.patient, title="t", message="m")
+
+
+def seed_reviews(w, n):
+    for _ in range(n):
+        Review.objects.create(doctor=w.doctor, user=make_user("patient"), rating=5)
+
+
+def seed_reports(w, n):
+    profile = PatientProfile.objects.get(user=w.patient)
+    for _ in range(n):
+        MedicalReport.objects.create(patient=profile, file=f"reports/r{next(_ids)}.pdf")
+
+
+# =========================================================
+# 🔹 REGISTRY
+# =========================================================
+BUDGETS = [
+    QueryBudget("doctor list", "/api/doctors/", None, 8, seed_doctors),
+    QueryBudget("doctor detail", "/api/doctors/{w.doctor.id}/", None, 6, seed_doctor_clinics),
+    QueryBudget("doctor clinics (public)", "/api/doctor/{w.doctor.id}/clinics/", None, 4, seed_doctor_clinics),
+    QueryBudget("clinic list", "/api/clinics/", None, 4, seed_clinics),
+    QueryBudget("clinic detail", "/api/clinics/{w.clinic.id}/", None, 5, seed_clinic_doctors),
+    QueryBudget("doctor schedule", "/api/doctor/schedule/", "doctor", 4, seed_doctor_appointments),
+    QueryBudget("doctor appointments", "/api/doctor/appointments/", "doctor", 3, seed_doctor_appointments),
+    QueryBudget("doctor clinic requests", "/api/doctor/clinic-requests/", "doctor", 3, seed_doctor_requests),
+    QueryBudget("doctor approved clinics", "/api/doctor/approved-clinics/", "doctor", 3, seed_doctor_clinics),
+    QueryBudget("doctor fees", "/api/doctor/fee-management/", "doctor", 3, seed_doctor_clinics),
+    QueryBudget("doctor availability", "/api/doctor/availability/", "doctor", 3, seed_availabilities),
+    QueryBudget("doctor reviews", "/api/reviews/", "doctor", 3, seed_reviews),
+    QueryBudget("patient appointments", "/api/appointments/", "patient", 3, seed_patient_appointments),
+    QueryBudget("patient payments", "/api/payments/", "patient", 3, seed_payments),
+    QueryBudget("patient notifications", "/api/notifications/", "patient", 3, seed_notifications),
+    QueryBudget("patient reports", "/api/patient/reports/", "patient", 3, seed_reports),
+    QueryBudget("clinic appointments", "/api/clinic/appointments/", "owner", 3, seed_clinic_appointments),
+    QueryBudget("clinic doctor requests", "/api/clinic/doctor-requests/", "owner", 3, seed_owner_requests),
+    QueryBudget("clinic revenues", "/api/clinic/revenues/", "owner", 3, seed_revenues),
+]
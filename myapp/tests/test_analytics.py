@@ -0,0 +1,107 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp.analytics import clinic_report
+from myapp.authentication import tokens_for
+from myapp.models import Appointment, ClinicRevenue, TimeSlot
+
+from .query_budgets import World, approve, make_clinic, make_doctor, make_user
+
+
+class ClinicReportTests(TestCase):
+    """
+    One day at the clinic: Dr A has four slots (10:00-11:30), three booked
+    as paid / unpaid / cancelled appointments; Dr B has two open slots.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.world = World()
+        self.clinic, self.a = self.world.clinic, self.world.doctor
+        self.b = make_doctor(self.world.specialization)
+        approve(self.b, self.clinic)
+        self.day = timezone.localdate() - timedelta(days=2)
+
+        slots = [self.slot(self.a, 10), self.slot(self.a, 10, 30), self.slot(self.a, 11), self.slot(self.a, 11, 30)]
+        self.slot(self.b, 15), self.slot(self.b, 15, 30)
+        self.slot(self.a, 9, day=self.day - timedelta(days=10))  # outside the period
+
+        paid = self.book(slots[0], "confirmed", paid=True)
+        self.book(slots[1], "confirmed")
+        self.book(slots[2], "cancelled")
+        ClinicRevenue.objects.create(
+            clinic=self.clinic, doctor=self.a, appointment=paid,
+            total_fee=Decimal("500"), clinic_share=Decimal("100"), doctor_earning=Decimal("400"),
+        )
+
+    def slot(self, doctor, hour, minute=0, day=None):
+        start = timezone.make_aware(datetime.combine(day or self.day, time(hour, minute)))
+        return TimeSlot.objects.create(doctor=doctor, clinic=self.clinic, start=start, end=start + timedelta(minutes=30))
+
+    def book(self, slot, status, paid=False):
+        slot.is_booked = True
+        slot.save()
+        return Appointment.objects.create(
+            patient=self.world.patient, doctor=slot.doctor, clinic=self.clinic, timeslot=slot,
+            status=status, paid=paid, token_no=f"AN-{slot.id}", amount=Decimal("500"),
+        )
+
+    def report(self, clinic_id=None, **kwargs):
+        return clinic_report(clinic_id or self.clinic.id, self.day - timedelta(days=1), self.day, **kwargs)
+
+    def test_summary(self):
+        self.assertEqual(self.report()["summary"], {
+            "total_slots": 6, "booked_slots": 3, "free_slots": 3, "booked_ratio": 0.5,
+            "appointments": 3, "cancellation_rate": 0.3333,
+            "unpaid_rate": 0.5,  # one of the two kept appointments was never paid
+            "revenue": 500.0,
+        })
+
+    def test_per_doctor(self):
+        a, b = self.report()["doctors"]
+        self.assertEqual((a["doctor_id"], b["doctor_id"]), (self.a.id, self.b.id))
+        self.assertEqual(
+            (a["total_slots"], a["booked_slots"], a["booked_ratio"], a["cancellation_rate"], a["unpaid_rate"]),
+            (4, 3, 0.75, 0.3333, 0.5),
+        )
+        self.assertEqual((a["revenue"], a["clinic_share"]), (500.0, 100.0))
+        self.assertEqual((b["total_slots"], b["free_slots"], b["appointments"], b["unpaid_rate"]), (2, 2, 0, 0.0))
+
+    def test_heatmap(self):
+        heatmap = self.report()["heatmap"]
+        weekday = self.day.weekday()
+        self.assertEqual([heatmap["total_slots"][weekday][h] for h in (10, 11, 15)], [2, 2, 2])
+        self.assertEqual([heatmap["utilization"][weekday][h] for h in (10, 11, 15)], [1.0, 0.5, 0.0])
+        self.assertEqual(sum(map(sum, heatmap["total_slots"])), 6)
+
+    def test_lead_time(self):
+        lead = self.report()["lead_time"]
+        self.assertEqual(lead["count"], 3)
+        # booked "after" the visit in this fixture: clipped to zero hours
+        self.assertEqual(lead["buckets"]["same_day"], 3)
+
+    def test_empty_clinic(self):
+        report = self.report(make_clinic().id)
+        self.assertEqual(report["summary"], {
+            "total_slots": 0, "booked_slots": 0, "free_slots": 0, "booked_ratio": 0.0,
+            "appointments": 0, "cancellation_rate": 0.0, "unpaid_rate": 0.0, "revenue": 0.0,
+        })
+        self.assertEqual(report["doctors"], [])
+        self.assertEqual(sum(map(sum, report["heatmap"]["total_slots"])), 0)
+        self.assertEqual(report["lead_time"]["count"], 0)
+
+    def test_cached_until_refresh(self):
+        self.assertEqual(self.report()["summary"]["total_slots"], 6)
+        self.slot(self.b, 16)
+        self.assertEqual(self.report()["summary"]["total_slots"], 6)
+        self.assertEqual(self.report(refresh=True)["summary"]["total_slots"], 7)
+
+    def test_endpoint_is_owner_only(self):
+        url = f"/api/clinic/{self.clinic.id}/analytics/?from={self.day.isoformat()}&to={self.day.isoformat()}"
+        for user, code in ((self.world.owner, 200), (make_user("clinic_owner", is_active=True), 403)):
+            access, _ = tokens_for(user)
+            self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION=f"Bearer {access}").status_code, code)
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp.archive import archive_history, archivable_appointments, pending_counts
+from myapp.models import (
+    Appointment, AppointmentArchive, ClinicRevenue, Payment, Reminder, TimeSlot, TimeSlotArchive,
+)
+
+from .query_budgets import World
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.world = World()
+        self.cutoff = timezone.now() - timedelta(days=30)
+        self.tokens = iter(range(1000))
+
+    def slot(self, days_ago, booked=False):
+        start = timezone.now() - timedelta(days=days_ago)
+        return TimeSlot.objects.create(
+            doctor=self.world.doctor, clinic=self.world.clinic, start=start, end=start + timedelta(minutes=30),
+            is_booked=booked,
+        )
+
+    def appointment(self, slot, **extra):
+        return Appointment.objects.create(
+            patient=self.world.patient, doctor=self.world.doctor, clinic=self.world.clinic, timeslot=slot,
+            token_no=f"ARCH-{next(self.tokens)}", amount=Decimal("500"), **extra,
+        )
+
+    def test_old_history_moves_and_recent_rows_stay(self):
+        old_free = self.slot(60)
+        old_booked = self.slot(60, booked=True)
+        old_appt = self.appointment(old_booked, status="confirmed")
+        Reminder.objects.create(user=self.world.patient, appointment=old_appt, message="t")
+        recent = self.slot(5, booked=True)
+        recent_appt = self.appointment(recent)
+
+        stats = archive_history(self.cutoff, batch_size=1)
+
+        self.assertEqual(stats, {"appointments": 1, "slots_archived": 1, "slots_deleted": 1, "batches": 3})
+        self.assertFalse(TimeSlot.objects.filter(pk__in=[old_free.pk, old_booked.pk]).exists())
+        self.assertFalse(Appointment.objects.filter(pk=old_appt.pk).exists())
+        self.assertTrue(Appointment.objects.filter(pk=recent_appt.pk).exists())
+        self.assertTrue(TimeSlot.objects.filter(pk=recent.pk).exists())
+
+        archived = AppointmentArchive.objects.get(pk=old_appt.pk)
+        self.assertEqual((archived.token_no, archived.slot_start), (old_appt.token_no, old_booked.start))
+        self.assertEqual(archived.month, timezone.localtime(old_booked.start).date().replace(day=1))
+        self.assertTrue(TimeSlotArchive.objects.filter(pk=old_booked.pk).exists())
+        self.assertFalse(TimeSlotArchive.objects.filter(pk=old_free.pk).exists())
+
+    def test_appointments_with_money_attached_are_kept_with_their_slots(self):
+        paid = self.appointment(self.slot(60, booked=True), paid=True)
+        with_payment = self.appointment(self.slot(61, booked=True))
+        Payment.objects.create(appointment=with_payment, order_id="order_arch", amount=Decimal("500"))
+        with_revenue = self.appointment(self.slot(62, booked=True))
+        ClinicRevenue.objects.create(
+            clinic=self.world.clinic, doctor=self.world.doctor, appointment=with_revenue,
+            total_fee=Decimal("500"), clinic_share=Decimal("100"), doctor_earning=Decimal("400"),
+        )
+
+        self.assertEqual(archivable_appointments(self.cutoff).count(), 0)
+        archive_history(self.cutoff)
+
+        self.assertEqual(Appointment.objects.filter(pk__in=[paid.pk, with_payment.pk, with_revenue.pk]).count(), 3)
+        self.assertEqual(TimeSlot.objects.count(), 3)
+        self.assertFalse(AppointmentArchive.objects.exists())
+
+    def test_max_batches_bounds_a_run(self):
+        for days in range(40, 45):
+            self.slot(days)
+        self.assertEqual(pending_counts(self.cutoff)["slots_free"], 5)
+
+        stats = archive_history(self.cutoff, batch_size=2, max_batches=2)
+
+        self.assertEqual((stats["slots_deleted"], stats["batches"]), (4, 2))
+        self.assertEqual(pending_counts(self.cutoff)["slots_free"], 1)
@@ -0,0 +1,33 @@
+from django.test import TestCase, override_settings
+
+from myapp import llm, matcher
+from myapp.models import Specialization, Symptom
+
+
+@override_settings(LLM_BACKEND="fake")
+class AnalyzeSymptomsTests(TestCase):
+    def setUp(self):
+        dentist = Specialization.objects.create(name="Dentist")
+        Symptom.objects.create(name="Toothache", specialization=dentist)
+        Symptom.objects.create(name="Bleeding gums", specialization=dentist)
+        matcher.invalidate()
+        llm.analysis_cache.clear()
+        llm._clients.clear()
+        self.addCleanup(llm._clients.clear)
+
+    def analyze(self, symptoms):
+        return self.client.post("/api/analyze-symptoms/", {"symptoms": symptoms}, content_type="application/json").json()
+
+    def test_confident_match_answers_from_symptom_rows_without_the_llm(self):
+        calls = llm._fake_llm.calls
+        body = self.analyze("toothache and bleeding gums")
+        self.assertEqual(
+            (body["source"], body["specialist"], body["conditions"]),
+            ("matcher", "Dentist", ["Toothache", "Bleeding gums"]),
+        )
+        self.assertEqual(llm._fake_llm.calls, calls)
+
+    def test_low_confidence_asks_the_llm(self):
+        self.assertLess(matcher.match("feeling strange lately").confidence, matcher.MATCHER_MIN_CONFIDENCE)
+        body = self.analyze("feeling strange lately")
+        self.assertEqual((body["source"], body["conditions"]), ("llm", ["Viral fever", "Common cold"]))
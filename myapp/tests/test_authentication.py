@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp.authentication import tokens_for, user_from_claims
+from myapp.models import User
+
+from .query_budgets import make_user
+
+
+class RevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()  # token versions are cached per user id, and ids repeat across tests
+        self.admin = make_user(User.ROLE_PATIENT, is_staff=True)
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {tokens_for(self.admin)[0]}"}
+
+    def get(self):
+        return self.client.get("/api/rate-limits/stats/", **self.auth)
+
+    def test_demotion_rejects_the_existing_access_token(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.admin.is_staff = False
+        self.admin.save(update_fields=["is_staff"])
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_unrelated_edits_keep_the_token(self):
+        self.admin.full_name = "Renamed"
+        self.admin.save(update_fields=["full_name"])
+        self.assertEqual(self.get().status_code, 200)
+
+
+class ClaimsUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_claims_user_has_the_real_primary_key(self):
+        user = make_user(User.ROLE_CLINIC_OWNER, is_active=True)
+        claims_user = user_from_claims(AccessToken(tokens_for(user)[0]))
+        self.assertEqual(claims_user.pk, user.pk)
+        self.assertEqual(claims_user, user)
+
+
+class ClinicCreationTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user(User.ROLE_CLINIC_OWNER, is_active=True)
+        self.access = tokens_for(self.owner)[0]
+
+    def clinics(self, access):
+        return self.client.get("/api/clinics/", HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_new_clinic_comes_with_fresh_tokens(self):
+        response = self.client.post(
+            "/api/clinics/", {"name": "Second", "address": "-"}, content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.access}",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        body = response.json()
+        self.assertEqual(body["name"], "Second")
+
+        self.assertEqual(self.clinics(self.access).status_code, 401)  # clinic_ids claim is stale
+        listed = self.clinics(body["access"])
+        self.assertEqual(listed.status_code, 200)
+        self.assertEqual([c["id"] for c in listed.json()], [body["id"]])
+
+        refreshed = self.client.post("/api/token/refresh/", {"refresh": body["refresh"]}, content_type="application/json")
+        self.assertEqual(refreshed.status_code, 200)
@@ -0,0 +1,89 @@
+from datetime import datetime, time, timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from myapp import slots
+from myapp.authentication import tokens_for
+from myapp.models import Appointment, DoctorAvailability, DoctorDayBitmap, TimeSlot
+
+from .query_budgets import World
+
+
+def at(hour, minute=0):
+    return timezone.make_aware(datetime(2030, 1, 7, hour, minute))
+
+
+class DiffTests(SimpleTestCase):
+    def test_only_the_difference_is_written_and_booked_rows_are_kept(self):
+        rows = [
+            (1, at(9), at(9, 30), False),
+            (2, at(9, 30), at(10), True),
+            (3, at(10), at(10, 30), False),
+            (4, at(10), at(10, 30), False),   # duplicate
+            (5, at(10, 30), at(11), False),
+        ]
+        create, delete_ids, stray = slots.diff_window_slots(rows, (at(9, 30), at(12)), 30)
+        self.assertEqual(create, [(at(11), at(11, 30)), (at(11, 30), at(12))])
+        self.assertEqual(sorted(delete_ids), [1, 4])
+        self.assertEqual(stray, [])
+
+        _, _, stray = slots.diff_window_slots(rows, (at(10), at(12)), 30)
+        self.assertEqual(stray, [(2, at(9, 30), at(10))])
+
+    def test_new_slots_stay_on_the_window_grid_around_booked_rows(self):
+        rows = [(7, at(9, 10), at(9, 40), True)]
+        create, _, _ = slots.diff_window_slots(rows, (at(9), at(11)), 30)
+        self.assertEqual([start for start, _ in create], [at(10), at(10, 30)])
+
+
+class AvailabilityEditTests(TestCase):
+    def setUp(self):
+        self.world = World()
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {tokens_for(self.world.doctor.user)[0]}"}
+
+    def edit(self, start_time, end_time):
+        return self.client.post(
+            "/api/doctor/availability/",
+            {
+                "doctor": self.world.doctor.id, "clinic_id": self.world.clinic.id, "date": self.day.isoformat(),
+                "start_time": start_time, "end_time": end_time,
+            },
+            content_type="application/json", **self.auth,
+        )
+
+    def starts(self):
+        return [
+            timezone.localtime(s).strftime("%H:%M")
+            for s in TimeSlot.objects.filter(doctor=self.world.doctor).order_by("start").values_list("start", flat=True)
+        ]
+
+    def test_edits_keep_booked_slots_and_refuse_to_strand_them(self):
+        response = self.edit("09:00", "11:00")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["slots"], {"created": 4, "deleted": 0, "kept": 0, "booked": 0})
+
+        booked = TimeSlot.objects.get(
+            doctor=self.world.doctor, start=timezone.make_aware(datetime.combine(self.day, time(9, 30))),
+        )
+        appointment = Appointment.objects.create(
+            patient=self.world.patient, doctor=self.world.doctor, clinic=self.world.clinic,
+            timeslot=booked, status="confirmed", token_no="EDIT-1",
+        )
+        booked.is_booked = True
+        booked.save(update_fields=["is_booked"])
+
+        response = self.edit("09:30", "12:00")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["slots"], {"created": 2, "deleted": 1, "kept": 2, "booked": 1})
+        self.assertEqual(self.starts(), ["09:30", "10:00", "10:30", "11:00", "11:30"])
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.timeslot_id, booked.id)
+        self.assertEqual(DoctorAvailability.objects.filter(doctor=self.world.doctor).count(), 1)
+        self.assertEqual(DoctorDayBitmap.objects.get(doctor=self.world.doctor).free_count, 4)
+
+        response = self.edit("10:00", "12:00")
+        self.assertEqual(response.status_code, 409, response.content)
+        self.assertEqual(response.json()["booked_slots"], [{"id": booked.id, "start": "09:30", "end": "10:00"}])
+        self.assertEqual(self.starts(), ["09:30", "10:00", "10:30", "11:00", "11:30"])
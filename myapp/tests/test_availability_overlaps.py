@@ -0,0 +1,75 @@
+from datetime import datetime, time, timedelta
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from myapp import slots
+from myapp.authentication import tokens_for
+from myapp.models import DoctorAvailability
+
+from .query_budgets import World, approve, make_clinic
+
+
+def at(hour, minute=0):
+    return timezone.make_aware(datetime(2030, 1, 7, hour, minute))
+
+
+class WindowIndexTests(SimpleTestCase):
+    def test_overlapping_uses_the_running_reach(self):
+        index = slots.WindowIndex([
+            slots.Window(1, 1, "A", at(8), at(18)),   # long legacy window hides behind shorter ones
+            slots.Window(2, 2, "B", at(9), at(10)),
+            slots.Window(3, 2, "B", at(12), at(13)),
+        ])
+        self.assertEqual([w.id for w in index.overlapping(at(10), at(11))], [1])
+        self.assertEqual([w.id for w in index.overlapping(at(9, 30), at(12, 30))], [1, 2, 3])
+        self.assertEqual(index.overlapping(at(18), at(19)), [])
+        self.assertEqual(index.overlapping(at(7), at(8)), [])
+
+
+class AvailabilityOverlapTests(TestCase):
+    def setUp(self):
+        self.world = World()
+        self.other = make_clinic()
+        approve(self.world.doctor, self.other)
+        self.day = timezone.localdate() + timedelta(days=3)
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {tokens_for(self.world.doctor.user)[0]}"}
+        DoctorAvailability.objects.create(
+            doctor=self.world.doctor, clinic=self.other, date=self.day,
+            start_time=time(9), end_time=time(12), status="approved",
+        )
+
+    def post(self, url, data):
+        return self.client.post(url, data, content_type="application/json", **self.auth)
+
+    def test_single_day_window_overlapping_another_clinic_is_rejected(self):
+        body = {"doctor": self.world.doctor.id, "clinic_id": self.world.clinic.id, "date": self.day.isoformat()}
+        response = self.post("/api/doctor/availability/", {**body, "start_time": "11:00", "end_time": "13:00"})
+        self.assertEqual(response.status_code, 409, response.content)
+        self.assertEqual(response.json()["conflicts"][0]["clinic_id"], self.other.id)
+
+        response = self.post("/api/doctor/availability/", {**body, "start_time": "12:00", "end_time": "14:00"})
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_recurring_reports_every_conflict_and_creates_nothing(self):
+        later = self.day + timedelta(days=7)
+        DoctorAvailability.objects.create(
+            doctor=self.world.doctor, clinic=self.other, date=later,
+            start_time=time(10), end_time=time(11), status="approved",
+        )
+        body = {
+            "clinic_id": self.world.clinic.id, "start_date": self.day.isoformat(),
+            "end_date": (later + timedelta(days=7)).isoformat(),
+            "weekdays": [self.day.strftime("%A")], "start_time": "10:30", "end_time": "12:30",
+        }
+        response = self.post("/api/doctor/availability/recurring/", body)
+        self.assertEqual(response.status_code, 409, response.content)
+        self.assertEqual([c["date"] for c in response.json()["conflicts"]], [self.day.isoformat(), later.isoformat()])
+        self.assertFalse(DoctorAvailability.objects.filter(clinic=self.world.clinic).exists())
+
+        response = self.post("/api/doctor/availability/recurring/", {**body, "start_time": "13:00", "end_time": "14:00"})
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()["created"], 3)
+        # same request again: identical windows are skipped, not conflicts
+        response = self.post("/api/doctor/availability/recurring/", {**body, "start_time": "13:00", "end_time": "14:00"})
+        self.assertEqual((response.status_code, response.json()["created"]), (201, 0))
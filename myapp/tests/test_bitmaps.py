@@ -0,0 +1,117 @@
+from datetime import datetime, time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp import bitmaps
+from myapp.models import DoctorDayBitmap, TimeSlot
+
+from .query_budgets import World, make_clinic
+
+
+class BitmapTests(TestCase):
+    def setUp(self):
+        self.world = World()
+        self.day = timezone.localdate() + timedelta(days=1)
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, minute)))
+
+    def slot(self, hour, minute=0, minutes=30, booked=False, clinic=None):
+        start = self.at(hour, minute)
+        return TimeSlot.objects.create(
+            doctor=self.world.doctor, clinic=clinic or self.world.clinic, start=start,
+            end=start + timedelta(minutes=minutes), is_booked=booked,
+        )
+
+    def bitmap(self):
+        return DoctorDayBitmap.objects.get(doctor=self.world.doctor, clinic=self.world.clinic, date=self.day)
+
+    def test_cells_are_widened_to_the_grid(self):
+        self.assertEqual(bitmaps.cell_range(self.at(9), self.at(9, 30), self.day), (108, 114))
+        self.assertEqual(bitmaps.cell_range(self.at(9, 2), self.at(9, 7), self.day), (108, 110))
+        self.assertEqual(bitmaps.cell_range(self.at(23, 50), self.at(23, 50) + timedelta(minutes=30), self.day), (286, 288))
+
+    def test_slot_writes_keep_the_day_current(self):
+        first = self.slot(9)
+        self.slot(9, 30)
+        self.assertEqual(self.bitmap().free_count, 2)
+        self.assertTrue(bitmaps.is_free(self.world.doctor.id, self.at(9), self.at(10)))
+
+        first.is_booked = True  # booking
+        first.save(update_fields=["is_booked"])
+        self.assertEqual(self.bitmap().free_count, 1)
+        self.assertFalse(bitmaps.is_free(self.world.doctor.id, self.at(9, 15), self.at(9, 20)))
+        self.assertTrue(bitmaps.is_free(self.world.doctor.id, self.at(9, 30), self.at(10)))
+
+        first.is_booked = False  # cancellation
+        first.save(update_fields=["is_booked"])
+        self.assertEqual(self.bitmap().free_count, 2)
+
+        TimeSlot.objects.filter(doctor=self.world.doctor).delete()
+        self.assertFalse(DoctorDayBitmap.objects.exists())
+
+    def test_naive_slot_times_are_read_as_local(self):
+        start = datetime.combine(self.day, time(9))
+        TimeSlot.objects.create(doctor=self.world.doctor, clinic=self.world.clinic, start=start, end=start + timedelta(minutes=30))
+        self.assertEqual(self.bitmap().free_count, 1)
+
+    def test_busy_checks_span_clinics_and_counts_respect_them(self):
+        other = make_clinic()
+        self.slot(10, booked=True, clinic=other)
+        self.slot(11)
+        self.assertFalse(bitmaps.is_free(self.world.doctor.id, self.at(10, 15), self.at(10, 45)))
+        self.assertEqual(bitmaps.free_counts([self.world.doctor.id], self.day), {self.world.doctor.id: 1})
+        self.assertEqual(bitmaps.free_counts([self.world.doctor.id], self.day, {self.world.doctor.id: {other.id}}), {})
+        self.assertEqual(bitmaps.dates_with_free(self.world.doctor.id, timezone.localdate()), [self.day])
+
+    def test_rebuild_matches_incremental_maintenance(self):
+        self.slot(9)
+        self.slot(9, 30, booked=True)
+        TimeSlot.objects.filter(start=self.at(9)).update(is_booked=True)  # no signals: bitmap goes stale
+        self.assertEqual(self.bitmap().free_count, 1)
+
+        self.assertEqual(bitmaps.rebuild(self.world.doctor.id), (1, 0))
+        rebuilt = self.bitmap()
+        self.assertEqual(rebuilt.free_count, 0)
+        self.assertEqual(bitmaps.to_int(rebuilt.busy), bitmaps.span_mask(108, 120))
+
+    def test_booking_past_midnight_marks_the_next_day(self):
+        late = self.slot(23, 45, booked=True)
+        next_day = self.day + timedelta(days=1)
+        after = self.at(0) + timedelta(days=1)
+        self.assertFalse(bitmaps.is_free(self.world.doctor.id, after, after + timedelta(minutes=10)))
+        self.assertTrue(bitmaps.is_free(self.world.doctor.id, after + timedelta(minutes=15), after + timedelta(minutes=30)))
+        spill = DoctorDayBitmap.objects.get(doctor=self.world.doctor, date=next_day)
+        self.assertEqual((spill.free_count, bitmaps.to_int(spill.busy)), (0, bitmaps.span_mask(0, 3)))
+
+        self.assertEqual(bitmaps.rebuild(self.world.doctor.id, first_day=next_day), (1, 0))
+        self.assertEqual(bitmaps.rebuild(self.world.doctor.id, last_day=self.day), (1, 0))
+
+        late.is_booked = False  # an unbooked slot is only a free start on its own day
+        late.save(update_fields=["is_booked"])
+        self.assertFalse(DoctorDayBitmap.objects.filter(date=next_day).exists())
+        self.assertEqual(self.bitmap().free_count, 1)
+
+    def test_reads_skip_slots_that_have_started(self):
+        for hour, minute in ((9, 0), (9, 30), (10, 0)):
+            self.slot(hour, minute)
+        doctor_id = self.world.doctor.id
+
+        self.assertEqual(bitmaps.free_count(doctor_id, self.day, now=self.at(8)), 3)
+        self.assertEqual(bitmaps.free_count(doctor_id, self.day, now=self.at(9, 10)), 2)
+        self.assertEqual(bitmaps.free_count(doctor_id, self.day, now=self.at(9, 30)), 2)  # starts right now
+        self.assertEqual(bitmaps.free_counts([doctor_id], self.day, now=self.at(9, 45)), {doctor_id: 1})
+        self.assertEqual(bitmaps.free_counts([doctor_id], self.day, now=self.at(10, 5)), {})
+
+        self.assertTrue(bitmaps.has_free(doctor_id, self.day, now=self.at(10)))
+        self.assertFalse(bitmaps.has_free(doctor_id, self.day, now=self.at(10, 1)))
+        self.assertEqual(bitmaps.dates_with_free(doctor_id, self.day, now=self.at(9, 50)), [self.day])
+        self.assertEqual(bitmaps.dates_with_free(doctor_id, self.day, now=self.at(11)), [])
+
+    def test_later_days_count_every_free_slot(self):
+        self.slot(9)
+        self.slot(9, clinic=make_clinic())
+        self.assertEqual(bitmaps.free_count(self.world.doctor.id, self.day, now=self.at(23) - timedelta(days=1)), 2)
+        self.assertEqual(bitmaps.upcoming_mask(self.day, self.at(0) - timedelta(days=1)), bitmaps.span_mask(0, 288))
+        self.assertEqual(bitmaps.upcoming_mask(self.day, self.at(0) + timedelta(days=1)), 0)
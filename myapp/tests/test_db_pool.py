@@ -0,0 +1,21 @@
+from django.test import TestCase
+
+from myapp.authentication import tokens_for
+from myapp.db_pool import pool_stats
+from myapp.models import User
+
+
+class PoolStatsTests(TestCase):
+    def test_every_alias_is_reported(self):
+        stats = pool_stats()
+        self.assertIn("default", stats)
+        self.assertIn("pooled", stats["default"])
+
+    def test_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get("/api/db/pool-stats/").status_code, 401)
+
+        admin = User.objects.create_superuser(email="admin@pool.test", password="pw", full_name="Admin")
+        access, _ = tokens_for(admin)
+        response = self.client.get("/api/db/pool-stats/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("default", response.json())
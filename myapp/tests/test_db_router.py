@@ -0,0 +1,124 @@
+"""
+Routing decisions of ReplicaRoutingMiddleware / PrimaryReplicaRouter.
+
+The view below only records which database a read would use, so no replica
+has to exist; a real two-database run only needs DATABASE_REPLICA_URLS.
+"""
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp.cache import CachedResponseMixin, micro_cached
+from myapp.db_router import ReplicaRoutingMiddleware, is_pinned, pin_to_primary, read_from
+from myapp.models import User
+
+
+class _FakeUser:
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = pk
+
+
+def _bearer(user_id):
+    token = AccessToken()
+    token["user_id"] = user_id
+    return {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def call(self, request, status=200, user=None):
+        def view(req):
+            self.seen.append(router.db_for_read(User))
+            if user is not None:
+                req.user = user
+            return HttpResponse(status=status)
+
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def test_safe_requests_read_from_a_replica(self):
+        self.call(self.factory.get("/api/doctors/"))
+        self.assertEqual(self.seen, ["replica1"])
+
+    def test_writes_read_from_the_primary_and_pin_the_caller(self):
+        self.call(self.factory.post("/api/appointments/create/", **_bearer(7)), status=201, user=_FakeUser(7))
+        self.call(self.factory.get("/api/appointments/", **_bearer(7)))
+        self.assertEqual(self.seen, ["default", "default"])
+        self.assertTrue(is_pinned("u7"))
+
+    def test_pin_is_per_user(self):
+        pin_to_primary("u7")
+        self.call(self.factory.get("/api/appointments/", **_bearer(8), REMOTE_ADDR="10.0.0.8"))
+        self.assertEqual(self.seen, ["replica1"])
+
+    def test_failed_writes_do_not_pin(self):
+        self.call(self.factory.post("/api/appointments/create/", **_bearer(9)), status=400, user=_FakeUser(9))
+        self.assertFalse(is_pinned("u9"))
+
+    def test_authenticated_writes_do_not_pin_the_client_ip(self):
+        self.call(self.factory.post("/api/appointments/create/", **_bearer(7), REMOTE_ADDR="10.0.0.7"),
+                  status=201, user=_FakeUser(7))
+        self.call(self.factory.get("/api/doctors/", REMOTE_ADDR="10.0.0.7"))
+        self.assertEqual(self.seen, ["default", "replica1"])
+        self.assertFalse(is_pinned("ip10.0.0.7"))
+
+    def test_anonymous_writes_pin_the_client_ip(self):
+        self.call(self.factory.post("/api/auth/verify-otp/", REMOTE_ADDR="10.0.0.5"))
+        self.call(self.factory.get("/api/patient/profile/", REMOTE_ADDR="10.0.0.5"))
+        self.assertEqual(self.seen, ["default", "default"])
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        self.call(self.factory.get("/api/doctors/"))
+        self.assertEqual(self.seen, ["default"])
+
+    def test_reads_outside_a_request_use_the_primary(self):
+        self.assertEqual(router.db_for_read(User), "default")
+        self.assertEqual(router.db_for_write(User), "default")
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class CacheFillTests(SimpleTestCase):
+    """Whatever gets stored under a namespace version is read from the primary."""
+
+    def setUp(self):
+        cache.clear()
+        self.seen = []
+
+    def record(self):
+        self.seen.append(router.db_for_read(User))
+        return {"ok": True}
+
+    def test_cached_responses_are_built_from_the_primary(self):
+        test = self
+
+        class Base(APIView):
+            authentication_classes = permission_classes = ()
+
+            def get(self, request):
+                return Response(test.record())
+
+        class View(CachedResponseMixin, Base):
+            cache_namespaces = ("probe",)
+
+        view = ReplicaRoutingMiddleware(View.as_view())
+        for _ in range(2):
+            self.assertEqual(view(RequestFactory().get("/probe/")).status_code, 200)
+        self.assertEqual(self.seen, ["default"])
+
+    def test_micro_cache_builds_from_the_primary(self):
+        with read_from("replica1"):
+            self.assertEqual(router.db_for_read(User), "replica1")
+            micro_cached("probe", "k", self.record)
+            micro_cached("probe", "k", self.record)
+        self.assertEqual(self.seen, ["default"])
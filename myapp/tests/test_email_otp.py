@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp.models import OTP_MAX_ATTEMPTS, EmailOTP
+
+EMAIL = "otp@x.test"
+
+
+class EmailOTPTests(TestCase):
+    def wrong(self, code):
+        return "000000" if code != "000000" else "111111"
+
+    def test_reissue_retires_the_older_code(self):
+        old = EmailOTP.issue(EMAIL)
+        new = EmailOTP.issue(EMAIL)
+        self.assertEqual(EmailOTP.objects.filter(email=EMAIL).count(), 1)
+        if old != new:
+            self.assertEqual(EmailOTP.verify(EMAIL, old), EmailOTP.INVALID)
+        self.assertEqual(EmailOTP.verify(EMAIL, new), EmailOTP.VERIFIED)
+        self.assertEqual(EmailOTP.verify(EMAIL, new), EmailOTP.EXPIRED)  # single use
+
+    def test_last_wrong_attempt_locks_the_code(self):
+        code = EmailOTP.issue(EMAIL)
+        for _ in range(OTP_MAX_ATTEMPTS - 1):
+            self.assertEqual(EmailOTP.verify(EMAIL, self.wrong(code)), EmailOTP.INVALID)
+        self.assertEqual(EmailOTP.verify(EMAIL, self.wrong(code)), EmailOTP.LOCKED)
+        self.assertEqual(EmailOTP.verify(EMAIL, code), EmailOTP.LOCKED)
+        self.assertEqual(EmailOTP.objects.get(email=EMAIL).attempts, OTP_MAX_ATTEMPTS)
+
+    def test_expired_code_is_rejected(self):
+        code = EmailOTP.issue(EMAIL)
+        EmailOTP.objects.filter(email=EMAIL).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(EmailOTP.verify(EMAIL, code), EmailOTP.EXPIRED)
+        self.assertEqual(EmailOTP.verify("nobody@x.test", code), EmailOTP.EXPIRED)
+
+    def test_sweep_deletes_only_expired_rows(self):
+        now = timezone.now()
+        for n in range(5):
+            EmailOTP.objects.create(email=f"old{n}@x.test", code="123456", expires_at=now - timedelta(minutes=1))
+        live = EmailOTP.objects.create(email="live@x.test", code="123456", expires_at=now + timedelta(minutes=5))
+
+        self.assertEqual(EmailOTP.sweep_expired(batch_size=2, max_batches=2, now=now), 4)
+        self.assertEqual(EmailOTP.sweep_expired(batch_size=2, now=now), 1)
+        self.assertEqual(list(EmailOTP.objects.values_list("pk", flat=True)), [live.pk])
@@ -0,0 +1,39 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from .query_budgets import World
+
+
+class RenameTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.world = World()
+
+    def get(self, url, etag=None):
+        extra = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get(url, **extra)
+
+    def test_doctor_rename_refreshes_the_cached_body(self):
+        url = f"/api/doctors/{self.world.doctor.id}/"
+        first = self.get(url)
+        self.assertEqual(self.get(url, first["ETag"]).status_code, 304)
+
+        user = self.world.doctor.user
+        user.full_name = "Dr Renamed"
+        user.save()
+
+        response = self.get(url, first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Dr Renamed", response.content.decode())
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertIn("Dr Renamed", self.get(f"/api/clinics/{self.world.clinic.id}/").content.decode())
+
+    def test_owner_rename_refreshes_the_cached_clinic(self):
+        url = f"/api/clinics/{self.world.clinic.id}/"
+        first = self.get(url)
+        self.world.owner.full_name = "New Owner"
+        self.world.owner.save()
+
+        response = self.get(url, first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["owner_name"], "New Owner")
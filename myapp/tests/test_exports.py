@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from myapp.authentication import tokens_for
+from myapp.models import ClinicRevenue, Payment
+from myapp.views.finance import ClinicRevenueExportView, PaymentExportView
+
+from .query_budgets import World, make_appointment, make_clinic, make_doctor, seed_revenues
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.world = World()
+        seed_revenues(self.world, 2)
+
+        # another owner's clinic: never part of this owner's export
+        other = make_clinic()
+        doctor = make_doctor(self.world.specialization)
+        self.foreign = ClinicRevenue.objects.create(
+            clinic=other, doctor=doctor, appointment=make_appointment(doctor, other),
+            total_fee=Decimal("900"), clinic_share=Decimal("200"), doctor_earning=Decimal("700"),
+        )
+
+    def export(self, url, user, **params):
+        access, _ = tokens_for(user)
+        return self.client.get(url, params, HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def body(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def revenues(self, **params):
+        return self.export("/api/clinic/revenues/export/", self.world.owner, **params)
+
+    def test_csv(self):
+        response = self.revenues()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="clinic_revenues.csv"', response["Content-Disposition"])
+
+        header, *rows = list(csv.reader(io.StringIO(self.body(response))))
+        self.assertEqual(header, ClinicRevenueExportView.HEADER)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({r[1] for r in rows}, {str(self.world.clinic.id)})
+        self.assertEqual(rows[0][9:12], ["500.00", "100.00", "400.00"])
+
+    def test_ndjson(self):
+        response = self.revenues(output="ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        rows = [json.loads(line) for line in self.body(response).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(list(rows[0]), ClinicRevenueExportView.HEADER)
+        self.assertEqual(rows[0]["clinic_name"], self.world.clinic.name)
+        appointment = ClinicRevenue.objects.get(pk=rows[0]["id"]).appointment
+        self.assertEqual(rows[0]["appointment_date"], timezone.localtime(appointment.timeslot.start).date().isoformat())
+
+    def test_date_range(self):
+        today = timezone.localdate()
+        self.assertEqual(len(self.body(self.revenues(output="ndjson", **{"from": today.isoformat()})).splitlines()), 2)
+        tomorrow = (today + timedelta(days=1)).isoformat()
+        self.assertEqual(self.body(self.revenues(output="ndjson", **{"from": tomorrow})), "")
+
+    def test_bad_dates_are_rejected(self):
+        for params in ({"from": "2024-13-01"}, {"to": "yesterday"}):
+            self.assertEqual(self.revenues(**params).status_code, 400)
+            self.assertEqual(self.export("/api/payments/export/", self.world.owner, **params).status_code, 400)
+
+    def test_only_owners_rows(self):
+        ids = {r["id"] for r in csv.DictReader(io.StringIO(self.body(self.revenues())))}
+        self.assertEqual(ids, {str(pk) for pk in ClinicRevenue.objects.filter(clinic=self.world.clinic).values_list("pk", flat=True)})
+        self.assertNotIn(str(self.foreign.id), ids)
+        self.assertEqual(self.client.get("/api/clinic/revenues/export/").status_code, 401)
+
+    def test_payments_are_scoped_to_the_caller(self):
+        own = make_appointment(self.world.doctor, self.world.clinic, patient=self.world.patient)
+        mine = Payment.objects.create(appointment=own, order_id="order_mine", amount=own.amount)
+        Payment.objects.create(appointment=self.foreign.appointment, order_id="order_foreign", amount=Decimal("900"))
+
+        for user in (self.world.patient, self.world.owner):
+            rows = list(csv.DictReader(io.StringIO(self.body(self.export("/api/payments/export/", user)))))
+            self.assertEqual([r["id"] for r in rows], [str(mine.id)])
+            self.assertEqual(list(rows[0]), PaymentExportView.HEADER)
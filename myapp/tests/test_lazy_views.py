@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+from asgiref.sync import iscoroutinefunction
+from django.test import SimpleTestCase
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from myapp import views
+from myapp.views import _load
+
+
+def _callbacks(patterns):
+    for p in patterns:
+        if isinstance(p, URLResolver):
+            yield from _callbacks(p.url_patterns)
+        elif isinstance(p, URLPattern):
+            yield str(p.pattern), p.callback
+
+
+class LazyRouteTests(SimpleTestCase):
+    def test_every_route_target_exists(self):
+        for pattern, callback in _callbacks(get_resolver().url_patterns):
+            dotted = getattr(callback, "lazy_target", None)
+            if dotted is None:  # the API root
+                continue
+            with self.subTest(pattern):
+                view = _load(dotted, callback.lazy_actions)
+                self.assertTrue(getattr(view, "csrf_exempt", False))
+                self.assertEqual(iscoroutinefunction(callback), iscoroutinefunction(view), dotted)
+
+    def test_package_attributes_resolve_to_the_owning_module(self):
+        self.assertIs(views.DoctorListView, views.doctors.DoctorListView)
+        with self.assertRaises(AttributeError):
+            views.NoSuchView
+
+    def test_loading_the_urlconf_imports_no_view_module(self):
+        code = (
+            "import sys, django; django.setup(); import myapp.urls; "
+            "print(sorted(m for m in sys.modules if m.startswith(('myapp.views.', 'myapp.serializers'))))"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(out.strip(), "[]")
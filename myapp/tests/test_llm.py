@@ -0,0 +1,106 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from myapp import llm
+from myapp.llm import normalize_symptoms
+
+
+class SymptomKeyTests(SimpleTestCase):
+    def test_order_case_punctuation_and_filler_are_ignored(self):
+        self.assertEqual(normalize_symptoms("Fever and Cough!"), normalize_symptoms("I have a cough, fever"))
+        self.assertEqual(normalize_symptoms("I'm having a headache since 2 days"), "2 days headache")
+
+    def test_severity_and_intensity_change_the_key(self):
+        plain = normalize_symptoms("chest pain")
+        for text in ("severe chest pain", "mild chest pain", "very bad chest pain", "a little chest pain"):
+            with self.subTest(text=text):
+                self.assertNotEqual(normalize_symptoms(text), plain)
+        self.assertNotEqual(normalize_symptoms("severe headache"), normalize_symptoms("mild headache"))
+
+
+class _BlockingLLM(llm.FakeLLM):
+    """FakeLLM whose calls wait until the test releases them."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def _create(self, **kwargs):
+        self.release.wait(5)
+        return super()._create(**kwargs)
+
+
+_blocking = _BlockingLLM()
+
+
+def blocking_llm(kind):
+    return _blocking
+
+
+@override_settings(LLM_BACKEND="myapp.tests.test_llm.blocking_llm")
+class CoalescingTests(SimpleTestCase):
+    def setUp(self):
+        llm.reset_clients()
+        self.addCleanup(llm.reset_clients)
+        _blocking.calls = 0
+        _blocking.release.clear()
+
+    def test_concurrent_identical_prompts_make_one_call(self):
+        before = llm.client_stats()
+        replies = []
+        threads = [
+            threading.Thread(target=lambda: replies.append(llm.complete(llm.CHATBOT_SYSTEM_PROMPT, "hi", 150)))
+            for _ in range(6)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)  # let the followers queue up behind the leader
+        _blocking.release.set()
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(_blocking.calls, 1)
+        self.assertEqual(len(set(replies)), 1)
+        self.assertEqual(len(replies), 6)
+        after = llm.client_stats()
+        self.assertEqual(after["calls"] - before["calls"], 1)
+        self.assertEqual(after["coalesced"] - before["coalesced"], 5)
+
+    def test_different_prompts_are_not_coalesced(self):
+        _blocking.release.set()
+        llm.complete(llm.CHATBOT_SYSTEM_PROMPT, "hi", 150)
+        llm.complete(llm.CHATBOT_SYSTEM_PROMPT, "hello", 150)
+        self.assertEqual(_blocking.calls, 2)
+
+
+@override_settings(LLM_BACKEND="fake", RATE_LIMITS={})
+class SaturationTests(SimpleTestCase):
+    """Every slot is taken: callers give up after LLM_QUEUE_SECONDS."""
+
+    def setUp(self):
+        llm.reset_clients()
+        self.addCleanup(llm.reset_clients)
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        patches = [mock.patch.object(llm, "_slots", slots), mock.patch.object(llm, "LLM_QUEUE_SECONDS", 0.05)]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.calls = llm._fake_llm.calls
+
+    def test_fallback_text_is_returned(self):
+        rejected = llm.client_stats()["rejected"]
+        self.assertEqual(llm.complete(llm.CHATBOT_SYSTEM_PROMPT, "hi", 150, fallback="busy"), "busy")
+        self.assertEqual(llm.client_stats()["rejected"], rejected + 1)
+        self.assertEqual(llm._fake_llm.calls, self.calls)
+
+    def test_without_fallback_the_caller_sees_llm_unavailable(self):
+        with self.assertRaises(llm.LLMUnavailable):
+            llm.complete(llm.CHATBOT_SYSTEM_PROMPT, "hi", 150)
+
+    def test_chatbot_answers_with_its_fallback(self):
+        response = self.client.post("/api/chatbot/", {"message": "hi"}, content_type="application/json")
+        self.assertEqual(response.json(), {"reply": llm.CHATBOT_FALLBACK})
@@ -0,0 +1,81 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+from rest_framework.request import Request
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp.authentication import tokens_for, user_from_claims
+from myapp.loaders import RequestLoader, get_loader
+
+from .query_budgets import World, approve, make_clinic, make_doctor
+
+
+class RequestLoaderTests(TestCase):
+    def setUp(self):
+        self.world = World()
+        self.loader = RequestLoader(self.world.doctor.user)
+
+    def test_lookups_run_once(self):
+        calls = []
+        for _ in range(3):
+            self.assertEqual(self.loader.get("k", lambda: calls.append(1) or "v"), "v")
+        self.assertEqual(len(calls), 1)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.loader.doctor_profile(), self.world.doctor)
+            self.assertEqual(self.loader.doctor_profile_id(), self.world.doctor.id)
+
+    def test_forget_drops_entries(self):
+        self.loader.doctor_profile(), self.loader.approved_links(self.world.doctor.id)
+        self.loader.forget("doctor_profile")
+        with self.assertNumQueries(1):
+            self.loader.doctor_profile()
+            self.loader.approved_links(self.world.doctor.id)  # still memoized
+
+        self.loader.forget()
+        with self.assertNumQueries(2):
+            self.loader.doctor_profile()
+            self.loader.approved_links(self.world.doctor.id)
+
+    def test_prime_approved_is_one_query(self):
+        busy, idle = make_doctor(), make_doctor()
+        other = make_clinic()
+        approve(busy, self.world.clinic), approve(busy, other)
+        approve(idle, other, status="pending")
+        doctors = [self.world.doctor.id, busy.id, idle.id]
+
+        with self.assertNumQueries(1):
+            self.loader.prime_approved(doctors)
+            self.loader.prime_approved(doctors)  # nothing left to load
+            self.assertEqual(self.loader.approved_clinic_ids(self.world.doctor.id), [self.world.clinic.id])
+            self.assertEqual(self.loader.approved_clinic_ids(busy.id), [self.world.clinic.id, other.id])
+            self.assertEqual(self.loader.approved_links(idle.id), [])
+            self.assertTrue(self.loader.is_approved(busy.id, str(other.id)))
+
+    def test_claims_users_skip_the_queries(self):
+        claims = user_from_claims(AccessToken(tokens_for(self.world.owner)[0]))
+        loader = RequestLoader(claims)
+        with self.assertNumQueries(0):
+            self.assertEqual(loader.owned_clinic_ids(), [self.world.clinic.id])
+
+
+class GetLoaderTests(TestCase):
+    def setUp(self):
+        self.world = World()
+        self.http = RequestFactory().get("/")
+        self.http.user = AnonymousUser()
+
+    def test_one_loader_per_request(self):
+        drf = Request(self.http)
+        self.assertIs(get_loader(self.http), get_loader(drf))
+        self.assertIsNot(get_loader(None), get_loader(None))
+
+    def test_rebinds_when_authentication_runs_later(self):
+        early = get_loader(self.http)  # e.g. middleware, before DRF authenticates
+        self.assertIsNone(early.doctor_profile())
+
+        drf = Request(self.http)
+        drf.user = self.world.doctor.user
+        loader = get_loader(drf)
+        self.assertIs(loader, early)
+        self.assertEqual(loader.user, self.world.doctor.user)
+        self.assertEqual(loader.doctor_profile(), self.world.doctor)  # anonymous None was dropped
@@ -0,0 +1,59 @@
+import time
+
+from django.test import SimpleTestCase
+
+from myapp.otp_delivery import FakeChannel, OTPDispatcher, OTPMessage, normalize_phone
+
+
+class DispatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.email, self.sms = FakeChannel("email"), FakeChannel("sms")
+        self.dispatcher = OTPDispatcher({"email": self.email, "sms": self.sms}, batch_deadline=0.3)
+
+    def counts(self, channel):
+        return self.dispatcher.stats()["channels"][channel]
+
+    def message(self, email, phone):
+        return OTPMessage(email, normalize_phone(phone), "123456", ("sms", "email"), time.monotonic())
+
+    def test_sms_first_and_latency_recorded(self):
+        self.dispatcher.enqueue("a@x.test", "111111", phone="9876543210")
+        self.assertTrue(self.dispatcher.flush())
+        self.assertEqual([m.phone for m in self.sms.outbox], ["+919876543210"])
+        self.assertEqual(self.email.outbox, [])
+        self.assertEqual(self.counts("sms")["sent"], 1)
+        self.assertIsNotNone(self.counts("sms")["latency_avg_ms"])
+
+    def test_failing_channel_fails_over(self):
+        self.sms.failing = True
+        self.dispatcher.enqueue("a@x.test", "111111", phone="9876543210")
+        self.assertTrue(self.dispatcher.flush())
+        self.assertEqual([m.email for m in self.email.outbox], ["a@x.test"])
+        self.assertEqual(self.counts("sms")["failed"], 1)
+        self.assertEqual((self.counts("email")["sent"], self.counts("email")["failover_in"]), (1, 1))
+
+    def test_nothing_left_counts_as_undelivered(self):
+        self.sms.failing = self.email.failing = True
+        self.dispatcher.enqueue("a@x.test", "111111", phone="9876543210")
+        self.assertTrue(self.dispatcher.flush())
+        self.assertEqual(self.dispatcher.stats()["undelivered"], 1)
+
+    def test_stalled_channel_misses_its_deadline_and_fails_over(self):
+        self.sms.delay = 2
+        started = time.monotonic()
+        self.dispatcher.deliver([self.message("a@x.test", "9876543210")])
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertEqual([m.email for m in self.email.outbox], ["a@x.test"])
+        self.assertEqual((self.counts("sms")["timed_out"], self.counts("email")["failover_in"]), (1, 1))
+
+    def test_slow_sms_does_not_hold_up_email(self):
+        self.sms.delay = 1
+        self.dispatcher.batch_deadline = 5
+        self.dispatcher.enqueue("texted@x.test", "111111", phone="9876543210")
+        self.dispatcher.enqueue("mailed@x.test", "222222")
+        deadline = time.monotonic() + 0.5
+        while not self.email.outbox and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([m.email for m in self.email.outbox], ["mailed@x.test"])
+        self.assertEqual(self.sms.outbox, [])  # still stalled
+        self.assertTrue(self.dispatcher.flush())
@@ -0,0 +1,195 @@
+"""
+Every write path that feeds a cached public body must retire it, and the
+slot micro-cache builds each entry once.
+
+Each test fills the response cache with one GET, writes through the ORM
+(so only the post_save / post_delete receivers can notice), and expects the
+next GET to show the write instead of the stored body.
+"""
+import threading
+import time as clock
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from myapp.cache import SingleFlight, micro_cached
+from myapp.models import DoctorAvailability, DoctorFeeManagement, DoctorProfile, TimeSlot
+
+from .query_budgets import World, make_slot
+
+
+class InvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.world = World()
+        self.doctor, self.clinic = self.world.doctor, self.world.clinic
+        self.detail = f"/api/doctors/{self.doctor.id}/"
+        self.clinic_detail = f"/api/clinics/{self.clinic.id}/"
+
+    def get(self, url):
+        response = self.client.get(url)
+        return response.json() if response.status_code == 200 else response.status_code
+
+    def listed(self):
+        return {row["id"]: row for row in self.get("/api/doctors/")}
+
+    def test_bodies_are_cached(self):
+        self.get(self.detail), self.listed()
+        DoctorProfile.objects.filter(pk=self.doctor.pk).update(qualification="MD")  # no signal
+        self.assertNotEqual(self.get(self.detail)["qualification"], "MD")
+        self.assertNotEqual(self.listed()[self.doctor.id]["qualification"], "MD")
+
+    # ---- DoctorProfile ----
+    def test_doctor_save(self):
+        self.get(self.detail), self.listed()
+        self.doctor.qualification = "MD"
+        self.doctor.save()
+        self.assertEqual(self.get(self.detail)["qualification"], "MD")
+        self.assertEqual(self.listed()[self.doctor.id]["qualification"], "MD")
+
+    def test_doctor_delete(self):
+        self.get(self.detail), self.listed()
+        self.doctor.delete()
+        self.assertEqual(self.get(self.detail), 404)
+        self.assertNotIn(self.doctor.id, self.listed())
+
+    # ---- Clinic ----
+    def test_clinic_save(self):
+        self.get(self.clinic_detail), self.get(self.detail)
+        self.clinic.name = "Renamed Clinic"
+        self.clinic.save()
+        self.assertEqual(self.get(self.clinic_detail)["name"], "Renamed Clinic")
+        self.assertEqual(self.get(self.detail)["clinics"][0]["name"], "Renamed Clinic")
+
+    def test_clinic_delete(self):
+        self.get(self.clinic_detail), self.get(self.detail)
+        self.clinic.delete()
+        self.assertEqual(self.get(self.clinic_detail), 404)
+        self.assertEqual(self.get(self.detail)["clinics"], [])
+
+    # ---- DoctorFeeManagement ----
+    def test_fee_save(self):
+        self.listed()
+        DoctorFeeManagement.objects.create(doctor=self.doctor, clinic=self.clinic, consultation_fee=Decimal("800"))
+        self.assertEqual(self.listed()[self.doctor.id]["consultation_fee"], 800.0)
+
+    def test_fee_delete(self):
+        record = DoctorFeeManagement.objects.create(doctor=self.doctor, clinic=self.clinic, consultation_fee=Decimal("800"))
+        DoctorProfile.objects.filter(pk=self.doctor.pk).update(fee=Decimal("300"))  # no signal
+        self.assertEqual(self.listed()[self.doctor.id]["consultation_fee"], 800.0)
+        record.delete()
+        self.assertEqual(self.listed()[self.doctor.id]["consultation_fee"], 300.0)
+
+    # ---- DoctorAvailability ----
+    def add_window(self):
+        return DoctorAvailability.objects.create(
+            doctor=self.doctor, clinic=self.clinic, date=timezone.localdate() + timedelta(days=3),
+            start_time=time(9), end_time=time(12), status="approved",
+        )
+
+    def test_availability_save(self):
+        self.assertEqual(self.get(self.detail)["availabilities"], [])
+        self.add_window()
+        self.assertEqual(self.get(self.detail)["availabilities"][0]["clinic"], self.clinic.name)
+
+    def test_availability_delete(self):
+        window = self.add_window()
+        self.assertEqual(len(self.get(self.detail)["availabilities"]), 1)
+        window.delete()
+        self.assertEqual(self.get(self.detail)["availabilities"], [])
+
+    # ---- TimeSlot ----
+    def test_slot_save(self):
+        self.assertIsNone(self.listed()[self.doctor.id]["next_available"])
+        slot = make_slot(self.doctor, self.clinic)
+        self.assertEqual(self.listed()[self.doctor.id]["next_available"], slot.start.isoformat())
+
+    def test_slot_delete(self):
+        slot = make_slot(self.doctor, self.clinic)
+        self.assertIsNotNone(self.listed()[self.doctor.id]["next_available"])
+        slot.delete()
+        self.assertIsNone(self.listed()[self.doctor.id]["next_available"])
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def build(self):
+        self.calls += 1
+        self.release.wait(5)
+        return ["09:00"]
+
+    def run_concurrently(self, fn, n=8):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(fn())) for _ in range(n)]
+        for t in threads:
+            t.start()
+        clock.sleep(0.1)  # let the followers queue up behind the leader
+        self.release.set()
+        for t in threads:
+            t.join(5)
+        return results
+
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        results = self.run_concurrently(lambda: flight.do("k", self.build))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [["09:00"]] * 8)
+
+    def test_concurrent_misses_build_the_entry_once(self):
+        results = self.run_concurrently(lambda: micro_cached("slots:1", "day", self.build))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [["09:00"]] * 8)
+        self.assertEqual(micro_cached("slots:1", "day", self.build), ["09:00"])
+        self.assertEqual(self.calls, 1)
+
+    def test_errors_reach_every_waiter_and_are_not_cached(self):
+        def fail():
+            self.build()
+            raise RuntimeError("db down")
+
+        def call():
+            try:
+                return micro_cached("slots:1", "day", fail)
+            except RuntimeError as e:
+                return str(e)
+
+        self.assertEqual(self.run_concurrently(call), ["db down"] * 8)
+        self.assertEqual(micro_cached("slots:1", "day", lambda: ["10:00"]), ["10:00"])
+
+
+class SlotMicroCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.world = World()
+        day = timezone.localdate() + timedelta(days=1)
+        self.slot = self.add_slot(timezone.make_aware(datetime.combine(day, time(10))))
+        self.url = f"/api/doctors/{self.world.doctor.id}/available-slots/?date={day.isoformat()}"
+
+    def add_slot(self, start):
+        return TimeSlot.objects.create(
+            doctor=self.world.doctor, clinic=self.world.clinic, start=start, end=start + timedelta(minutes=30),
+        )
+
+    def slot_ids(self):
+        return [s["id"] for s in self.client.get(self.url).json()["slots"]]
+
+    def test_entry_is_served_until_a_slot_write(self):
+        self.assertEqual(self.slot_ids(), [self.slot.id])
+        TimeSlot.objects.filter(pk=self.slot.pk).update(is_booked=True)  # no signal
+        self.assertEqual(self.slot_ids(), [self.slot.id])
+
+        self.slot.is_booked = True
+        self.slot.save()
+        self.assertEqual(self.slot_ids(), [])
+
+    def test_new_slot_retires_the_entry(self):
+        self.assertEqual(len(self.slot_ids()), 1)
+        extra = self.add_slot(self.slot.end)
+        self.assertEqual(self.slot_ids(), [self.slot.id, extra.id])
@@ -0,0 +1,91 @@
+"""
+Runs every QueryBudget (see query_budgets.py) with 1 row and with N rows.
+
+Fails when the query count grows with N (an N+1 somewhere in the view or its
+serializer) or exceeds the endpoint's budget; the failure lists the SQL that
+ran more than once, with literals stripped, so the culprit is easy to spot.
+"""
+import re
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from myapp.authentication import tokens_for
+
+from .query_budgets import BUDGETS, World
+
+N = 5
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"IN \((?:\?, )*\?\)")
+
+
+def normalize_sql(sql):
+    sql = _LITERALS.sub("?", sql)
+    return _IN_LISTS.sub("IN (...)", sql)
+
+
+def duplicate_queries(captured):
+    counts = Counter(normalize_sql(q["sql"]) for q in captured)
+    return [(times, sql) for sql, times in counts.most_common() if times > 1]
+
+
+def format_duplicates(captured):
+    dupes = duplicate_queries(captured)
+    if not dupes:
+        return "  (no repeated SQL)"
+    return "\n".join(f"  {times}x {sql[:300]}" for times, sql in dupes)
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        self.world = World()
+        self.users = {
+            "doctor": self.world.doctor.user,
+            "patient": self.world.patient,
+            "owner": self.world.owner,
+        }
+
+    def measure(self, budget):
+        headers = {}
+        if budget.as_user:
+            access, _ = tokens_for(self.users[budget.as_user])
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {access}"
+        url = budget.url.format(w=self.world)
+
+        cache.clear()  # response caches would hide the queries
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200, f"{budget.name}: GET {url} → {response.status_code}")
+        return ctx.captured_queries
+
+    def test_query_counts_stay_flat_and_within_budget(self):
+        for budget in BUDGETS:
+            with self.subTest(budget.name), transaction.atomic():
+                budget.seed(self.world, 1)
+                one = self.measure(budget)
+                budget.seed(self.world, N - 1)
+                many = self.measure(budget)
+                transaction.set_rollback(True)
+
+                self.assertLessEqual(
+                    len(many), len(one),
+                    f"{budget.name}: {len(one)} queries with 1 row, {len(many)} with {N}\n"
+                    f"{format_duplicates(many)}",
+                )
+                self.assertLessEqual(
+                    len(many), budget.budget,
+                    f"{budget.name}: {len(many)} queries, budget {budget.budget}\n"
+                    f"{format_duplicates(many)}",
+                )
+
+    def test_normalize_sql_groups_repeated_lookups(self):
+        captured = [
+            {"sql": 'SELECT * FROM "t" WHERE "id" = 1'},
+            {"sql": 'SELECT * FROM "t" WHERE "id" = 2'},
+            {"sql": 'SELECT * FROM "u" WHERE "name" IN (\'a\', \'b\')'},
+        ]
+        self.assertEqual(duplicate_queries(captured), [(2, 'SELECT * FROM "t" WHERE "id" = ?')])
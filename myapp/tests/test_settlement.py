@@ -0,0 +1,37 @@
+from decimal import Decimal
+from itertools import product
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from myapp.models import DoctorFeeManagement
+from myapp.settlement import _paise, split_vectorized
+
+
+def paise(value):
+    return int(Decimal(value) * 100)
+
+
+class SplitParityTests(SimpleTestCase):
+    amounts = ["0", "0.01", "1", "19.99", "99.95", "250", "499.99", "1234.57"]
+    fees = [
+        ("20.00", None), ("12.50", None), ("33.33", None), ("0", None), ("100", None),
+        ("20.00", "19.99"), ("20.00", "0.29"), ("20.00", "1.15"), ("20.00", "5000"),
+    ]
+
+    def test_vectorized_split_matches_split_amount(self):
+        cases = list(product(self.amounts, self.fees))
+        amount_paise = _paise(pd.Series([Decimal(a) for a, _ in cases])).to_numpy()
+        percent = [float(p) for _, (p, _) in cases]
+        # as load_period_frame builds it: float rupees * 100, so 19.99 arrives as 1998.999…
+        fixed = pd.to_numeric(pd.Series([Decimal(f) if f is not None else None for _, (_, f) in cases])) * 100
+        clinic, doctor = split_vectorized(amount_paise, percent, fixed.to_numpy(dtype="float64"))
+
+        for (amount, (percent, fixed_fee)), got_clinic, got_doctor in zip(cases, clinic, doctor):
+            fee = DoctorFeeManagement(
+                clinic_share_percent=Decimal(percent),
+                clinic_fixed_fee=Decimal(fixed_fee) if fixed_fee is not None else None,
+            )
+            want_clinic, want_doctor = fee.split_amount(Decimal(amount))
+            with self.subTest(amount=amount, percent=percent, fixed=fixed_fee):
+                self.assertEqual((int(got_clinic), int(got_doctor)), (paise(want_clinic), paise(want_doctor)))
@@ -0,0 +1,32 @@
+import asyncio
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from myapp import streaming
+
+
+async def events():
+    yield streaming.sse({"text": "hi"})
+
+
+@override_settings(RATE_LIMITS={})
+class StreamSlotTests(SimpleTestCase):
+    def setUp(self):
+        streaming._semaphore = None
+
+    def run_stream(self, consume):
+        async def go():
+            response = await streaming.open_stream(RequestFactory().get("/"), events())
+            if consume:
+                chunks = [chunk async for chunk in response]
+                self.assertEqual(len(chunks), 1)
+            await asyncio.to_thread(response.close)  # as the ASGI handler does
+            await asyncio.sleep(0)
+            return streaming._get_semaphore()._value
+        return asyncio.run(go())
+
+    def test_slot_is_released_when_the_stream_finishes(self):
+        self.assertEqual(self.run_stream(consume=True), streaming.STREAM_MAX_CONCURRENT)
+
+    def test_slot_is_released_when_the_client_leaves_before_the_first_chunk(self):
+        self.assertEqual(self.run_stream(consume=False), streaming.STREAM_MAX_CONCURRENT)
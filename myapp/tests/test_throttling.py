@@ -0,0 +1,71 @@
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from myapp import streaming
+from myapp.authentication import tokens_for
+from myapp.throttling import client_ip, limiter
+
+from .query_budgets import World, make_user
+
+
+class ClientIPTests(SimpleTestCase):
+    def request(self, xff):
+        return RequestFactory().get("/", REMOTE_ADDR="10.0.0.9", HTTP_X_FORWARDED_FOR=xff)
+
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        self.assertEqual(client_ip(self.request("1.2.3.4")), "10.0.0.9")
+
+    @override_settings(REST_FRAMEWORK={"NUM_PROXIES": 1})
+    def test_only_the_hop_added_by_our_proxy_is_trusted(self):
+        self.assertEqual(client_ip(self.request("6.6.6.6, 203.0.113.7")), "203.0.113.7")
+
+
+@override_settings(RATE_LIMITS={"slots:ip": "2/m"})
+class SpoofedForwardedForTests(TestCase):
+    def setUp(self):
+        limiter.store.clear()
+        self.url = f"/api/doctors/{World().doctor.id}/available-dates/"
+
+    def test_rotating_the_header_still_hits_the_limit(self):
+        codes = [
+            self.client.get(self.url, HTTP_X_FORWARDED_FOR=f"198.51.100.{n}").status_code
+            for n in range(3)
+        ]
+        self.assertEqual(codes, [200, 200, 429])
+
+
+@override_settings(RATE_LIMITS={"analyze_symptoms:user": "2/m", "chat_stream:user": "2/m"})
+class UserThrottleTests(TestCase):
+    def setUp(self):
+        limiter.store.clear()
+        self.alice, self.bob = make_user("patient"), make_user("patient")
+
+    def bearer(self, user):
+        return {"HTTP_AUTHORIZATION": f"Bearer {tokens_for(user)[0]}"}
+
+    def analyze(self, user, ip):
+        # Too short to reach the matcher: the throttle still counts it.
+        return self.client.post(
+            "/api/analyze-symptoms/", {"symptoms": "x"}, content_type="application/json",
+            REMOTE_ADDR=ip, **self.bearer(user),
+        ).status_code
+
+    def test_a_user_is_limited_across_addresses(self):
+        codes = [self.analyze(self.alice, f"198.51.100.{n}") for n in range(3)]
+        self.assertEqual(codes, [400, 400, 429])
+        self.assertEqual(self.analyze(self.bob, "198.51.100.0"), 400)
+
+    def test_anonymous_callers_are_keyed_by_address(self):
+        post = lambda ip: self.client.post(
+            "/api/analyze-symptoms/", {"symptoms": "x"}, content_type="application/json", REMOTE_ADDR=ip,
+        ).status_code
+        self.assertEqual([post("10.0.0.1") for _ in range(3)], [400, 400, 429])
+        self.assertEqual(post("10.0.0.2"), 400)
+
+    def test_new_streams_are_limited_per_user(self):
+        def open_stream(user, ip):
+            request = RequestFactory().post("/", REMOTE_ADDR=ip, **self.bearer(user))
+            return async_to_sync(streaming.rate_limit)(request)[0]
+
+        self.assertEqual([open_stream(self.alice, f"10.0.1.{n}") for n in range(3)], [True, True, False])
+        self.assertTrue(open_stream(self.bob, "10.0.1.0"))
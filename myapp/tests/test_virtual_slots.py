@@ -0,0 +1,114 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from myapp import slots
+from myapp.authentication import tokens_for
+from myapp.models import Appointment, DoctorAvailability, TimeSlot
+
+from .query_budgets import World, approve, make_clinic
+
+
+def at(hour, minute=0):
+    return datetime(2030, 1, 7, hour, minute)
+
+
+class IntervalTests(SimpleTestCase):
+    def test_merge_and_subtract(self):
+        busy = slots.merge_intervals([(at(11), at(12)), (at(9), at(10)), (at(9, 30), at(10, 30))])
+        self.assertEqual(busy, [(at(9), at(10, 30)), (at(11), at(12))])
+
+        free = slots.subtract_intervals((at(8), at(13)), busy)
+        self.assertEqual(free, [(at(8), at(9)), (at(10, 30), at(11)), (at(12), at(13))])
+        self.assertEqual(slots.subtract_intervals((at(9, 15), at(10)), busy), [])
+        self.assertEqual(slots.subtract_intervals((at(13), at(14)), busy), [(at(13), at(14))])
+
+    def test_grid_stays_aligned_to_the_window_start(self):
+        free = [(at(9), at(9, 50)), (at(10, 10), at(11))]
+        starts = list(slots.grid_starts(at(9), timedelta(minutes=20), free))
+        self.assertEqual(starts, [at(9), at(9, 20), at(10, 20), at(10, 40)])
+
+    def test_virtual_ids_round_trip(self):
+        start = timezone.make_aware(at(9, 30))
+        ref = slots.virtual_slot_id(4, start, 30)
+        self.assertEqual(ref, "v4-203001070930-30")
+        self.assertEqual(slots.parse_virtual_slot_id(ref), (4, start, 30))
+        self.assertIsNone(slots.parse_virtual_slot_id("17"))
+        self.assertIsNone(slots.parse_virtual_slot_id("v4-203013070930-30"))
+
+
+@override_settings(SLOT_MODE="virtual")
+class VirtualSlotTests(TestCase):
+    def setUp(self):
+        self.world = World()
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.window = DoctorAvailability.objects.create(
+            doctor=self.world.doctor, clinic=self.world.clinic, date=self.day,
+            start_time=time(9), end_time=time(11), slot_duration=30, status="approved",
+        )
+
+    def start(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, minute)))
+
+    def test_booked_slots_at_any_clinic_are_subtracted(self):
+        other = make_clinic()
+        approve(self.world.doctor, other)
+        TimeSlot.objects.create(
+            doctor=self.world.doctor, clinic=other, start=self.start(9, 15), end=self.start(9, 45), is_booked=True,
+        )
+        free = slots.day_slots(self.world.doctor.id, self.day)
+        self.assertEqual([s["start"] for s in free], ["10:00", "10:30"])
+        self.assertEqual(free[0]["id"], slots.virtual_slot_id(self.world.clinic.id, self.start(10), 30))
+        self.assertEqual(slots.available_dates(self.world.doctor.id), [self.day.isoformat()])
+
+    def test_claim_materializes_one_booked_row(self):
+        ref = slots.virtual_slot_id(self.world.clinic.id, self.start(9, 30), 30)
+        slot = slots.claim(ref, self.world.doctor.id, self.world.clinic.id)
+        self.assertEqual((slot.start, slot.is_booked), (self.start(9, 30), True))
+        self.assertIsNone(slots.claim(ref, self.world.doctor.id))  # already taken
+        self.assertEqual(TimeSlot.objects.filter(doctor=self.world.doctor).count(), 1)
+        self.assertEqual([s["start"] for s in slots.day_slots(self.world.doctor.id, self.day)], ["09:00", "10:00", "10:30"])
+
+    def test_claim_rejects_off_grid_and_unknown_windows(self):
+        clinic_id = self.world.clinic.id
+        self.assertIsNone(slots.claim(slots.virtual_slot_id(clinic_id, self.start(9, 10), 30), self.world.doctor.id))
+        self.assertIsNone(slots.claim(slots.virtual_slot_id(clinic_id, self.start(9), 15), self.world.doctor.id))
+        self.assertIsNone(slots.claim(slots.virtual_slot_id(clinic_id, self.start(12), 30), self.world.doctor.id))
+        self.window.status = "pending"
+        self.window.save()
+        self.assertIsNone(slots.claim(slots.virtual_slot_id(clinic_id, self.start(9), 30), self.world.doctor.id))
+        self.assertFalse(TimeSlot.objects.exists())
+
+    def test_public_endpoint_and_booking_with_a_virtual_id(self):
+        response = self.client.get(f"/api/doctors/{self.world.doctor.id}/available-slots/?date={self.day.isoformat()}")
+        first = response.json()["slots"][0]
+        self.assertEqual(first["start"], "09:00")
+
+        access, _ = tokens_for(self.world.patient)
+        response = self.client.post(
+            "/api/appointments/create/",
+            {"doctor": self.world.doctor.id, "clinic": self.world.clinic.id, "timeslot": first["id"]},
+            content_type="application/json", HTTP_AUTHORIZATION=f"Bearer {access}",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        appointment = Appointment.objects.get()
+        self.assertEqual(appointment.timeslot.start, self.start(9))
+
+        response = self.client.get(f"/api/doctors/{self.world.doctor.id}/available-slots/?date={self.day.isoformat()}")
+        self.assertEqual([s["start"] for s in response.json()["slots"]], ["09:30", "10:00", "10:30"])
+
+    def test_claims_for_one_doctor_serialize_across_clinics_and_durations(self):
+        other = make_clinic()
+        approve(self.world.doctor, other)
+        DoctorAvailability.objects.create(  # legacy overlap, predates the overlap check
+            doctor=self.world.doctor, clinic=other, date=self.day,
+            start_time=time(9), end_time=time(10), slot_duration=20, status="approved",
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertIsNotNone(slots.claim(slots.virtual_slot_id(self.world.clinic.id, self.start(9), 30), self.world.doctor.id))
+        selects = [q["sql"].lower() for q in queries.captured_queries if q["sql"].startswith("SELECT")]
+        self.assertIn("doctorprofile", selects[0])  # the per-doctor lock comes first
+        self.assertIsNone(slots.claim(slots.virtual_slot_id(other.id, self.start(9, 20), 20), self.world.doctor.id))
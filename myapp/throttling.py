@@ -0,0 +1,213 @@
+# myapp/throttling.py
+"""
+Sliding-window rate limiting for the public / expensive endpoints.
+
+Each (scope, identity) keeps two fixed-window counters, the current one and
+the previous one. The previous count is weighted by how much of it still
+overlaps the sliding window:
+
+    estimate = previous * (1 - elapsed / window) + current
+
+That is O(1) memory per key and one increment per request.
+
+Stores:
+  * LocalStore - in-process dict; single node, or as a stand-in in dev
+  * CacheStore - Django cache (Redis in production), shared by every worker/node
+RATE_LIMIT_STORE picks one ("local" / "cache"); default is "cache" when
+REDIS_URL is configured, "local" otherwise.
+
+Rates come from settings.RATE_LIMITS, keyed "<scope>:<kind>", e.g.
+"send_otp:email": "5/15m". Kinds: ip, user, email.
+"""
+import math
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+_RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(s|sec|m|min|h|hour|d|day)\s*$")
+_UNIT_SECONDS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+
+def parse_rate(rate):
+    """'5/15m' → (5, 900); '100/hour' → (100, 3600)."""
+    match = _RATE_RE.match(rate or "")
+    if not match:
+        raise ValueError(f"Invalid rate: {rate!r}")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * _UNIT_SECONDS[unit]
+
+
+# =========================================================
+# 🔹 STORES
+# =========================================================
+class LocalStore:
+    """Per-process counters: {key: [bucket, current, previous]}."""
+    max_keys = 100_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def hit(self, key, bucket, window):
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None or entry[0] < bucket - 1:
+                entry = self._counters[key] = [bucket, 0, 0]
+            elif entry[0] == bucket - 1:
+                entry[:] = [bucket, 0, entry[1]]
+            entry[1] += 1
+            current, previous = entry[1], entry[2]
+            if len(self._counters) > self.max_keys:
+                self._sweep(bucket)
+            return current, previous
+
+    def _sweep(self, bucket):
+        stale = [k for k, (b, _, _) in self._counters.items() if b < bucket - 1]
+        for k in stale:
+            del self._counters[k]
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class CacheStore:
+    """Counters in the shared Django cache: one key per (identity, window bucket)."""
+
+    def hit(self, key, bucket, window):
+        current_key, previous_key = f"rl:{key}:{bucket}", f"rl:{key}:{bucket - 1}"
+        cache.add(current_key, 0, window * 2)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:  # evicted between add and incr
+            cache.set(current_key, 1, window * 2)
+            current = 1
+        return current, cache.get(previous_key, 0)
+
+    def clear(self):
+        pass
+
+
+def _default_store():
+    kind = getattr(settings, "RATE_LIMIT_STORE", None) or ("cache" if getattr(settings, "REDIS_URL", None) else "local")
+    return CacheStore() if kind == "cache" else LocalStore()
+
+
+# =========================================================
+# 🔹 LIMITER + METRICS
+# =========================================================
+class SlidingWindowLimiter:
+    def __init__(self, store=None):
+        self.store = store or _default_store()
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+
+    def hit(self, scope, ident, rate, now=None):
+        """Count one request; returns (allowed, retry_after_seconds)."""
+        limit, window = parse_rate(rate)
+        now = time.time() if now is None else now
+        bucket, elapsed = divmod(now, window)
+        current, previous = self.store.hit(f"{scope}:{ident}", int(bucket), window)
+
+        fraction = elapsed / window
+        allowed = previous * (1 - fraction) + current <= limit
+        retry_after = 0 if allowed else self._retry_after(limit, window, fraction, current, previous)
+        self._record(scope, allowed)
+        return allowed, retry_after
+
+    @staticmethod
+    def _retry_after(limit, window, fraction, current, previous):
+        if current < limit and previous:
+            # wait until enough of the previous bucket has slid out of the window
+            target = 1 - (limit - current) / previous
+            return max(1, math.ceil((target - fraction) * window))
+        # the current bucket alone is over the limit: it must become the previous one and decay
+        return max(1, math.ceil((1 - fraction) * window + (1 - limit / current) * window))
+
+    def _record(self, scope, allowed):
+        with self._stats_lock:
+            counts = self._stats.setdefault(scope, {"allowed": 0, "throttled": 0})
+            counts["allowed" if allowed else "throttled"] += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "store": type(self.store).__name__,
+                "scopes": {scope: dict(counts) for scope, counts in self._stats.items()},
+            }
+
+
+limiter = SlidingWindowLimiter()
+
+
+def client_ip(request):
+    """
+    Client address, honouring REST_FRAMEWORK["NUM_PROXIES"] like DRF's own
+    throttles: X-Forwarded-For is only trusted for the proxy hops configured
+    there, so a client can't pick its own identity by sending the header.
+    """
+    return BaseThrottle().get_ident(request)
+
+
+# =========================================================
+# 🔹 DRF THROTTLES
+# =========================================================
+class SlidingWindowThrottle(BaseThrottle):
+    """Base class; concrete throttles set `scope` and `kind` (see throttles_for)."""
+    scope = None
+    kind = None
+
+    def get_rate(self):
+        return getattr(settings, "RATE_LIMITS", {}).get(f"{self.scope}:{self.kind}")
+
+    def get_identity(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = self.get_rate()
+        identity = self.get_identity(request)
+        if not rate or not identity:
+            return True
+        allowed, self._wait = limiter.hit(f"{self.scope}:{self.kind}", identity, rate)
+        return allowed
+
+    def wait(self):
+        return getattr(self, "_wait", None)
+
+
+class IPThrottle(SlidingWindowThrottle):
+    kind = "ip"
+
+    def get_identity(self, request):
+        return client_ip(request)
+
+
+class UserThrottle(SlidingWindowThrottle):
+    """Per authenticated user; anonymous requests are keyed by IP instead."""
+    kind = "user"
+
+    def get_identity(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"u{request.user.pk}"
+        return f"ip{client_ip(request)}"
+
+
+class EmailThrottle(SlidingWindowThrottle):
+    """Per target email address (OTP / role lookups), whoever is asking."""
+    kind = "email"
+
+    def get_identity(self, request):
+        email = request.data.get("email", "") if hasattr(request, "data") else ""
+        return str(email).strip().lower() or None
+
+
+_KINDS = {"ip": IPThrottle, "user": UserThrottle, "email": EmailThrottle}
+
+
+def throttles_for(scope, *kinds):
+    """throttle_classes for one endpoint, e.g. throttles_for("send_otp", "ip", "email")."""
+    return [type(f"{_KINDS[k].__name__}_{scope}", (_KINDS[k],), {"scope": scope}) for k in kinds]
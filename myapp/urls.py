@@ -2,30 +2,36 @@
 # ✅ WELLORA - API ROUTES (Clean & Ordered)
 # =========================
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
-from . import views
-
-router = DefaultRouter()
-router.register(r'notifications', views.NotificationViewSet, basename='notification')
-router.register(r'payments', views.PaymentViewSet, basename='payment')
-router.register(r'reviews', views.ReviewViewSet, basename='review')
+from rest_framework.routers import APIRootView
+from rest_framework.urlpatterns import format_suffix_patterns
+from .views import route, viewset_routes
+
+# what DefaultRouter would register, minus importing views.viewsets (and the serializers) at boot
+router_patterns = format_suffix_patterns([
+    path('', APIRootView.as_view(api_root_dict={
+        'notifications': 'notification-list', 'payments': 'payment-list', 'reviews': 'review-list',
+    }), name='api-root'),
+    *viewset_routes('notifications', "viewsets.NotificationViewSet", 'notification'),
+    *viewset_routes('payments', "viewsets.PaymentViewSet", 'payment', read_only=True),
+    *viewset_routes('reviews', "viewsets.ReviewViewSet", 'review'),
+])
 
 # =========================
 # AUTH / LOGIN / OTP ROUTES
 # =========================
 auth_patterns = [
-    path('check-role/', views.check_role),
-    path('send-otp/', views.send_otp),
-    path('verify-otp/', views.verify_otp),
-    path('login/', views.password_login),
+    path('check-role/', route("auth.check_role")),
+    path('send-otp/', route("auth.send_otp")),
+    path('verify-otp/', route("auth.verify_otp")),
+    path('login/', route("auth.password_login")),
 ]
 
 auth_patterns = [
-    path('register/', views.RegisterView.as_view(), name='register'),
-    path('check-role/', views.check_role, name='check-role'),
-    path('password-login/', views.password_login, name='password-login'),
-    path('send-otp/', views.send_otp, name='send-otp'),
-    path('verify-otp/', views.verify_otp, name='verify-otp'),
+    path('register/', route("auth.RegisterView"), name='register'),
+    path('check-role/', route("auth.check_role"), name='check-role'),
+    path('password-login/', route("auth.password_login"), name='password-login'),
+    path('send-otp/', route("auth.send_otp"), name='send-otp'),
+    path('verify-otp/', route("auth.verify_otp"), name='verify-otp'),
 
    
 ]
@@ -37,7 +43,7 @@ urlpatterns = [
 
     # AUTH
     # =========================
-    path("auth/check-role/", views.check_role, name="check-role"),
+    path("auth/check-role/", route("auth.check_role"), name="check-role"),
     path('auth/', include(auth_patterns)),
 
 
@@ -45,72 +51,87 @@ urlpatterns = [
     # DOCTORS & AVAILABILITY
     # =========================
     # ⚠️ must come BEFORE <int:pk> to avoid route conflicts
-    path("doctors/<int:doctor_id>/available-slots/", views.DoctorAvailableSlotsView.as_view(), name="doctor-available-slots"),
-    path("doctors/<int:doctor_id>/availability/", views.DoctorAvailableSlotsView.as_view(), name="doctor-availability-by-date"),
-    path("doctors/<int:doctor_id>/available-dates/", views.DoctorAvailableDatesView.as_view()),
-    path('doctors/', views.DoctorListView.as_view(), name='doctor-list'),
-    path('doctors/<int:pk>/', views.DoctorDetailView.as_view(), name='doctor-detail'),
-    path('doctor/profile/', views.DoctorProfileView.as_view(), name='doctor-profile'),
+    path("doctors/<int:doctor_id>/available-slots/", route("slots.DoctorAvailableSlotsView"), name="doctor-available-slots"),
+    path("doctors/<int:doctor_id>/availability/", route("slots.DoctorAvailableSlotsView"), name="doctor-availability-by-date"),
+    path("doctors/<int:doctor_id>/available-dates/", route("slots.DoctorAvailableDatesView")),
+    path('doctors/', route("doctors.DoctorListView"), name='doctor-list'),
+    path('doctors/<int:pk>/', route("doctors.DoctorDetailView"), name='doctor-detail'),
+    path('doctor/profile/', route("doctors.DoctorProfileView"), name='doctor-profile'),
 
     # Doctor availability management
-    path('doctor/availability/', views.DoctorAvailabilityView.as_view(), name='doctor-availability'),
-    path('doctor/availability/recurring/', views.DoctorAvailabilityBulkCreateView.as_view(), name='doctor-availability-recurring'),
-    path('doctor/availability/delete/', views.DoctorAvailabilityBulkDeleteView.as_view(), name='doctor-availability-delete'),
-    path('doctor/fee-management/', views.DoctorFeeManagementView.as_view(), name='doctor-fee-management'),
-    path("doctor/<int:doctor_id>/clinics/", views.DoctorClinicsView.as_view(), name="doctor-clinics"),
-    path('specializations/', views.SpecializationListView.as_view(), name='specialization-list'),
-    path("doctor/earnings-summary/", views.DoctorEarningsSummaryView.as_view(), name="doctor-earnings-summary"),
+    path('doctor/availability/', route("slots.DoctorAvailabilityView"), name='doctor-availability'),
+    path('doctor/availability/recurring/', route("slots.DoctorAvailabilityBulkCreateView"), name='doctor-availability-recurring'),
+    path('doctor/availability/delete/', route("slots.DoctorAvailabilityBulkDeleteView"), name='doctor-availability-delete'),
+    path('doctor/fee-management/', route("clinics.DoctorFeeManagementView"), name='doctor-fee-management'),
+    path("doctor/<int:doctor_id>/clinics/", route("clinics.DoctorClinicsView"), name="doctor-clinics"),
+    path('specializations/', route("doctors.SpecializationListView"), name='specialization-list'),
+    path("doctor/earnings-summary/", route("clinics.DoctorEarningsSummaryView"), name="doctor-earnings-summary"),
 
 
     # =========================
     # CLINIC SYSTEM
     # =========================
-    path('clinics/', views.ClinicListView.as_view(), name='clinic-list'),
-    path('clinics/<int:pk>/', views.ClinicDetailView.as_view(), name='clinic-detail'),
-    path('clinic/add/', views.add_clinic, name='add-clinic'),
-    path('clinic/doctor-requests/', views.ClinicOwnerRequestListView.as_view(), name='clinic-owner-requests'),
-    path('clinic/doctor-requests/<int:pk>/action/', views.ClinicDoctorApprovalView.as_view(), name='clinic-doctor-request-action'),
-    path('clinic/availability/<int:pk>/action/', views.ClinicApproveAvailabilityView.as_view(), name='clinic-availability-action'),
-    path('clinic/appointments/', views.ClinicAppointmentsView.as_view(), name='clinic-appointments'),
-    path('clinic/add-offline-appointment/', views.AddOfflineAppointmentView.as_view(), name='add-offline-appointment'),
-    path('clinic/revenues/', views.ClinicRevenueListView.as_view(), name='clinic-revenues'),
-    path('clinic/revenues/summary/', views.ClinicRevenueSummaryView.as_view(), name='clinic-revenues-summary'),
+    path('clinics/', route("clinics.ClinicListView"), name='clinic-list'),
+    path('clinics/<int:pk>/', route("clinics.ClinicDetailView"), name='clinic-detail'),
+    path('clinic/add/', route("clinics.add_clinic"), name='add-clinic'),
+    path('clinic/doctor-requests/', route("clinics.ClinicOwnerRequestListView"), name='clinic-owner-requests'),
+    path('clinic/doctor-requests/<int:pk>/action/', route("clinics.ClinicDoctorApprovalView"), name='clinic-doctor-request-action'),
+    path('clinic/availability/<int:pk>/action/', route("slots.ClinicApproveAvailabilityView"), name='clinic-availability-action'),
+    path('clinic/appointments/', route("clinics.ClinicAppointmentsView"), name='clinic-appointments'),
+    path('clinic/add-offline-appointment/', route("clinics.AddOfflineAppointmentView"), name='add-offline-appointment'),
+    path('clinic/revenues/', route("finance.ClinicRevenueListView"), name='clinic-revenues'),
+    path('clinic/revenues/summary/', route("finance.ClinicRevenueSummaryView"), name='clinic-revenues-summary'),
+    path('clinic/revenues/export/', route("finance.ClinicRevenueExportView"), name='clinic-revenues-export'),
+    path('clinic/<int:pk>/analytics/', route("finance.ClinicAnalyticsView"), name='clinic-analytics'),
+
+    # Settlements (batch payouts)
+    path('settlements/', route("finance.SettlementRunView"), name='settlement-runs'),
+    path('settlements/statements/', route("finance.SettlementStatementListView"), name='settlement-statements'),
+    path('settlements/statements/<int:pk>/csv/', route("finance.SettlementStatementCSVView"), name='settlement-statement-csv'),
 
     # Doctor join clinic requests
-    path('clinic-doctor-requests/', views.ClinicDoctorRequestCreateView.as_view(), name='clinic-doctor-request-create'),
-    path('doctor/clinic-requests/', views.DoctorClinicRequestListView.as_view(), name='doctor-clinic-requests'),
-    path('doctor/approved-clinics/', views.DoctorApprovedClinicsView.as_view(), name='doctor-approved-clinics'),
-    path("clinic/doctor-requests/<int:pk>/action/", views.ClinicDoctorApprovalView.as_view(), name="clinic-doctor-request-action"),
+    path('clinic-doctor-requests/', route("clinics.ClinicDoctorRequestCreateView"), name='clinic-doctor-request-create'),
+    path('doctor/clinic-requests/', route("clinics.DoctorClinicRequestListView"), name='doctor-clinic-requests'),
+    path('doctor/approved-clinics/', route("clinics.DoctorApprovedClinicsView"), name='doctor-approved-clinics'),
+    path("clinic/doctor-requests/<int:pk>/action/", route("clinics.ClinicDoctorApprovalView"), name="clinic-doctor-request-action"),
 
     # Doctor Schedule
-    path("doctor/schedule/", views.DoctorScheduleListView.as_view(), name="doctor-schedule"),
-    path("doctor/schedule/summary/", views.DoctorScheduleSummaryView.as_view(), name="doctor-schedule-summary"),
+    path("doctor/schedule/", route("schedule.DoctorScheduleListView"), name="doctor-schedule"),
+    path("doctor/schedule/summary/", route("schedule.DoctorScheduleSummaryView"), name="doctor-schedule-summary"),
 
 
     # =========================
     # APPOINTMENTS & PAYMENTS
     # =========================
-    path('appointments/', views.AppointmentListView.as_view(), name='appointment-list'),
-    path('appointments/create/', views.AppointmentCreateView.as_view(), name='appointment-create'),
-    path('appointments/<int:pk>/cancel/', views.cancel_appointment, name='appointment-cancel'),
-    path("doctor/appointments/", views.DoctorAppointmentsListView.as_view(), name="doctor-appointments"),
-    path('payment/create-order/', views.create_payment_order, name='create-payment-order'),
-    path('payment/verify/', views.verify_payment, name='verify-payment'),
+    path('appointments/', route("appointments.AppointmentListView"), name='appointment-list'),
+    path('appointments/create/', route("appointments.AppointmentCreateView"), name='appointment-create'),
+    path('appointments/<int:pk>/cancel/', route("appointments.cancel_appointment"), name='appointment-cancel'),
+    path("doctor/appointments/", route("schedule.DoctorAppointmentsListView"), name="doctor-appointments"),
+    path('payment/create-order/', route("payments.create_payment_order"), name='create-payment-order'),
+    path('payment/verify/', route("payments.verify_payment"), name='verify-payment'),
+    # ⚠️ must come BEFORE the router, otherwise "export" is read as a payment pk
+    path('payments/export/', route("finance.PaymentExportView"), name='payments-export'),
     
 
     # =========================
     # PATIENT DASHBOARD
     # =========================
-    path('patient/profile/', views.PatientProfileView.as_view(), name='patient-profile'),
-    path('patient/reports/', views.MedicalReportListView.as_view(), name='patient-reports'),
-    path('patient/reports/upload/', views.UploadMedicalReportView.as_view(), name='upload-report'),
-    path('patient/reports/<int:pk>/delete/', views.DeleteMedicalReportView.as_view(), name='delete-report'),
-    path('reminders/', views.ReminderListView.as_view(), name='reminder-list'),
-    path('reminder/add/', views.AddReminderView.as_view(), name='add-reminder'),
-    path('patient/<int:patient_id>/details/', views.PatientDetailView.as_view(), name='patient-details'),
-    path('doctor/book-followup/', views.DoctorBookFollowupView.as_view(), name='doctor-book-followup'),
-    path("analyze-symptoms/", views.analyze_symptoms),
-    path("chatbot/", views.homepage_chatbot),
+    path('patient/profile/', route("patients.PatientProfileView"), name='patient-profile'),
+    path('patient/reports/', route("patients.MedicalReportListView"), name='patient-reports'),
+    path('patient/reports/upload/', route("patients.UploadMedicalReportView"), name='upload-report'),
+    path('patient/reports/<int:pk>/delete/', route("patients.DeleteMedicalReportView"), name='delete-report'),
+    path('reminders/', route("patients.ReminderListView"), name='reminder-list'),
+    path('reminder/add/', route("patients.AddReminderView"), name='add-reminder'),
+    path('patient/<int:patient_id>/details/', route("schedule.PatientDetailView"), name='patient-details'),
+    path('doctor/book-followup/', route("schedule.DoctorBookFollowupView"), name='doctor-book-followup'),
+    path("analyze-symptoms/", route("assistant.analyze_symptoms")),
+    path("chatbot/", route("assistant.homepage_chatbot")),
+    path("analyze-symptoms/stream/", route("assistant.analyze_symptoms_stream", is_async=True), name="analyze-symptoms-stream"),
+    path("chatbot/stream/", route("assistant.homepage_chatbot_stream", is_async=True), name="chatbot-stream"),
+    path("llm/cache-stats/", route("ops.LLMCacheStatsView"), name="llm-cache-stats"),
+    path("rate-limits/stats/", route("ops.RateLimitStatsView"), name="rate-limit-stats"),
+    path("otp/delivery-stats/", route("ops.OTPDeliveryStatsView"), name="otp-delivery-stats"),
+    path("db/pool-stats/", route("ops.DBPoolStatsView"), name="db-pool-stats"),
 
   
 
@@ -119,10 +140,10 @@ urlpatterns = [
     # =========================
     # STATIC / HOME
     # =========================
-    path('home-images/', views.HomeImageListView.as_view(), name='home-images'),
+    path('home-images/', route("doctors.HomeImageListView"), name='home-images'),
 
     # =========================
     # ROUTER (notifications, payments, reviews)
     # =========================
-    path('', include(router.urls)),
+    *router_patterns,
 ]
@@ -1,11 +1,23 @@
 # myapp/utils.py
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, send_mail
 from django.conf import settings
 
+
+def otp_email_content(otp_code):
+    subject = "Your Login OTP - Wellora"
+    minutes = getattr(settings, "OTP_EXPIRY_MINUTES", 10)
+    message = f"Dear user,\n\nYour OTP code is: {otp_code}\nThis code is valid for {minutes} minutes.\n\nRegards,\nWellora Team"
+    return subject, message
+
+
+def build_otp_email(email, otp_code, connection=None):
+    subject, message = otp_email_content(otp_code)
+    return EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [email], connection=connection)
+
+
 def send_otp_via_email(email, otp_code):
     """Send OTP to user's email."""
-    subject = "Your Login OTP - Wellora"
-    message = f"Dear user,\n\nYour OTP code is: {otp_code}\nThis code is valid for 5 minutes.\n\nRegards,\nWellora Team"
+    subject, message = otp_email_content(otp_code)
     from_email = settings.DEFAULT_FROM_EMAIL
     try:
         send_mail(subject, message, from_email, [email])
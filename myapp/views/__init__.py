@@ -0,0 +1,93 @@
+# ===============================================
+# ✅ WELLORA — Views (split by area, imported on first use)
+# ===============================================
+"""
+urls.py routes through `route("module.Name")`, which imports the view module on
+the first request that reaches it. A worker boots without the serializers,
+razorpay, pandas (finance) or the LLM client and only loads what its traffic
+needs; `manage.py` commands never load them.
+
+`views.SomeView` still resolves (shell, tests) by importing the owning module.
+EAGER_VIEWS=1 imports every module at app startup instead (MyappConfig.ready) —
+use it with `gunicorn --preload` so forked workers share the imported pages.
+"""
+import importlib
+
+MODULES = (
+    "auth", "doctors", "slots", "appointments", "schedule", "patients", "payments",
+    "viewsets", "clinics", "finance", "assistant", "ops",
+)
+
+
+# method → action maps DefaultRouter uses for a ModelViewSet
+VIEWSET_LIST = {"get": "list", "post": "create"}
+VIEWSET_DETAIL = {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}
+
+
+def _load(dotted, actions=None):
+    module, _, name = dotted.rpartition(".")
+    target = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    if actions is not None:
+        return target.as_view(actions)
+    return target.as_view() if hasattr(target, "as_view") else target
+
+
+def route(dotted, is_async=False, csrf_exempt=True, actions=None):
+    """
+    URL callback for "module.ViewOrFunction" that imports it on first call.
+
+    Django reads `csrf_exempt` and sync/async-ness off the callback before the
+    view exists, so both are declared here: every API view is csrf-exempt
+    (DRF), and the SSE views are async. `actions` binds a viewset the way a
+    router would ({"get": "list"}).
+    """
+    resolved = []
+
+    def view():
+        if not resolved:
+            resolved.append(_load(dotted, actions))
+        return resolved[0]
+
+    if is_async:
+        async def lazy_view(request, *args, **kwargs):
+            return await view()(request, *args, **kwargs)
+    else:
+        def lazy_view(request, *args, **kwargs):
+            return view()(request, *args, **kwargs)
+
+    lazy_view.__name__ = lazy_view.__qualname__ = dotted.rpartition(".")[2]
+    lazy_view.__module__ = f"{__name__}.{dotted.rpartition('.')[0]}"
+    lazy_view.csrf_exempt = csrf_exempt
+    lazy_view.lazy_target = dotted
+    lazy_view.lazy_actions = actions
+    return lazy_view
+
+
+def viewset_routes(prefix, dotted, basename, read_only=False):
+    """
+    The list / detail routes (and names) DefaultRouter registers for a model
+    viewset, without importing the viewset — registering it on a router would.
+    """
+    from django.urls import re_path
+
+    list_actions = {"get": "list"} if read_only else VIEWSET_LIST
+    detail_actions = {"get": "retrieve"} if read_only else VIEWSET_DETAIL
+    return [
+        re_path(rf"^{prefix}/$", route(dotted, actions=list_actions), name=f"{basename}-list"),
+        re_path(rf"^{prefix}/(?P<pk>[^/.]+)/$", route(dotted, actions=detail_actions), name=f"{basename}-detail"),
+    ]
+
+
+def load_all():
+    for module in MODULES:
+        importlib.import_module(f"{__name__}.{module}")
+
+
+def __getattr__(name):
+    if name.startswith("__"):
+        raise AttributeError(name)
+    for module in MODULES:
+        mod = importlib.import_module(f"{__name__}.{module}")
+        if hasattr(mod, name):
+            return getattr(mod, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,162 @@
+# ===============================================
+# ✅ WELLORA — Views: Booking, listing & cancelling appointments
+# ===============================================
+import uuid
+
+from django.db import IntegrityError
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import slots as slot_engine
+from ..models import Appointment, Clinic, DoctorProfile, TimeSlot
+from ..serializers import AppointmentSerializer
+
+
+class AppointmentCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        data = request.data
+        doctor_id = data.get("doctor")
+        clinic_id = data.get("clinic")
+        timeslot_id = data.get("timeslot")
+
+        if not all([doctor_id, clinic_id, timeslot_id]):
+            return Response(
+                {"error": "Doctor, clinic, and timeslot are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        doctor = get_object_or_404(DoctorProfile, id=doctor_id)
+        clinic = get_object_or_404(Clinic, id=clinic_id)
+        if slot_engine.parse_virtual_slot_id(timeslot_id):
+            # virtual slot: the row is created (already booked) here
+            timeslot = slot_engine.claim(timeslot_id, doctor.id, clinic.id)
+            if timeslot is None:
+                return Response({"error": "Timeslot is no longer available"}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            timeslot = get_object_or_404(TimeSlot, id=timeslot_id, is_booked=False)
+
+            timeslot.is_booked = True
+            timeslot.save()
+
+        today = timezone.now().date()
+
+        # Generate a per-doctor-per-day counter
+        same_day_count = Appointment.objects.filter(
+            doctor=doctor, timeslot__start__date=today
+        ).count() + 1
+
+        # Add short random suffix for uniqueness
+        short_uid = uuid.uuid4().hex[:4].upper()
+        token_no = f"T{same_day_count}-{short_uid}"
+
+        try:
+            appointment = Appointment.objects.create(
+                patient=request.user,
+                doctor=doctor,
+                clinic=clinic,
+                timeslot=timeslot,
+                token_no=token_no,
+                amount=doctor.fee or 0,
+                paid=False,
+            )
+        except IntegrityError:
+            # In case of rare collision, regenerate a new token
+            token_no = f"T{same_day_count}-{uuid.uuid4().hex[:4].upper()}"
+            appointment = Appointment.objects.create(
+                patient=request.user,
+                doctor=doctor,
+                clinic=clinic,
+                timeslot=timeslot,
+                token_no=token_no,
+                amount=doctor.fee or 0,
+                paid=False,
+            )
+
+        return Response(
+            {
+                "message": "Appointment booked successfully",
+                "token_no": appointment.token_no,
+                "doctor": doctor.id,
+                "clinic": clinic.id,
+                "timeslot": timeslot.id,
+                "amount": float(doctor.fee or 0),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+# -------------------------
+# Appointment list (patient)
+# -------------------------
+class AppointmentListView(generics.ListAPIView):
+    serializer_class = AppointmentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        qs = Appointment.objects.select_related(
+            "doctor__user", "clinic", "timeslot", "patient__patientprofile"
+        ).order_by("-created_at")
+
+        if user.role == "patient":
+            return qs.filter(patient=user)
+        elif user.role == "doctor":
+            return qs.filter(doctor__user=user)
+        elif user.role == "clinic_owner":
+            return qs.filter(clinic__owner=user)
+        return Appointment.objects.none()
+
+
+# --------------------------------------
+# 🔹 Appointment Cancel API
+# --------------------------------------
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def cancel_appointment(request, pk):
+    """
+    Allows a patient to cancel their own appointment.
+    Automatically frees up the booked timeslot.
+    """
+    try:
+        appointment = Appointment.objects.select_related("timeslot").get(pk=pk)
+
+        # ✅ Security: Only the patient who booked it can cancel
+        if appointment.patient != request.user:
+            return Response(
+                {"error": "You are not authorized to cancel this appointment."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # ✅ Prevent double cancellation
+        if appointment.status == "cancelled":
+            return Response(
+                {"message": "This appointment is already cancelled."},
+                status=status.HTTP_200_OK,
+            )
+
+        # ✅ Mark appointment as cancelled
+        appointment.status = "cancelled"
+        appointment.save(update_fields=["status"])
+
+        # ✅ Free up the timeslot
+        if appointment.timeslot:
+            appointment.timeslot.is_booked = False
+            appointment.timeslot.save(update_fields=["is_booked"])
+
+        return Response(
+            {"success": True, "message": "Appointment cancelled successfully."},
+            status=status.HTTP_200_OK,
+        )
+
+    except Appointment.DoesNotExist:
+        return Response({"error": "Appointment not found."}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        print("❌ Cancel appointment error:", e)
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,191 @@
+# ===============================================
+# ✅ WELLORA — Views: Symptom analysis & chatbot (JSON + SSE)
+# ===============================================
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from asgiref.sync import sync_to_async
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .. import llm
+from .. import matcher as symptom_matcher
+from .. import streaming
+from ..models import DoctorProfile
+from ..throttling import throttles_for
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@throttle_classes(throttles_for("analyze_symptoms", "ip", "user"))
+def analyze_symptoms(request):
+    symptoms = request.data.get("symptoms", "")
+    if not symptoms or len(symptoms) < 3:
+        return Response({"error": "Please enter valid symptoms"}, status=400)
+
+    try:
+        # the local matcher answers confident cases; the LLM (cached) only the rest
+        match = symptom_matcher.match(symptoms)
+        if match.confidence >= symptom_matcher.MATCHER_MIN_CONFIDENCE:
+            analysis, cached, source = {
+                "conditions": match.conditions,  # matched Symptom rows; no LLM call
+                "specialist": match.specialization,
+                "advice": llm.DEFAULT_ADVICE,
+            }, False, "matcher"
+        else:
+            try:
+                # conditions / specialist / advice, cached per normalized symptom text
+                analysis, cached = llm.analyze_symptoms(symptoms)
+                source = "cache" if cached else "llm"
+            except llm.LLMUnavailable as e:
+                print("⚠️ LLM unavailable, answering from matcher:", e)
+                analysis, cached, source = {
+                    "conditions": [],
+                    "specialist": match.specialization or llm.DEFAULT_SPECIALIST,
+                    "advice": llm.DEFAULT_ADVICE,
+                }, False, "fallback"
+        mapped_specialist = analysis["specialist"]
+
+        # ----------------------------------------------
+        # GET MATCHING DOCTORS
+        # ----------------------------------------------
+        matched_doctors = []
+        doctors = DoctorProfile.objects.filter(
+            specialization__name=mapped_specialist,
+            is_verified=True
+        ).select_related("user", "specialization")
+
+        for d in doctors:
+            matched_doctors.append({
+                "id": d.id,
+                "name": d.user.full_name,
+                "qualification": d.qualification,
+                "fee": float(d.fee),
+                "specialization": d.specialization.name if d.specialization else "",
+            })
+
+        # ----------------------------------------------
+        # SEND TO FRONTEND
+        # ----------------------------------------------
+        return Response({
+            "conditions": analysis["conditions"],
+            "specialist": mapped_specialist,
+            "advice": analysis["advice"],
+            "doctors": matched_doctors,
+            "cached": cached,
+            "source": source,
+        })
+
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@throttle_classes(throttles_for("chatbot", "ip", "user"))
+def homepage_chatbot(request):
+    """
+    Lightweight public chatbot for homepage.
+    """
+    try:
+        question = request.data.get("message", "").strip()
+        if not question:
+            return Response({"error": "Message is required"}, status=400)
+
+        reply = llm.complete(
+            llm.CHATBOT_SYSTEM_PROMPT, question, max_tokens=150, fallback=llm.CHATBOT_FALLBACK
+        )
+
+        return Response({"reply": reply})
+
+    except Exception as e:
+        import traceback
+        print("\n\n=== CHATBOT ERROR TRACEBACK ===")
+        traceback.print_exc()
+        print("=== END TRACEBACK ===\n\n")
+        return Response({"error": str(e)}, status=500)
+
+
+# =========================================================
+# 🔹 STREAMING (SSE) CHATBOT / SYMPTOM ANALYSIS — async, serve via ASGI
+# =========================================================
+def _matched_doctors(specialization_name):
+    return [
+        {
+            "id": d.id,
+            "name": d.user.full_name,
+            "qualification": d.qualification,
+            "fee": float(d.fee),
+            "specialization": d.specialization.name if d.specialization else "",
+        }
+        for d in DoctorProfile.objects.filter(
+            specialization__name=specialization_name, is_verified=True
+        ).select_related("user", "specialization")
+    ]
+
+
+@csrf_exempt
+async def homepage_chatbot_stream(request):
+    """
+    POST /api/chatbot/stream/   { "message": "..." }
+    SSE: `token` events with text pieces, then `done`.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+    body = streaming.parse_json_body(request)
+    question = str((body or {}).get("message", "")).strip()
+    if not question:
+        return JsonResponse({"error": "Message is required"}, status=400)
+
+    async def events():
+        async for piece in llm.stream_completion(llm.CHATBOT_SYSTEM_PROMPT, question, max_tokens=150):
+            yield streaming.sse({"text": piece}, event="token")
+        yield streaming.sse({}, event="done")
+
+    return await streaming.open_stream(request, events())
+
+
+@csrf_exempt
+async def analyze_symptoms_stream(request):
+    """
+    POST /api/analyze-symptoms/stream/   { "symptoms": "..." }
+    SSE: `token` events while the LLM writes (skipped on matcher / cache hits),
+    then one `result` event shaped like analyze_symptoms' response.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+    body = streaming.parse_json_body(request)
+    symptoms = str((body or {}).get("symptoms", ""))
+    if len(symptoms) < 3:
+        return JsonResponse({"error": "Please enter valid symptoms"}, status=400)
+
+    async def events():
+        match = await sync_to_async(symptom_matcher.match)(symptoms)
+        key = llm.normalize_symptoms(symptoms) or symptoms.strip().lower()
+        if match.confidence >= symptom_matcher.MATCHER_MIN_CONFIDENCE:
+            analysis, source = {
+                "conditions": match.conditions, "specialist": match.specialization, "advice": llm.DEFAULT_ADVICE,
+            }, "matcher"
+        else:
+            analysis, source = llm.analysis_cache.get(key), "cache"
+
+        if analysis is None:
+            parts = []
+            async for piece in llm.stream_completion(llm.ANALYSIS_SYSTEM_PROMPT, symptoms, max_tokens=400):
+                parts.append(piece)
+                yield streaming.sse({"text": piece}, event="token")
+            analysis, source = llm.parse_analysis("".join(parts)), "llm"
+            llm.analysis_cache.set(key, analysis)
+
+        doctors = await sync_to_async(_matched_doctors)(analysis["specialist"])
+        yield streaming.sse({
+            "conditions": analysis["conditions"],
+            "specialist": analysis["specialist"],
+            "advice": analysis["advice"],
+            "doctors": doctors,
+            "cached": source == "cache",
+            "source": source,
+        }, event="result")
+        yield streaming.sse({}, event="done")
+
+    return await streaming.open_stream(request, events())
@@ -0,0 +1,200 @@
+# ===============================================
+# ✅ WELLORA — Views: Registration, role check, OTP & password login
+# ===============================================
+from django.contrib.auth import authenticate, get_user_model
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..authentication import tokens_for
+from ..models import DoctorProfile, EmailOTP, PatientProfile, Specialization
+from ..otp_delivery import deliver_otp
+from ..throttling import throttles_for
+
+User = get_user_model()
+
+
+class RegisterView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        data = request.data
+        role = data.get("role")
+        email = data.get("email")
+        password = data.get("password")
+        confirm_password = data.get("confirm_password")
+        full_name = data.get("full_name")
+        specialization_name = data.get("specialization_name", "")
+        clinic_name = data.get("clinic_name", "")
+        clinic_address = data.get("clinic_address", "")
+
+        # ======== BASIC VALIDATIONS ========
+        if not email or not password or not full_name or not role:
+            return Response({"error": "All fields are required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if password != confirm_password:
+            return Response({"error": "Passwords do not match."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(password) < 8:
+            return Response({"error": "Password must be at least 8 characters."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if User.objects.filter(email=email).exists():
+            return Response({"error": "Email already registered."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # ======== DOCTOR SIGNUP ========
+        if role == "doctor":
+            if not specialization_name:
+                return Response({"error": "Specialization is required for doctors."}, status=status.HTTP_400_BAD_REQUEST)
+
+            specialization, _ = Specialization.objects.get_or_create(name=specialization_name.strip())
+
+            user = User.objects.create_user(
+                email=email,
+                password=password,
+                full_name=full_name,
+                role=User.ROLE_DOCTOR,
+                is_active=True,
+                is_approved=True,  # ✅ no admin approval needed
+            )
+
+            DoctorProfile.objects.create(user=user, specialization=specialization,is_verified=False)
+            return Response(
+                {"message": "Doctor registered successfully."},
+                status=status.HTTP_201_CREATED
+            )
+
+        # ======== PATIENT SIGNUP ========
+        elif role == "patient":
+            user = User.objects.create_user(
+                email=email,
+                password=password,
+                full_name=full_name,
+                role=User.ROLE_PATIENT,
+                is_active=True,
+                is_approved=True,
+            )
+            PatientProfile.objects.create(user=user)
+            return Response(
+                {"message": "Patient registered successfully."},
+                status=status.HTTP_201_CREATED
+            )
+# ======== CLINIC OWNER SIGNUP ========
+        elif role == "clinic_owner":
+            user = User.objects.create_user(
+                email=email,
+                password=password,
+                full_name=full_name,
+                role=User.ROLE_CLINIC_OWNER,
+                is_active=False,   # ✅ cannot log in until admin approval
+                is_approved=False, # ✅ must be approved manually
+            )
+
+            return Response(
+                {
+                    "message": "Clinic owner registered successfully. Please wait for admin approval before logging in."
+                },
+                status=status.HTTP_201_CREATED,
+            )
+
+
+#------Login------#
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@throttle_classes(throttles_for("check_role", "ip", "email"))
+def check_role(request):
+    email = request.data.get("email", "").strip().lower()
+
+    if not email:
+        return Response({"role": "not_found"})
+
+    user = User.objects.filter(email=email).first()
+    if not user:
+        return Response({"role": "not_found"})
+
+    return Response({"role": user.role})
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@throttle_classes(throttles_for("send_otp", "ip", "email"))
+def send_otp(request):
+    email = request.data.get("email", "").strip().lower()
+
+    if not email:
+        return Response({"error": "Email is required"}, status=400)
+
+    user = User.objects.filter(email=email).first()
+    if not user:
+        return Response({"error": "No user found with this email"}, status=404)
+
+    otp = EmailOTP.generate_otp(email)
+
+    # delivered by the background worker (SMS first when we know a phone, email otherwise)
+    phone = PatientProfile.objects.filter(user=user).values_list("phone", flat=True).first()
+    channel = deliver_otp(email, otp, phone=phone, prefer=request.data.get("channel"))
+
+    if channel == "sms":
+        return Response({"message": "OTP sent to your registered phone number", "channel": "sms"}, status=200)
+    return Response({"message": f"OTP sent to {email}", "channel": "email"}, status=200)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def verify_otp(request):
+    email = request.data.get("email", "").strip().lower()
+    code = request.data.get("code")
+
+    if not email or not code:
+        return Response({"error": "Email and OTP are required"}, status=400)
+
+    result = EmailOTP.verify(email, code)
+    if result == EmailOTP.LOCKED:
+        return Response({"error": "Too many wrong attempts. Please request a new OTP."}, status=429)
+    if result != EmailOTP.VERIFIED:
+        return Response({"error": "Invalid or expired OTP"}, status=400)
+
+    user = User.objects.filter(email=email).first()
+    if not user:
+        return Response({"error": "User not found"}, status=404)
+
+    access, refresh = tokens_for(user)
+    return Response({
+        "access": access,
+        "refresh": refresh,
+        "role": user.role,
+        "username": user.full_name,
+        "profileCompleted": True
+    }, status=200)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def password_login(request):
+    email = request.data.get("email", "").strip().lower()
+    password = request.data.get("password")
+
+    if not email or not password:
+        return Response({"error": "Email and password required"}, status=400)
+
+    user = authenticate(email=email, password=password)
+
+    if not user:
+        return Response({"error": "Invalid email or password"}, status=400)
+
+    # Clinic owner admin-approval removed → always allow
+    if user.role == User.ROLE_CLINIC_OWNER:
+        user.is_active = True
+        user.is_approved = True
+        user.save()
+
+    access, refresh = tokens_for(user)
+
+    return Response({
+        "access": access,
+        "refresh": refresh,
+        "role": user.role,
+        "username": user.full_name,
+        "profileCompleted": True
+    }, status=200)
@@ -0,0 +1,645 @@
+# ===============================================
+# ✅ WELLORA — Views: Clinics, doctor ↔ clinic requests, fees & offline bookings
+# ===============================================
+import uuid
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import cache as public_cache
+from .. import etags
+from ..authentication import ClaimsJWTAuthentication, tokens_for
+from ..cache import CachedResponseMixin
+from ..etags import conditional_get
+from ..loaders import get_loader
+from ..models import (
+    Appointment,
+    Clinic,
+    ClinicDoctorRequest,
+    ClinicRevenue,
+    DoctorFeeManagement,
+    DoctorProfile,
+    Notification,
+    TimeSlot,
+)
+from ..serializers import (
+    AppointmentSerializer,
+    ClinicDoctorRequestSerializer,
+    ClinicSerializer,
+    DoctorFeeManagementSerializer,
+)
+
+User = get_user_model()
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def add_clinic(request):
+    user = request.user
+
+    # 🔒 Only clinic owners can add clinics
+    if user.role != "clinic_owner":
+        return Response({"error": "Only clinic owners can add clinics."}, status=status.HTTP_403_FORBIDDEN)
+
+    name = request.data.get("name")
+    address = request.data.get("address")
+    phone = request.data.get("phone", "")
+
+    if not name or not address:
+        return Response({"error": "Name and address are required."}, status=status.HTTP_400_BAD_REQUEST)
+
+    clinic = Clinic.objects.create(
+        owner=user,
+        name=name,
+        address=address,
+        phone=phone,
+        is_verified=False,  # 🕒 Admin verifies later
+    )
+
+    # the new clinic revoked the owner's tokens (clinic_ids claim); hand out fresh ones
+    access, refresh = tokens_for(user)
+    return Response(
+        {
+            "message": "Clinic created successfully. Waiting for admin verification.",
+            "clinic": ClinicSerializer(clinic, context={"request": request}).data,
+            "access": access,
+            "refresh": refresh,
+        },
+        status=status.HTTP_201_CREATED,
+    )
+
+
+# =========================================================
+# 🔹 CLINICS
+# =========================================================
+class ClinicListView(generics.ListCreateAPIView):
+    """
+    - GET  → list clinics
+      * Clinic owner → only their clinics
+      * Doctor/patient → all clinics
+      * Public → all verified clinics
+    - POST → create a clinic (auto-assigns owner); the response also carries
+      a fresh access/refresh pair, as the old tokens no longer list the clinic
+    """
+    serializer_class = ClinicSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_authenticated:
+            if user.role == "clinic_owner":
+                return Clinic.objects.filter(owner=user).select_related("owner").order_by("-created_at")
+            elif user.role in ["doctor", "patient", "admin"]:
+                return Clinic.objects.select_related("owner").order_by("-created_at")
+        # Unauthenticated users → only verified ones
+        return Clinic.objects.filter(is_verified=True).select_related("owner").order_by("-created_at")
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get("many"):
+            clinics = list(args[0])
+            get_loader(self.request).prime_clinic_links([c.id for c in clinics])
+            args = (clinics,) + args[1:]
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        """
+        When a clinic owner adds a clinic, it automatically links to them.
+        """
+        user = self.request.user
+        if not user.is_authenticated or user.role != "clinic_owner":
+            raise PermissionDenied("Only clinic owners can add clinics.")
+        serializer.save(owner=user, is_verified=False)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        # the new clinic revoked the owner's tokens (clinic_ids claim); hand out fresh ones
+        response.data["access"], response.data["refresh"] = tokens_for(request.user)
+        return response
+
+
+# CLINIC DETAIL VIEW
+# ======================
+class ClinicDetailView(CachedResponseMixin, generics.RetrieveAPIView):
+    queryset = Clinic.objects.all()
+    serializer_class = ClinicSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_cache_namespaces(self):
+        return (public_cache.CLINIC_SHARED, public_cache.clinic_ns(self.kwargs["pk"]))
+
+    @conditional_get(lambda view, request, pk: etags.clinic_etag(request, pk))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        clinic_data = self.get_serializer(instance).data
+
+        # ✅ Get all doctors who are approved to work in this clinic
+        approved_doctors = get_loader(request).clinic_links(instance.id, status="approved")
+
+        # ✅ Include approved doctor details in clinic response
+        clinic_data["approved_doctors"] = [
+            {
+                "id": r.doctor.id,
+                "full_name": r.doctor.user.full_name,
+                "specialization": (
+                    r.doctor.specialization.name if r.doctor.specialization else "General Practitioner"
+                ),
+                "is_verified": r.doctor.is_verified,
+            }
+            for r in approved_doctors
+        ]
+
+        return Response(clinic_data, status=status.HTTP_200_OK)
+
+
+# =========================================================
+# 🔹 DOCTOR → CLINIC REQUEST
+# =========================================================
+class ClinicDoctorRequestCreateView(generics.CreateAPIView):
+    """
+    Allows a doctor to send or re-send a request to join a clinic.
+    Prevents duplicates by updating rejected ones instead of creating new rows.
+    """
+    queryset = ClinicDoctorRequest.objects.all()
+    serializer_class = ClinicDoctorRequestSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        doctor = get_loader(request).doctor_profile()
+        if not doctor:
+            return Response(
+                {"error": "Doctor profile not found for this user."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        clinic_id = request.data.get("clinic")
+        if not clinic_id:
+            return Response({"error": "Clinic ID is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            clinic = Clinic.objects.get(id=clinic_id)
+        except Clinic.DoesNotExist:
+            return Response({"error": "Clinic not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        # 🧠 Check for existing request
+        existing = ClinicDoctorRequest.objects.filter(doctor=doctor, clinic=clinic).first()
+
+        if existing:
+            if existing.status == "pending":
+                return Response(
+                    {"error": "You already have a pending request for this clinic."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            elif existing.status == "approved":
+                return Response(
+                    {"error": "You are already approved for this clinic."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            elif existing.status == "rejected":
+                # ♻️ Reopen the rejected request
+                existing.status = "pending"
+                existing.save()
+
+                Notification.objects.create(
+                    user=clinic.owner,
+                    message=f"Dr. {doctor.user.full_name} has re-sent a join request for '{clinic.name}'."
+                )
+
+                return Response(
+                    {"message": "Join request re-sent successfully."},
+                    status=status.HTTP_200_OK
+                )
+
+        # ✅ No previous request → create a new one
+        new_request = ClinicDoctorRequest.objects.create(
+            doctor=doctor,
+            clinic=clinic,
+            status="pending"
+        )
+
+        Notification.objects.create(
+            user=clinic.owner,
+            message=f"Dr. {doctor.user.full_name} has requested to join your clinic '{clinic.name}'."
+        )
+
+        return Response(
+            {"message": "Join request sent successfully."},
+            status=status.HTTP_201_CREATED
+        )
+
+
+class DoctorClinicRequestListView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+
+        if user.role != "doctor":
+            return Response({"error": "Only doctors can view this"}, status=403)
+
+        doctor = get_loader(request).doctor_profile_id()
+        if not doctor:
+            return Response({"error": "Doctor profile not found"}, status=404)
+
+        requests = ClinicDoctorRequest.objects.filter(doctor=doctor).select_related("clinic")
+
+        data = [
+            {
+                "id": r.id,
+                "clinic": r.clinic.name,
+                "clinic_id": r.clinic.id,
+                "status": r.status,
+                "requested_at": r.created_at.strftime("%Y-%m-%d %H:%M"),
+            }
+            for r in requests
+        ]
+
+        return Response(data, status=200)
+
+
+# =========================================================
+# 🔹 DOCTOR → VIEW APPROVED CLINICS
+# =========================================================
+class DoctorClinicsView(APIView):
+    """
+    Returns all approved clinics for a specific doctor, along with consultation fee if set.
+    Public endpoint (for patient view).
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, doctor_id):
+        doctor = DoctorProfile.objects.filter(id=doctor_id).first()
+        if not doctor:
+            return Response({"error": "Doctor not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        approved_links = get_loader(request).approved_links(doctor.id)
+
+        # DoctorFeeManagement records for (doctor, clinic), one query for all clinics
+        fees = {f.clinic_id: f for f in DoctorFeeManagement.objects.filter(doctor=doctor)}
+
+        data = []
+        for link in approved_links:
+            clinic = link.clinic
+            fee_record = fees.get(clinic.id)
+            consultation_fee = float(fee_record.consultation_fee) if fee_record else None
+            clinic_share_percent = float(fee_record.clinic_share_percent) if fee_record else None
+
+            data.append({
+                "id": clinic.id,
+                "name": clinic.name,
+                "address": clinic.address,
+                "consultation_fee": consultation_fee,
+                "clinic_share_percent": clinic_share_percent,
+            })
+
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class DoctorApprovedClinicsView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        if user.role != "doctor":
+            return Response({"error": "Only doctors can view this."}, status=403)
+
+        doctor = get_loader(request).doctor_profile_id()
+        if not doctor:
+            return Response({"error": "Doctor profile not found."}, status=404)
+
+        approved = ClinicDoctorRequest.objects.filter(
+            doctor=doctor, status="approved"
+        ).select_related("clinic__owner")
+
+        data = [
+            {
+                "id": r.clinic.id,
+                "name": r.clinic.name,
+                "address": r.clinic.address,
+                "owner": r.clinic.owner.full_name,
+            }
+            for r in approved
+        ]
+        return Response(data, status=200)
+
+
+class DoctorFeeManagementView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Return all fee records for the logged-in doctor."""
+        user = request.user
+        if user.role != "doctor":
+            return Response({"error": "Only doctors can view this."}, status=403)
+
+        doctor = get_loader(request).doctor_profile_id()
+        if not doctor:
+            return Response({"error": "Doctor profile not found."}, status=404)
+
+        fees = DoctorFeeManagement.objects.filter(doctor=doctor).select_related("clinic")
+        serializer = DoctorFeeManagementSerializer(fees, many=True)
+        return Response(serializer.data, status=200)
+
+    def post(self, request):
+        """Create or update consultation fee for a clinic and sync DoctorProfile.fee."""
+        user = request.user
+        if user.role != "doctor":
+            return Response({"error": "Only doctors can set fees."}, status=403)
+
+        doctor = get_loader(request).doctor_profile()
+        if not doctor:
+            return Response({"error": "Doctor profile not found."}, status=404)
+
+        clinic_id = request.data.get("clinic_id")
+        consultation_fee = request.data.get("consultation_fee")
+
+        if not clinic_id or consultation_fee is None:
+            return Response({"error": "clinic_id and consultation_fee are required."}, status=400)
+
+        try:
+            consultation_fee = float(consultation_fee)
+        except ValueError:
+            return Response({"error": "Invalid fee amount."}, status=400)
+
+        try:
+            clinic = Clinic.objects.get(id=clinic_id)
+        except Clinic.DoesNotExist:
+            return Response({"error": "Clinic not found."}, status=404)
+
+        # ✅ Check approval
+        approved = get_loader(request).is_approved(doctor.id, clinic.id)
+        if not approved:
+            return Response({"error": "You are not approved for this clinic."}, status=403)
+
+        # ✅ Create or update DoctorFeeManagement
+        fee_obj, created = DoctorFeeManagement.objects.update_or_create(
+            doctor=doctor,
+            clinic=clinic,
+            defaults={"consultation_fee": consultation_fee},
+        )
+
+        # 🟢 NEW: Sync DoctorProfile global fee
+        if consultation_fee > 0:
+            doctor.fee = consultation_fee
+            doctor.save(update_fields=["fee"])
+
+        message = "Fee set successfully." if created else "Fee updated successfully."
+        serializer = DoctorFeeManagementSerializer(fee_obj)
+        return Response({"message": message, "data": serializer.data}, status=200)
+
+
+class DoctorEarningsSummaryView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+
+        # Only doctors allowed
+        if user.role != "doctor":
+            return Response({"error": "Only doctors can access earnings."}, status=403)
+
+        doctor = get_loader(request).doctor_profile_id()
+        if not doctor:
+            return Response({"error": "Doctor profile not found."}, status=404)
+
+        today = timezone.localdate()
+        month_start = today.replace(day=1)
+
+        # Filter earnings related to this doctor
+        revenues = ClinicRevenue.objects.filter(doctor=doctor)
+
+        # Today's earnings
+        today_amount = revenues.filter(date=today).aggregate(
+            total=Sum("doctor_amount")
+        )["total"] or 0
+
+        # This month's earnings
+        month_amount = revenues.filter(date__gte=month_start).aggregate(
+            total=Sum("doctor_amount")
+        )["total"] or 0
+
+        # Lifetime / total
+        total_amount = revenues.aggregate(
+            total=Sum("doctor_amount")
+        )["total"] or 0
+
+        return Response(
+            {
+                "today": today_amount,
+                "month": month_amount,
+                "total": total_amount,
+            },
+            status=200,
+        )
+
+
+# =========================================================
+# 🔹 CLINIC OWNER → APPROVE / REJECT DOCTOR REQUEST
+# =========================================================
+class ClinicDoctorApprovalView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        try:
+            req = ClinicDoctorRequest.objects.get(pk=pk)
+        except ClinicDoctorRequest.DoesNotExist:
+            return Response({"error": "Request not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        action = request.data.get("action")
+
+        if action == "approve":
+            req.status = "approved"
+            req.save()
+
+            # ✅ Automatically verify doctor when approved
+            doctor_profile = req.doctor
+            doctor_profile.is_verified = True
+            doctor_profile.save()
+
+            # Optional: create notification for doctor
+            Notification.objects.create(
+                user=doctor_profile.user,
+                message=f"Your request to join {req.clinic.name} has been approved."
+            )
+
+            return Response({"message": "Doctor approved and verified successfully"}, status=status.HTTP_200_OK)
+
+        elif action == "reject":
+            req.status = "rejected"
+            req.save()
+
+            Notification.objects.create(
+                user=req.doctor.user,
+                message=f"Your request to join {req.clinic.name} was rejected."
+            )
+
+            return Response({"message": "Doctor request rejected"}, status=status.HTTP_200_OK)
+
+        return Response({"error": "Invalid action"}, status=status.HTTP_400_BAD_REQUEST)
+
+
+# =========================================================
+# 🔹 CLINIC OWNER → VIEW ALL DOCTOR JOIN REQUESTS
+# =========================================================
+# =========================================================
+# 🔹 CLINIC OWNER → VIEW ALL DOCTOR JOIN REQUESTS (FIXED)
+# =========================================================
+class ClinicOwnerRequestListView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        if user.role != "clinic_owner":
+            return Response({"error": "Only clinic owners can view this"}, status=403)
+
+        # ✅ Get all clinics owned by this clinic owner
+        clinic_ids = get_loader(request).owned_clinic_ids()
+
+        # ✅ Include doctor, user, and clinic info efficiently
+        requests = ClinicDoctorRequest.objects.filter(clinic_id__in=clinic_ids).select_related(
+            "doctor__user", "doctor__specialization", "clinic"
+        )
+
+        data = [
+            {
+                "id": r.id,
+                "doctor_name": r.doctor.user.full_name,
+                "doctor_specialization": (
+                    r.doctor.specialization.name if r.doctor.specialization else "N/A"
+                ),
+                "clinic_name": r.clinic.name,
+                "clinic_id": r.clinic.id,
+                "status": r.status,
+                "requested_at": r.created_at.strftime("%Y-%m-%d %H:%M"),
+            }
+            for r in requests
+        ]
+
+        return Response(data, status=200)
+
+
+class ClinicAppointmentsView(APIView):
+    """
+    GET /api/clinic/appointments/
+    Returns appointments for clinics owned by the requesting clinic owner.
+    Staff/superuser see all appointments.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        user = request.user
+
+        # If user is staff/superuser, show all appointments (optional)
+        if user.is_staff or user.is_superuser:
+            appointments_qs = Appointment.objects.select_related(
+                "patient__patientprofile", "doctor__user", "clinic", "timeslot__clinic", "timeslot"
+            ).all().order_by("timeslot__start")
+        else:
+            # Owner should have clinics: Clinic.owner == request.user
+            clinics = get_loader(request).owned_clinic_ids()
+            if not clinics:
+                return Response([], status=status.HTTP_200_OK)
+
+            appointments_qs = Appointment.objects.select_related(
+                "patient__patientprofile", "doctor__user", "clinic", "timeslot__clinic", "timeslot"
+            ).filter(clinic_id__in=list(clinics)).order_by("timeslot__start")
+
+        # Serialize with AppointmentSerializer (handles missing timeslot)
+        serializer = AppointmentSerializer(appointments_qs, many=True, context={"request": request})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AddOfflineAppointmentView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        user = request.user
+
+        # Only clinic owners allowed
+        if user.role != "clinic_owner":
+            return Response({"error": "Only clinic owners can add offline appointments"}, status=403)
+
+        data = request.data
+        clinic_id = data.get("clinic")
+        doctor_id = data.get("doctor")
+        patient_name = data.get("patient_name")
+        contact = data.get("contact")
+        date = data.get("date")
+        time = data.get("time")
+        notes = data.get("notes", "")
+
+        if not all([clinic_id, doctor_id, patient_name, date, time]):
+            return Response({"error": "Missing required fields"}, status=400)
+
+        # Validate clinic
+        try:
+            clinic = Clinic.objects.get(id=clinic_id, owner=user)
+        except Clinic.DoesNotExist:
+            return Response({"error": "Invalid clinic"}, status=404)
+
+        # Validate doctor
+        try:
+            doctor = DoctorProfile.objects.get(id=doctor_id)
+        except DoctorProfile.DoesNotExist:
+            return Response({"error": "Invalid doctor"}, status=404)
+
+        # Create OR reuse guest patient
+        guest_email = f"offline_{contact}@guest.com"
+        patient, _ = User.objects.get_or_create(
+            email=guest_email,
+            defaults={"full_name": patient_name, "role": "patient"},
+        )
+
+        # Convert date + time
+        dt = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+        dt = timezone.make_aware(dt)
+
+        # Create temporary slot
+        slot = TimeSlot.objects.create(
+            doctor=doctor,
+            clinic=clinic,
+            start=dt,
+            end=dt + timedelta(minutes=20),   # default offline slot duration
+            is_booked=True
+        )
+
+        # Generate unique token
+        token_no = f"OFF-{uuid.uuid4().hex[:8].upper()}"
+
+        # Create appointment
+        appointment = Appointment.objects.create(
+            patient=patient,
+            doctor=doctor,
+            clinic=clinic,
+            timeslot=slot,
+            status="confirmed",
+            paid=False,
+            amount=0,
+            token_no=token_no,
+            notes=notes
+        )
+
+        return Response({
+            "message": "Offline appointment added",
+            "appointment_id": appointment.id,
+            "token_no": token_no
+        }, status=201)
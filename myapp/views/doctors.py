@@ -0,0 +1,195 @@
+# ===============================================
+# ✅ WELLORA — Views: Doctor directory, profile, suggestions & specializations
+# ===============================================
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import cache as public_cache
+from .. import etags
+from .. import matcher as symptom_matcher
+from ..cache import CachedResponseMixin
+from ..etags import conditional_get
+from ..loaders import get_loader
+from ..models import DoctorProfile, HomeImage, Specialization
+from ..serializers import (
+    DoctorDetailSerializer,
+    DoctorListSerializer,
+    DoctorProfileSerializer,
+    DoctorSerializer,
+    HomeImageSerializer,
+    SpecializationSerializer,
+)
+
+
+# -------------------------
+# Admin: list & approve doctors
+# -------------------------
+class DoctorApprovalView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        pending_doctors = DoctorProfile.objects.filter(is_verified=False)
+        serializer = DoctorSerializer(pending_doctors, many=True)
+        return Response(serializer.data)
+
+    def post(self, request, doctor_id):
+        action = request.data.get("action")
+        doctor = DoctorProfile.objects.filter(id=doctor_id).first()
+        if not doctor:
+            return Response({"error": "Doctor not found"}, status=status.HTTP_404_NOT_FOUND)
+        if action == "approve":
+            doctor.is_verified = True
+            doctor.save()
+            return Response({"message": f"Doctor {doctor.user.email} approved"}, status=status.HTTP_200_OK)
+        elif action == "reject":
+            email = doctor.user.email
+            doctor.user.delete()
+            doctor.delete()
+            return Response({"message": f"Doctor {email} rejected and removed"}, status=status.HTTP_200_OK)
+        return Response({"error": "Invalid action"}, status=status.HTTP_400_BAD_REQUEST)
+
+
+# -------------------------
+# Doctors list & appointments
+# -------------------------
+class DoctorListView(CachedResponseMixin, generics.ListAPIView):
+    serializer_class = DoctorListSerializer
+    permission_classes = [AllowAny]
+    cache_namespaces = (public_cache.DOCTOR_LIST, public_cache.DOCTOR_SHARED)
+    cache_timeout = 60  # today_slots / next_available drift with the clock
+
+    def get_queryset(self):
+        qs = DoctorProfile.objects.filter(is_verified=True).select_related("user", "specialization")
+        spec = self.request.GET.get("specialization")
+        if spec:
+            qs = qs.filter(specialization_id=spec)
+        return qs
+
+    def get_serializer_context(self):
+        return {"request": self.request}
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get("many"):
+            # a few queries for the whole page instead of several per doctor
+            doctors = list(args[0])
+            DoctorListSerializer.prime(self.request, doctors)
+            args = (doctors,) + args[1:]
+        return super().get_serializer(*args, **kwargs)
+
+
+# Doctor Detail View (Public)
+class DoctorDetailView(CachedResponseMixin, generics.RetrieveAPIView):
+    queryset = DoctorProfile.objects.select_related("user", "specialization")
+    serializer_class = DoctorDetailSerializer  # ✅ Use the new one
+    permission_classes = [permissions.AllowAny]
+
+    def get_cache_namespaces(self):
+        return (public_cache.DOCTOR_SHARED, public_cache.doctor_ns(self.kwargs["pk"]))
+
+    @conditional_get(lambda view, request, pk: etags.doctor_etag(request, pk))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class HomeImageListView(CachedResponseMixin, generics.ListAPIView):
+    queryset = HomeImage.objects.all()
+    serializer_class = HomeImageSerializer
+    permission_classes = [permissions.AllowAny]
+    cache_namespaces = (public_cache.HOME_IMAGES,)
+
+
+class DoctorProfileView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def get(self, request):
+        doctor = get_loader(request).doctor_profile()
+        if not doctor:
+            return Response({"error": "Doctor profile not found"}, status=404)
+
+        serializer = DoctorProfileSerializer(doctor, context={"request": request})
+        return Response(serializer.data)
+
+    def put(self, request):
+        doctor = get_loader(request).doctor_profile()
+        if not doctor:
+            return Response({"error": "Doctor profile not found"}, status=404)
+
+        serializer = DoctorProfileSerializer(
+            doctor,
+            data=request.data,
+            partial=True,
+            context={"request": request},
+        )
+
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+
+        return Response(serializer.errors, status=400)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def suggest_doctors(request):
+    symptom = request.GET.get("symptom", "").lower().strip()
+    if not symptom:
+        return Response({"message": "No symptom provided."}, status=400)
+
+    matched_specialization = symptom_matcher.match(symptom).specialization
+
+    if not matched_specialization:
+        return Response({"message": "No matching specialization found."}, status=200)
+
+    doctors = DoctorProfile.objects.filter(specialization__name__icontains=matched_specialization, is_verified=True)
+
+    if not doctors.exists():
+        return Response({"message": "No doctors found."}, status=200)
+
+    serializer = DoctorSerializer(doctors, many=True)
+    return Response(serializer.data, status=200)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def suggest_doctor(request):
+    symptom_name = request.GET.get("symptom", "").strip().lower()
+    if not symptom_name:
+        return Response({"message": "Symptom is required."}, status=400)
+
+    specialization = symptom_matcher.match(symptom_name).specialization
+    if not specialization:
+        return Response({"message": "No specialization found for this symptom."}, status=404)
+
+    doctors = DoctorProfile.objects.filter(specialization__name__iexact=specialization, is_verified=True)
+    if not doctors.exists():
+        return Response({"message": "No doctors found for this symptom."}, status=404)
+
+    serializer = DoctorProfileSerializer(doctors, many=True)
+    return Response({
+        "specialization": specialization,
+        "doctors": serializer.data
+    })
+
+
+# =========================================================
+# 🔹 SPECIALIZATION LIST (PUBLIC)
+# =========================================================
+class SpecializationListView(CachedResponseMixin, generics.ListAPIView):
+    queryset = Specialization.objects.all()
+    serializer_class = SpecializationSerializer
+    permission_classes = [permissions.AllowAny]
+    cache_namespaces = (public_cache.SPECIALIZATIONS,)
+
+    @conditional_get(lambda view, request: etags.specializations_etag(request))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["request"] = self.request
+        return context
@@ -0,0 +1,300 @@
+# ===============================================
+# ✅ WELLORA — Views: Revenue, exports, analytics & settlements
+# ===============================================
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.db.models import Sum
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..analytics import clinic_report
+from ..exports import EXPORT_CHUNK_SIZE, parse_date_range, streaming_export
+from ..loaders import get_loader
+from ..models import Clinic, ClinicRevenue, Payment, SettlementRun, SettlementStatement
+from ..serializers import (
+    ClinicRevenueSerializer,
+    SettlementRunSerializer,
+    SettlementStatementSerializer,
+)
+from ..settlement import settle_period, SettlementError, statement_csv
+
+User = get_user_model()
+
+
+class ClinicRevenueListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        if user.is_staff or user.is_superuser:
+            qs = ClinicRevenue.objects.select_related("clinic", "doctor__user", "appointment").order_by("-created_at")
+        else:
+            clinic_ids = get_loader(request).owned_clinic_ids()
+            qs = ClinicRevenue.objects.filter(clinic_id__in=list(clinic_ids)).select_related("clinic", "doctor__user", "appointment").order_by("-created_at")
+
+        serializer = ClinicRevenueSerializer(qs.select_related("appointment__timeslot"), many=True, context={"request": request})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+# =========================================================
+# 🔹 STREAMING EXPORTS (CSV / NDJSON)
+# =========================================================
+def _local_date_time(dt):
+    if not dt:
+        return None, None
+    local = timezone.localtime(dt)
+    return local.date().isoformat(), local.strftime("%H:%M")
+
+
+class ClinicRevenueExportView(APIView):
+    """
+    GET /api/clinic/revenues/export/?output=csv|ndjson&from=YYYY-MM-DD&to=YYYY-MM-DD
+    Streams revenue rows straight from the DB cursor; nothing is buffered.
+    """
+    permission_classes = [IsAuthenticated]
+
+    HEADER = [
+        "id", "clinic_id", "clinic_name", "doctor_id", "doctor_name",
+        "appointment_id", "appointment_token", "appointment_date", "appointment_time",
+        "total_fee", "clinic_share", "doctor_earning", "created_at",
+    ]
+
+    def get(self, request):
+        user = request.user
+        try:
+            start, end = parse_date_range(request)
+        except ValueError:
+            return Response({"error": "Dates must be YYYY-MM-DD."}, status=400)
+
+        qs = ClinicRevenue.objects.all()
+        if not (user.is_staff or user.is_superuser):
+            qs = qs.filter(clinic__owner=user)
+        if start:
+            qs = qs.filter(created_at__date__gte=start)
+        if end:
+            qs = qs.filter(created_at__date__lte=end)
+
+        # joins resolved in one query, rows pulled from the cursor in chunks
+        rows = qs.order_by("-created_at").values_list(
+            "id", "clinic_id", "clinic__name", "doctor_id", "doctor__user__full_name",
+            "appointment_id", "appointment__token_no", "appointment__timeslot__start",
+            "total_fee", "clinic_share", "doctor_earning", "created_at",
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+        def flatten():
+            for r in rows:
+                appt_date, appt_time = _local_date_time(r[7])
+                yield r[:7] + (appt_date, appt_time) + r[8:]
+
+        return streaming_export(self.HEADER, flatten(), request.query_params.get("output"), "clinic_revenues")
+
+
+class PaymentExportView(APIView):
+    """
+    GET /api/payments/export/?output=csv|ndjson&from=YYYY-MM-DD&to=YYYY-MM-DD
+    - Staff → all payments
+    - Clinic owner → payments for their clinics
+    - Others → their own payments
+    """
+    permission_classes = [IsAuthenticated]
+
+    HEADER = [
+        "id", "order_id", "doctor_name", "clinic_name", "appointment_date",
+        "token_no", "amount", "status", "payment_method", "transaction_id", "created_at",
+    ]
+
+    def get(self, request):
+        user = request.user
+        try:
+            start, end = parse_date_range(request)
+        except ValueError:
+            return Response({"error": "Dates must be YYYY-MM-DD."}, status=400)
+
+        qs = Payment.objects.all()
+        if user.is_staff or user.is_superuser:
+            pass
+        elif user.role == User.ROLE_CLINIC_OWNER:
+            qs = qs.filter(appointment__clinic__owner=user)
+        else:
+            qs = qs.filter(appointment__patient=user)
+        if start:
+            qs = qs.filter(created_at__date__gte=start)
+        if end:
+            qs = qs.filter(created_at__date__lte=end)
+
+        rows = qs.order_by("-created_at").values_list(
+            "id", "order_id", "appointment__doctor__user__full_name", "appointment__clinic__name",
+            "appointment__timeslot__start", "appointment__token_no", "amount", "status",
+            "payment_method", "transaction_id", "created_at",
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+        def flatten():
+            for r in rows:
+                yield r[:4] + (_local_date_time(r[4])[0],) + r[5:]
+
+        return streaming_export(self.HEADER, flatten(), request.query_params.get("output"), "payments")
+
+
+class ClinicRevenueSummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        if user.is_staff or user.is_superuser:
+            clinic_ids = Clinic.objects.values_list("id", flat=True)
+        else:
+            clinic_ids = get_loader(request).owned_clinic_ids()
+
+        qs = ClinicRevenue.objects.filter(clinic_id__in=list(clinic_ids))
+
+        total = qs.aggregate(
+            total_fee=Sum("total_fee"),
+            clinic_share=Sum("clinic_share"),
+            doctor_earning=Sum("doctor_earning")
+        )
+
+        per_clinic = (
+            qs.values("clinic_id", "clinic__name")
+              .annotate(total_fee=Sum("total_fee"), clinic_share=Sum("clinic_share"), doctor_earning=Sum("doctor_earning"))
+              .order_by("-total_fee")
+        )
+
+        return Response({
+            "total": {
+                "total_fee": float(total["total_fee"] or 0),
+                "clinic_share": float(total["clinic_share"] or 0),
+                "doctor_earning": float(total["doctor_earning"] or 0),
+            },
+            "per_clinic": [
+                {
+                    "clinic_id": c["clinic_id"],
+                    "clinic_name": c["clinic__name"],
+                    "total_fee": float(c["total_fee"] or 0),
+                    "clinic_share": float(c["clinic_share"] or 0),
+                    "doctor_earning": float(c["doctor_earning"] or 0),
+                }
+                for c in per_clinic
+            ]
+        }, status=status.HTTP_200_OK)
+
+
+# =========================================================
+# 🔹 CLINIC ANALYTICS (UTILIZATION / NO-SHOWS)
+# =========================================================
+class ClinicAnalyticsView(APIView):
+    """
+    GET /api/clinic/<pk>/analytics/?from=YYYY-MM-DD&to=YYYY-MM-DD[&refresh=1]
+    Defaults to the last 30 days. Clinic owner (own clinic) or staff only.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        user = request.user
+        clinic = Clinic.objects.filter(pk=pk).first()
+        if not clinic:
+            return Response({"error": "Clinic not found."}, status=404)
+        if clinic.owner_id != user.id and not (user.is_staff or user.is_superuser):
+            return Response({"error": "Not allowed to view this clinic."}, status=403)
+
+        try:
+            start, end = parse_date_range(request)
+        except ValueError:
+            return Response({"error": "Dates must be YYYY-MM-DD."}, status=400)
+        end = end or timezone.localdate()
+        start = start or end - timedelta(days=30)
+        if end < start:
+            return Response({"error": "'from' must be before 'to'."}, status=400)
+
+        refresh = request.query_params.get("refresh") in ("1", "true")
+        return Response(clinic_report(clinic.id, start, end, refresh=refresh), status=200)
+
+
+# =========================================================
+# 🔹 SETTLEMENTS (BATCH PAYOUT STATEMENTS)
+# =========================================================
+def _parse_settlement_period(data):
+    """Accepts {"month": "YYYY-MM"} or {"period_start": ..., "period_end": ...}."""
+    month = data.get("month")
+    if month:
+        first = datetime.strptime(month, "%Y-%m").date()
+        next_first = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return first, next_first - timedelta(days=1)
+    start = datetime.strptime(data.get("period_start") or "", "%Y-%m-%d").date()
+    end = datetime.strptime(data.get("period_end") or "", "%Y-%m-%d").date()
+    return start, end
+
+
+def _statements_for(user):
+    qs = SettlementStatement.objects.select_related("run", "doctor__user", "clinic")
+    if user.is_staff or user.is_superuser:
+        return qs
+    if user.role == User.ROLE_DOCTOR:
+        return qs.filter(doctor__user=user)
+    if user.role == User.ROLE_CLINIC_OWNER:
+        return qs.filter(clinic__owner=user)
+    return qs.none()
+
+
+class SettlementRunView(APIView):
+    """
+    GET  /api/settlements/          → list settlement runs (admin)
+    POST /api/settlements/          → settle a period (admin)
+         {"month": "2025-11"} or {"period_start": "2025-11-01", "period_end": "2025-11-30"}
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        runs = SettlementRun.objects.all()
+        return Response(SettlementRunSerializer(runs, many=True).data, status=200)
+
+    def post(self, request):
+        try:
+            period_start, period_end = _parse_settlement_period(request.data)
+        except (TypeError, ValueError):
+            return Response({"error": "Provide month (YYYY-MM) or period_start/period_end (YYYY-MM-DD)."}, status=400)
+
+        try:
+            run = settle_period(period_start, period_end, created_by=request.user)
+        except SettlementError as e:
+            return Response({"error": str(e)}, status=400)
+        except IntegrityError:
+            return Response({"error": "This period has already been settled."}, status=400)
+
+        return Response(SettlementRunSerializer(run).data, status=201)
+
+
+class SettlementStatementListView(generics.ListAPIView):
+    """
+    GET /api/settlements/statements/?run=<id>
+    Admin sees all statements, doctors their own, clinic owners their clinics'.
+    """
+    serializer_class = SettlementStatementSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        qs = _statements_for(self.request.user).order_by("-run__period_start", "doctor_id")
+        run_id = self.request.query_params.get("run")
+        if run_id:
+            qs = qs.filter(run_id=run_id)
+        return qs
+
+
+class SettlementStatementCSVView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        statement = _statements_for(request.user).filter(pk=pk).first()
+        if not statement:
+            return Response({"error": "Statement not found."}, status=404)
+
+        response = HttpResponse(statement_csv(statement), content_type="text/csv")
+        response["Content-Disposition"] = (
+            f'attachment; filename="statement_{statement.id}_{statement.run.period_start:%Y%m%d}.csv"'
+        )
+        return response
@@ -0,0 +1,51 @@
+# ===============================================
+# ✅ WELLORA — Views: Admin stats (LLM cache, rate limits, DB pool, OTP delivery)
+# ===============================================
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import db_pool
+from .. import llm
+from .. import otp_delivery
+from .. import throttling
+
+
+class LLMCacheStatsView(APIView):
+    """
+    GET    /api/llm/cache-stats/  → analysis cache + LLM client counters (this worker)
+    DELETE /api/llm/cache-stats/  → drop the cached analyses
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({**llm.analysis_cache.stats(), "client": llm.client_stats()})
+
+    def delete(self, request):
+        llm.analysis_cache.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class RateLimitStatsView(APIView):
+    """GET /api/rate-limits/stats/ → allowed / throttled counts per scope (this worker)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(throttling.limiter.stats())
+
+
+class DBPoolStatsView(APIView):
+    """GET /api/db/pool-stats/ → connection pool size, utilization, checkout wait and timeouts per database (this worker)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(db_pool.pool_stats())
+
+
+class OTPDeliveryStatsView(APIView):
+    """GET /api/otp/delivery-stats/ → queue depth, sent / failed / failover counts and latency per channel."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(otp_delivery.dispatcher.stats())
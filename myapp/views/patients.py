@@ -0,0 +1,122 @@
+# ===============================================
+# ✅ WELLORA — Views: Patient profile, reminders & medical reports
+# ===============================================
+from rest_framework import generics, permissions, status
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..loaders import get_loader
+from ..models import MedicalReport, Reminder
+from ..serializers import (
+    MedicalReportSerializer,
+    MedicalReportUploadSerializer,
+    PatientProfileSerializer,
+    ReminderSerializer,
+)
+
+
+# -------------------------
+# Remaining views (profiles, reminders, reports, suggestions)
+# -------------------------
+class PatientProfileView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        profile = get_loader(request).patient_profile(create=True)
+        serializer = PatientProfileSerializer(profile)
+        return Response(serializer.data)
+
+    def put(self, request):
+        profile = get_loader(request).patient_profile(create=True)
+        serializer = PatientProfileSerializer(profile, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response({"message": "Profile updated", "data": serializer.data}, status=status.HTTP_200_OK)
+        return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ReminderListView(generics.ListAPIView):
+    serializer_class = ReminderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Reminder.objects.filter(user=self.request.user).order_by("-created_at")
+
+
+class AddReminderView(generics.CreateAPIView):
+    serializer_class = ReminderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        # ✅ Save reminder tied to logged-in user
+        serializer.save(user=self.request.user)
+
+
+# --------------------------------------------------
+# UPLOAD MEDICAL REPORT (FINAL WORKING VERSION)
+# --------------------------------------------------
+class UploadMedicalReportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        # Get patient profile of logged-in user
+        patient = get_loader(request).patient_profile()
+        if patient is None:
+            return Response({"error": "Patient profile not found."}, status=404)
+
+        # WRITE serializer for upload
+        upload_serializer = MedicalReportUploadSerializer(data=request.data)
+
+        if not upload_serializer.is_valid():
+            print("❌ Upload Errors:", upload_serializer.errors)
+            return Response(upload_serializer.errors, status=400)
+
+        # Save report
+        report = upload_serializer.save(patient=patient)
+
+        # READ serializer to return file URL
+        read_serializer = MedicalReportSerializer(report, context={"request": request})
+        return Response(read_serializer.data, status=201)
+
+
+# --------------------------------------------------
+# LIST MEDICAL REPORTS (FINAL)
+# --------------------------------------------------
+class MedicalReportListView(generics.ListAPIView):
+    serializer_class = MedicalReportSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        patient_id = get_loader(self.request).patient_profile_id()
+        if patient_id is None:
+            return MedicalReport.objects.none()
+        return MedicalReport.objects.filter(patient_id=patient_id).order_by("-uploaded_at")
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context.update({"request": self.request})
+        return context
+
+
+class DeleteMedicalReportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def delete(self, request, pk):
+        patient_id = get_loader(request).patient_profile_id()
+        if patient_id is None:
+            return Response({"error": "Patient profile not found."}, status=404)
+
+        try:
+            report = MedicalReport.objects.get(id=pk, patient_id=patient_id)
+        except MedicalReport.DoesNotExist:
+            return Response({"error": "Report not found."}, status=404)
+
+        # Delete the file from storage too
+        if report.file:
+            report.file.delete(save=False)
+
+        report.delete()
+        return Response({"message": "Report deleted successfully."}, status=200)
@@ -0,0 +1,157 @@
+# ===============================================
+# ✅ WELLORA — Views: Razorpay orders & payment verification
+# ===============================================
+import threading
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..models import Appointment, ClinicRevenue, DoctorFeeManagement, Payment
+
+
+# 💳 Razorpay — imported and built on the first payment call, not at worker boot
+_razorpay_client = None
+_razorpay_lock = threading.Lock()
+
+
+def razorpay_client():
+    global _razorpay_client
+    if _razorpay_client is None:
+        with _razorpay_lock:
+            if _razorpay_client is None:
+                import razorpay
+
+                _razorpay_client = razorpay.Client(
+                    auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
+                )
+    return _razorpay_client
+
+
+# -------------------------
+# Payments (Razorpay) - consolidated & fixed (token_no flow)
+# -------------------------
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def create_payment_order(request):
+    """
+    Create a Razorpay order for the appointment identified by token_no.
+    Expects JSON body: { "token_no": "<token_no>" }
+    """
+    import razorpay  # lazy, see razorpay_client()
+
+    try:
+        token_no = request.data.get("token_no")
+        if not token_no:
+            return Response({"error": "Token number is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        appointment = Appointment.objects.get(token_no=token_no, patient=request.user)
+        fee_decimal = Decimal(appointment.doctor.fee or 0)
+        amount_paise = int((fee_decimal * Decimal("100")).quantize(Decimal("1")))
+
+        order = razorpay_client().order.create({
+            "amount": amount_paise,
+            "currency": "INR",
+            "payment_capture": 1,
+        })
+
+        Payment.objects.create(
+            appointment=appointment,
+            order_id=order.get("id"),
+            amount=fee_decimal,
+            status="pending",
+            payment_method="razorpay",
+        )
+
+        return Response({
+            "success": True,
+            "order_id": order.get("id"),
+            "amount": amount_paise,
+            "currency": "INR",
+            "razorpay_key": settings.RAZORPAY_KEY_ID,
+            "token_no": token_no,
+        }, status=status.HTTP_201_CREATED)
+
+    except Appointment.DoesNotExist:
+        return Response({"error": "Appointment not found for this token number"}, status=status.HTTP_404_NOT_FOUND)
+    except razorpay.errors.BadRequestError as e:
+        return Response({"error": f"Razorpay error: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print("Error creating Razorpay order:", e)
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def verify_payment(request):
+    """
+    Verify Razorpay payment signature and update local payment & appointment.
+    Also record clinic and doctor revenue split after successful payment.
+    """
+    import razorpay  # lazy, see razorpay_client()
+
+    try:
+        razorpay_order_id = request.data.get("razorpay_order_id")
+        razorpay_payment_id = request.data.get("razorpay_payment_id")
+        razorpay_signature = request.data.get("razorpay_signature")
+
+        if not all([razorpay_order_id, razorpay_payment_id, razorpay_signature]):
+            return Response({"error": "Incomplete payment data"}, status=status.HTTP_400_BAD_REQUEST)
+
+        params_dict = {
+            "razorpay_order_id": razorpay_order_id,
+            "razorpay_payment_id": razorpay_payment_id,
+            "razorpay_signature": razorpay_signature,
+        }
+        razorpay_client().utility.verify_payment_signature(params_dict)
+
+        payment = Payment.objects.filter(order_id=razorpay_order_id).first()
+        if not payment:
+            return Response({"error": "Payment not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        payment.transaction_id = razorpay_payment_id
+        payment.status = "completed"
+        payment.save()
+
+        appointment = payment.appointment
+        appointment.paid = True
+        appointment.status = "confirmed"
+        appointment.save()
+
+        try:
+            fee_info = DoctorFeeManagement.objects.get(
+                doctor=appointment.doctor,
+                clinic=appointment.clinic
+            )
+            total_fee = Decimal(payment.amount)  # actual fee paid
+            clinic_share, doctor_earning = fee_info.split_amount(total_fee)
+
+            # the Payment post_save signal may already have recorded it
+            if not ClinicRevenue.objects.filter(appointment=appointment).exists():
+                ClinicRevenue.objects.create(
+                    clinic=appointment.clinic,
+                    doctor=appointment.doctor,
+                    appointment=appointment,
+                    total_fee=total_fee,
+                    clinic_share=clinic_share,
+                    doctor_earning=doctor_earning,
+                )
+
+            print(f"✅ Revenue recorded: Clinic ₹{clinic_share}, Doctor ₹{doctor_earning}")
+
+        except DoctorFeeManagement.DoesNotExist:
+            print("⚠️ Doctor fee not configured for this clinic. Revenue not recorded.")
+
+        return Response(
+            {"success": True, "message": "Payment verified and revenue recorded successfully."},
+            status=status.HTTP_200_OK,
+        )
+
+    except razorpay.errors.SignatureVerificationError:
+        return Response({"error": "Payment signature verification failed"}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        print("Payment verification error:", e)
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,267 @@
+# ===============================================
+# ✅ WELLORA — Views: Doctor dashboard: appointments, schedule, follow-ups
+# ===============================================
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import etags
+from .. import slots as slot_engine
+from ..authentication import ClaimsJWTAuthentication
+from ..etags import conditional_get
+from ..loaders import get_loader
+from ..models import Appointment, Clinic, MedicalReport, Notification, PatientProfile, TimeSlot
+from ..serializers import DoctorScheduleSerializer, MedicalReportSerializer
+
+User = get_user_model()
+
+
+class DoctorAppointmentsListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        doctor_id = get_loader(request).doctor_profile_id()
+        if doctor_id is None:
+            return Response({"error": "Doctor profile not found"}, status=400)
+
+        appointments = (
+            Appointment.objects
+            .filter(doctor_id=doctor_id)
+            .select_related("patient", "clinic", "timeslot")
+            .order_by("timeslot__start")
+        )
+
+        data = []
+        for a in appointments:
+            if a.timeslot and a.timeslot.start:
+                local_start = timezone.localtime(a.timeslot.start)
+                date_str = local_start.date().isoformat()
+                time_str = local_start.strftime("%H:%M")
+            else:
+                date_str = None
+                time_str = None
+
+            data.append({
+                "id": a.id,
+                "patient_name": a.patient.full_name,
+                "clinic_name": a.clinic.name if a.clinic else "—",
+                "date": date_str,
+                "time": time_str,
+                "amount": a.amount,
+                "paid": a.paid,
+                "status": a.status,
+            })
+
+        return Response(data, status=200)
+
+
+class DoctorScheduleSummaryView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        doctor = get_loader(request).doctor_profile_id()
+        if not doctor:
+            return Response({"error": "Doctor profile not found"}, status=400)
+
+        today = timezone.now().date()
+
+        # ------------------------------
+        # ✅ TODAY'S APPOINTMENTS
+        # ------------------------------
+        today_appointments = Appointment.objects.filter(
+            doctor_id=doctor,
+            timeslot__start__date=today,
+            status__in=["pending", "confirmed"]
+        ).order_by("timeslot__start")
+
+        today_count = today_appointments.count()
+
+        # ------------------------------
+        # ✅ UPCOMING APPOINTMENTS (Future & Today)
+        # ------------------------------
+        upcoming = Appointment.objects.filter(
+            doctor_id=doctor,
+            timeslot__start__date__gte=today,
+            status__in=["pending", "confirmed"]
+        ).order_by("timeslot__start")
+
+        upcoming_count = upcoming.count()
+
+        # ------------------------------
+        # ✅ NEXT APPOINTMENT
+        # ------------------------------
+        next_appt = upcoming.first()
+
+        next_data = None
+        if next_appt:
+            next_data = {
+                "date": next_appt.timeslot.start.date(),
+                "time": next_appt.timeslot.start.time(),
+                "patient": next_appt.patient.full_name,
+                "clinic": next_appt.clinic.name,
+            }
+
+        return Response({
+            "today_count": today_count,
+            "upcoming_count": upcoming_count,
+            "next": next_data,
+        }, status=200)
+
+
+class DoctorScheduleListView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def _schedule_etag(self, request):
+        self.doctor_id = get_loader(request).doctor_profile_id()
+        if self.doctor_id is None:
+            return None
+        return etags.schedule_etag(request, self.doctor_id)
+
+    @conditional_get(_schedule_etag, cache_control="private, no-cache")
+    def get(self, request):
+        if self.doctor_id is None:
+            return Response({"error": "Doctor profile not found"}, status=400)
+
+        appointments = Appointment.objects.filter(
+            doctor_id=self.doctor_id,
+            status__in=["pending", "confirmed"]
+        ).select_related("patient__patientprofile", "clinic", "timeslot") \
+         .order_by("timeslot__start")
+
+        serializer = DoctorScheduleSerializer(appointments, many=True)
+        return Response(serializer.data, status=200)
+
+
+class PatientDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, patient_id):
+        requester = request.user
+        role = getattr(requester, "role", None)
+
+        if role != User.ROLE_DOCTOR and not requester.is_staff:
+            return Response({"detail": "Permission denied"}, status=403)
+
+        target_user = get_object_or_404(User, id=patient_id)
+
+        profile = PatientProfile.objects.filter(user=target_user).first()
+
+        profile_data = {
+            "id": target_user.id,
+            "full_name": target_user.full_name,
+            "age": getattr(profile, "age", None),
+            "gender": getattr(profile, "gender", None),
+            "phone": getattr(profile, "phone", None),
+            "address": getattr(profile, "address", None),
+            "medical_history": getattr(profile, "medical_history", None),
+        }
+
+        reports = MedicalReport.objects.filter(patient=profile).order_by("-uploaded_at")
+        report_data = MedicalReportSerializer(reports, many=True, context={"request": request}).data
+
+        return Response({
+            "profile": profile_data,
+            "reports": report_data,
+        }, status=200)
+
+
+class DoctorBookFollowupView(APIView):
+    """
+    POST /api/doctor/book-followup/
+    Body:
+      {
+        "patient_id": <int>,
+        "clinic_id": <int>,
+        "timeslot_id": <int>
+      }
+    Creates a confirmed, free follow-up appointment (paid=True, amount=0).
+    Only accessible to authenticated doctors.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        requester = request.user
+        role = getattr(requester, "role", None)
+
+        # Allow only doctors or staff/admin
+        if role != getattr(User, "ROLE_DOCTOR", "doctor") and not (requester.is_staff or requester.is_superuser):
+            return Response({"detail": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        patient_id = request.data.get("patient_id")
+        clinic_id = request.data.get("clinic_id")
+        timeslot_id = request.data.get("timeslot_id")
+
+        if not (patient_id and clinic_id and timeslot_id):
+            return Response({"detail": "patient_id, clinic_id and timeslot_id are required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        doctor_profile = get_loader(request).doctor_profile()
+        if not doctor_profile:
+            return Response({"detail": "Doctor profile not found for requester."}, status=status.HTTP_400_BAD_REQUEST)
+
+        patient_user = get_object_or_404(User, id=patient_id)
+        clinic = get_object_or_404(Clinic, id=clinic_id)
+        claimed = bool(slot_engine.parse_virtual_slot_id(timeslot_id))
+        if claimed:
+            # virtual slot: claim() checks owner/clinic/overlap and books the new row
+            timeslot = slot_engine.claim(timeslot_id, doctor_profile.id, clinic.id)
+            if timeslot is None:
+                return Response({"detail": "Timeslot is not available."}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            timeslot = get_object_or_404(TimeSlot, id=timeslot_id)
+
+        # Strict checks
+        if timeslot.doctor_id != doctor_profile.id:
+            return Response({"detail": "Timeslot does not belong to this doctor."}, status=status.HTTP_400_BAD_REQUEST)
+        if timeslot.clinic_id != clinic.id:
+            return Response({"detail": "Timeslot does not belong to the selected clinic."}, status=status.HTTP_400_BAD_REQUEST)
+        if timeslot.is_booked and not claimed:
+            return Response({"detail": "Timeslot already booked."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            token_no = f"FUP-{uuid.uuid4().hex[:8].upper()}"
+            appointment = Appointment.objects.create(
+                patient=patient_user,
+                doctor=doctor_profile,
+                clinic=clinic,
+                timeslot=timeslot,
+                status="confirmed",
+                notes=f"Follow-up booked by Dr. {doctor_profile.user.full_name}",
+                amount=0.00,
+                paid=True,
+                token_no=token_no,
+            )
+            timeslot.is_booked = True
+            timeslot.save(update_fields=["is_booked"])
+
+            # Create a notification for patient (best-effort)
+            try:
+                Notification.objects.create(
+                    user=patient_user,
+                    title="Follow-up appointment booked",
+                    message=f"Dr. {doctor_profile.user.full_name} booked your follow-up on {timeslot.start.strftime('%d %b %Y %H:%M')}. Token: {token_no}"
+                )
+            except Exception:
+                pass
+
+        return Response({
+            "detail": "Follow-up appointment booked (free).",
+            "appointment_id": appointment.id,
+            "token_no": token_no,
+            "appointment": {
+                "id": appointment.id,
+                "patient": appointment.patient.full_name or appointment.patient.email,
+                "clinic": clinic.name,
+                "date": timeslot.start.date().isoformat() if timeslot.start else None,
+                "time": timeslot.start.time().isoformat() if timeslot.start else None,
+                "token_no": token_no,
+            }
+        }, status=status.HTTP_201_CREATED)
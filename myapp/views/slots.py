@@ -0,0 +1,434 @@
+# ===============================================
+# ✅ WELLORA — Views: Public slots, doctor availability & slot generation
+# ===============================================
+import uuid
+from datetime import datetime, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import bitmaps
+from .. import cache as public_cache
+from .. import slots as slot_engine
+from ..authentication import ClaimsJWTAuthentication
+from ..cache import micro_cached
+from ..loaders import get_loader
+from ..models import Appointment, Clinic, DoctorAvailability, DoctorProfile, Notification, TimeSlot
+from ..serializers import DoctorAvailabilitySerializer
+from ..throttling import throttles_for
+
+
+# =========================================================
+# 🔹 FETCH DOCTOR'S AVAILABLE SLOTS (PUBLIC ENDPOINT)
+# =========================================================
+class DoctorAvailableSlotsView(APIView):
+    """
+    Hot public endpoint: served from a short-TTL micro-cache keyed by
+    (doctor, date); any slot write for the doctor retires the entry.
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = throttles_for("slots", "ip")
+
+    def get(self, request, doctor_id):
+        date_str = request.query_params.get("date")
+        if not date_str:
+            return Response({"error": "Date is required"}, status=400)
+
+        try:
+            target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return Response({"error": "Date must be YYYY-MM-DD"}, status=400)
+
+        try:
+            formatted = micro_cached(
+                public_cache.slots_ns(doctor_id),
+                f"slots:{target_date.isoformat()}",
+                lambda: slot_engine.day_slots(doctor_id, target_date),
+            )
+            return Response({"slots": formatted}, status=200)
+
+        except Exception as e:
+            print("❌ Error fetching slots:", e)
+            return Response({"error": str(e)}, status=500)
+
+
+class DoctorAvailableDatesView(APIView):
+    permission_classes = [AllowAny]
+    throttle_classes = throttles_for("slots", "ip")
+
+    def get(self, request, doctor_id):
+        # today is part of the key so the list rolls over at midnight
+        dates = micro_cached(
+            public_cache.slots_ns(doctor_id),
+            f"dates:{timezone.localdate().isoformat()}",
+            lambda: slot_engine.available_dates(doctor_id),
+        )
+        return Response({"dates": dates})
+
+
+# -------------------------------
+# Doctor Availability System
+# WEEKDAY MAP
+# -------------------------------
+WEEKDAY_MAP = {
+    "Monday": 0, "Tuesday": 1, "Wednesday": 2,
+    "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6
+}
+
+
+class AvailabilityConflict(Exception):
+    """Raised from perform_create; DoctorAvailabilityView.create turns it into a 409."""
+
+    def __init__(self, payload):
+        super().__init__(payload["error"])
+        self.payload = payload
+
+
+def _lock_doctor(dp):
+    # serializes availability writes per doctor, so two overlapping windows can't both pass the check
+    DoctorProfile.objects.select_for_update().filter(pk=dp.pk).first()
+
+
+# =========================================================
+# SINGLE DAY AVAILABILITY (with leave + future validation)
+# =========================================================
+class DoctorAvailabilityView(generics.ListCreateAPIView):
+    serializer_class = DoctorAvailabilitySerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == "doctor":
+            dp = get_loader(self.request).doctor_profile_id()
+            if not dp:
+                return DoctorAvailability.objects.none()
+            return DoctorAvailability.objects.filter(
+                doctor=dp
+            ).select_related("doctor__user", "clinic").order_by("-date", "start_time")
+
+        elif user.role == "admin":
+            return DoctorAvailability.objects.select_related("doctor__user", "clinic").order_by("-date", "start_time")
+
+        return DoctorAvailability.objects.none()
+
+    def create(self, request, *args, **kwargs):
+        try:
+            response = super().create(request, *args, **kwargs)
+        except AvailabilityConflict as conflict:
+            return Response(conflict.payload, status=status.HTTP_409_CONFLICT)
+        if getattr(self, "slot_changes", None) is not None:
+            response.data["slots"] = self.slot_changes
+        return response
+
+    def perform_create(self, serializer):
+        user = self.request.user
+        if user.role != "doctor":
+            raise PermissionDenied("Only doctors can add availability.")
+
+        dp = get_loader(self.request).doctor_profile()
+        if not dp:
+            raise PermissionDenied("Doctor profile not found.")
+
+        clinic_id = self.request.data.get("clinic_id") or self.request.data.get("clinic")
+        clinic = Clinic.objects.filter(id=clinic_id).first()
+        if not clinic:
+            raise ValidationError({"error": "Invalid clinic ID."})
+
+        approved = get_loader(self.request).is_approved(dp.id, clinic.id)
+
+        if not approved:
+            raise ValidationError({"error": "You are not approved for this clinic."})
+
+        # Inputs
+        date_str = self.request.data.get("date")
+        start_str = self.request.data.get("start_time")
+        end_str = self.request.data.get("end_time")
+        slot_duration = int(self.request.data.get("slot_duration") or 30)
+        leave_flag = str(self.request.data.get("leave", "false")).lower() in ["true", "1", "yes"]
+
+        try:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+            start_obj = datetime.strptime(start_str, "%H:%M").time()
+            end_obj = datetime.strptime(end_str, "%H:%M").time()
+        except:
+            raise ValidationError({"error": "Invalid date/time format."})
+
+        if end_obj <= start_obj:
+            raise ValidationError({"error": "End time must be after start time."})
+
+        # ---------------------------------------------------
+        # 🚫 BLOCK PAST AVAILABILITY
+        # ---------------------------------------------------
+        now = timezone.localtime()
+        today = now.date()
+        start_dt = timezone.make_aware(datetime.combine(date_obj, start_obj))
+
+        if date_obj < today:
+            raise ValidationError({"error": "You cannot add availability for past dates."})
+
+        if date_obj == today and start_dt <= now:
+            raise ValidationError({"error": "Start time must be in the future."})
+
+        # ---------------------------------------------------
+        # LEAVE MODE — cancel booked appointments + block slots
+        # ---------------------------------------------------
+        if leave_flag:
+            affected_slots = TimeSlot.objects.filter(
+                doctor=dp,
+                clinic=clinic,
+                start__date=date_obj
+            )
+
+            affected_appointments = Appointment.objects.filter(
+                timeslot__in=affected_slots,
+                status__in=["pending", "confirmed"]
+            )
+
+            for appt in affected_appointments:
+                appt.status = "cancelled"
+                appt.notes = (appt.notes or "") + " [Cancelled due to doctor leave]"
+                appt.save()
+
+                Notification.objects.create(
+                    user=appt.patient,
+                    title="Appointment cancelled",
+                    message=f"Your appointment on {appt.timeslot.start.strftime('%d %b %Y %H:%M')} was cancelled due to doctor's leave."
+                )
+
+            affected_slots.update(is_booked=True)
+            bitmaps.touch(dp.id, clinic.id, date_obj)
+            if slot_engine.is_virtual():
+                # free slots come from the windows themselves — drop that day's
+                DoctorAvailability.objects.filter(doctor=dp, clinic=clinic, date=date_obj).delete()
+            public_cache.bump(public_cache.slots_ns(dp.id), public_cache.DOCTOR_LIST)  # .update() sends no signals
+            return  # Do not create availability
+
+        with transaction.atomic():
+            # ---------------------------------------------------
+            # 🚫 NO OVERLAP WITH WINDOWS AT OTHER CLINICS
+            # (this clinic's windows for the day are being replaced)
+            # ---------------------------------------------------
+            _lock_doctor(dp)
+            start_dt, end_dt = slot_engine.window_bounds(date_obj, start_obj, end_obj)
+            index = slot_engine.WindowIndex.for_doctor(dp.id, date_obj, date_obj, exclude=Q(clinic=clinic))
+            conflicts = index.overlapping(start_dt, end_dt)
+            if conflicts:
+                raise AvailabilityConflict({
+                    "error": "This window overlaps your availability at another clinic.",
+                    "conflicts": [slot_engine.window_conflict(w) for w in conflicts],
+                })
+
+            # ---------------------------------------------------
+            # ✏️ EDIT = DIFF: only changed free slots are written,
+            # booked slots are kept and must fit the new window
+            # ---------------------------------------------------
+            changes, stray_booked = slot_engine.sync_window_slots(
+                dp.id, clinic.id, date_obj, start_obj, end_obj, slot_duration,
+            )
+            if stray_booked:
+                raise AvailabilityConflict({
+                    "error": "Booked slots fall outside the new window. Cancel or move them first.",
+                    "booked_slots": stray_booked,
+                })
+
+            # the new window replaces this clinic's windows for the day
+            DoctorAvailability.objects.filter(doctor=dp, clinic=clinic, date=date_obj).delete()
+            serializer.save(doctor=dp, clinic=clinic, slot_duration=slot_duration, status="approved")
+            self.slot_changes = changes
+
+
+# =========================================================
+# RECURRING (WEEKLY) AVAILABILITY
+# =========================================================
+class DoctorAvailabilityBulkCreateView(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        user = request.user
+        if user.role != "doctor":
+            raise PermissionDenied("Only doctors can add recurring availability.")
+
+        dp = get_loader(request).doctor_profile()
+        if not dp:
+            raise PermissionDenied("Doctor profile not found.")
+
+        clinic_id = request.data.get("clinic_id") or request.data.get("clinic")
+        clinic = Clinic.objects.filter(id=clinic_id).first()
+        if not clinic:
+            return Response({"error": "Invalid clinic ID."}, status=400)
+
+        approved = get_loader(request).is_approved(dp.id, clinic.id)
+        if not approved:
+            return Response({"error": "You are not approved for this clinic."}, status=403)
+
+        # Inputs
+        start_date = request.data.get("start_date")
+        end_date = request.data.get("end_date")
+        weekdays = request.data.get("weekdays", [])
+        start_time = request.data.get("start_time")
+        end_time = request.data.get("end_time")
+        slot_duration = int(request.data.get("slot_duration") or 30)
+
+        try:
+            sd = datetime.strptime(start_date, "%Y-%m-%d").date()
+            ed = datetime.strptime(end_date, "%Y-%m-%d").date()
+            st = datetime.strptime(start_time, "%H:%M").time()
+            et = datetime.strptime(end_time, "%H:%M").time()
+        except:
+            return Response({"error": "Invalid date/time format."}, status=400)
+
+        if et <= st:
+            return Response({"error": "End time must be after start time."}, status=400)
+
+        # ---------------------------------------------------
+        # 🚫 BLOCK PAST DATE START + PAST TODAY TIME
+        # ---------------------------------------------------
+        now = timezone.localtime()
+        today = now.date()
+
+        if sd < today:
+            return Response({"error": "Start date cannot be in the past."}, status=400)
+
+        if sd == today:
+            start_dt = timezone.make_aware(datetime.combine(sd, st))
+            if start_dt <= now:
+                return Response({"error": "Start time must be in the future."}, status=400)
+
+        weekday_ids = {WEEKDAY_MAP[w] for w in weekdays if w in WEEKDAY_MAP}
+
+        recurrence_id = uuid.uuid4()
+        created = slots = 0
+
+        with transaction.atomic():
+            # ---------------------------------------------------
+            # 🚫 OVERLAPS — every date checked against one index,
+            # all conflicts reported together, nothing created
+            # ---------------------------------------------------
+            _lock_doctor(dp)
+            index = slot_engine.WindowIndex.for_doctor(dp.id, sd, ed)
+            dates, conflicts = [], []
+            cur = sd
+            while cur <= ed:
+                if cur.weekday() in weekday_ids:
+                    start_dt, end_dt = slot_engine.window_bounds(cur, st, et)
+                    hits = index.overlapping(start_dt, end_dt)
+                    same = [w for w in hits if w.clinic_id == clinic.id and (w.start, w.end) == (start_dt, end_dt)]
+                    others = [w for w in hits if w not in same]
+                    if others:
+                        conflicts.extend(slot_engine.window_conflict(w) for w in others)
+                    elif not same:  # an identical window is already there: skip the date
+                        dates.append(cur)
+                cur += timedelta(days=1)
+
+            if conflicts:
+                return Response({
+                    "error": "These dates overlap availability you already have.",
+                    "conflicts": conflicts,
+                }, status=status.HTTP_409_CONFLICT)
+
+            for cur in dates:
+                DoctorAvailability.objects.create(
+                    doctor=dp,
+                    clinic=clinic,
+                    date=cur,
+                    start_time=st,
+                    end_time=et,
+                    slot_duration=slot_duration,
+                    recurrence_group=recurrence_id,
+                    status="approved"
+                )
+                created += 1
+
+                if not slot_engine.is_virtual():
+                    slots += slot_engine.add_window_slots(dp.id, clinic.id, cur, st, et, slot_duration)
+
+        return Response({
+            "message": "Recurring availability added",
+            "created": created,
+            "slots": slots
+        }, status=201)
+
+
+# =========================================================
+# DELETE RECURRING OR SINGLE-DAY AVAILABILITY
+# =========================================================
+class DoctorAvailabilityBulkDeleteView(generics.GenericAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def delete(self, request):
+        user = request.user
+        if user.role != "doctor":
+            raise PermissionDenied("Only doctors can delete availability.")
+
+        dp = get_loader(request).doctor_profile()
+        group = request.query_params.get("recurrence_group")
+        single = request.query_params.get("id")
+
+        if group:
+            DoctorAvailability.objects.filter(doctor=dp, recurrence_group=group).delete()
+            return Response({"message": "Recurring availability deleted."})
+
+        if single:
+            DoctorAvailability.objects.filter(doctor=dp, id=single).delete()
+            return Response({"message": "Single-day availability deleted."})
+
+        return Response({"error": "Provide id or recurrence_group"}, status=400)
+
+
+# =========================================================
+# DELETE SINGLE SLOT (NEW FEATURE)
+# =========================================================
+@api_view(["DELETE"])
+@permission_classes([IsAuthenticated])
+def delete_single_slot(request, slot_id):
+    user = request.user
+    if user.role != "doctor":
+        return Response({"error": "Only doctors can delete a slot"}, status=403)
+
+    dp = get_loader(request).doctor_profile()
+    if not dp:
+        return Response({"error": "Doctor profile not found"}, status=404)
+
+    try:
+        slot = TimeSlot.objects.get(id=slot_id, doctor=dp)
+    except TimeSlot.DoesNotExist:
+        return Response({"error": "Slot not found"}, status=404)
+
+    if slot.is_booked:
+        return Response({"error": "Cannot delete a booked slot"}, status=400)
+
+    slot.delete()
+    return Response({"message": "Slot deleted successfully"})
+
+
+# =========================================================
+# 🔹 CLINIC OWNER → APPROVE DOCTOR AVAILABILITY
+# =========================================================
+class ClinicApproveAvailabilityView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        try:
+            availability = DoctorAvailability.objects.get(pk=pk)
+        except DoctorAvailability.DoesNotExist:
+            return Response({"error": "Availability not found"}, status=404)
+
+        action = request.data.get("action")
+        if action == "approve":
+            availability.status = "approved"
+        elif action == "reject":
+            availability.status = "rejected"
+        else:
+            return Response({"error": "Invalid action"}, status=400)
+
+        availability.save()
+        return Response({"message": "Doctor approved and verified successfully"}, status=status.HTTP_200_OK)
@@ -0,0 +1,135 @@
+# ===============================================
+# ✅ WELLORA — Views: Router viewsets (notifications, payments, reviews)
+# ===============================================
+from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from ..authentication import ClaimsJWTAuthentication
+from ..loaders import get_loader
+from ..models import Appointment, Notification, Payment, Review
+from ..serializers import (
+    AppointmentSerializer,
+    NotificationSerializer,
+    PaymentSerializer,
+    ReviewSerializer,
+)
+
+User = get_user_model()
+
+
+class NotificationViewSet(viewsets.ModelViewSet):
+    serializer_class = NotificationSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Return notifications only for the logged-in user."""
+        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+
+    def perform_create(self, serializer):
+        """Ensure the notification is always linked to the correct user."""
+        serializer.save(user=self.request.user)
+
+
+class AppointmentViewSet(viewsets.ModelViewSet):
+    queryset = Appointment.objects.all().order_by("-created_at")
+    serializer_class = AppointmentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == "doctor":
+            return Appointment.objects.filter(doctor__user=user)
+        elif user.role == "patient":
+            return Appointment.objects.filter(patient=user)
+        elif user.role == "clinic":
+            return Appointment.objects.filter(clinic__owner=user)
+        return super().get_queryset()
+
+    def perform_create(self, serializer):
+        # Automatically set patient and generate a token number
+        user = self.request.user
+        token_number = f"TOK-{timezone.now().strftime('%Y%m%d%H%M%S')}"
+        serializer.save(patient=user, token_no=token_number)
+
+    @action(detail=False, methods=["get"], url_path="by-doctor/(?P<doctor_id>[^/.]+)")
+    def get_by_doctor(self, request, doctor_id=None):
+        appointments = Appointment.objects.filter(doctor__id=doctor_id)
+        serializer = self.get_serializer(appointments, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["get"], url_path="by-clinic/(?P<clinic_id>[^/.]+)")
+    def get_by_clinic(self, request, clinic_id=None):
+        appointments = Appointment.objects.filter(clinic__id=clinic_id)
+        serializer = self.get_serializer(appointments, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=["post"], url_path="cancel")
+    def cancel_appointment(self, request, pk=None):
+        appointment = get_object_or_404(Appointment, pk=pk)
+        if appointment.status != "cancelled":
+            appointment.status = "cancelled"
+            appointment.save()
+            return Response({"message": "Appointment cancelled successfully"})
+        return Response({"message": "Already cancelled"}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=["post"], url_path="confirm")
+    def confirm_appointment(self, request, pk=None):
+        appointment = get_object_or_404(Appointment, pk=pk)
+        if appointment.status == "pending":
+            appointment.status = "confirmed"
+            appointment.save()
+            return Response({"message": "Appointment confirmed successfully"})
+        return Response({"message": "Cannot confirm this appointment"}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = PaymentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+
+        # Patient view → see only their own payments
+        if hasattr(user, "id"):
+            return Payment.objects.filter(
+                appointment__patient=user
+            ).select_related(
+                "appointment__doctor__user",
+                "appointment__clinic",
+                "appointment__timeslot",
+            ).order_by("-created_at")
+
+        # Fallback (admin, etc.)
+        return Payment.objects.all().order_by("-created_at")
+
+
+class ReviewViewSet(viewsets.ModelViewSet):
+    """
+    Reviews: patients create reviews; doctors see reviews about themselves; admins see all.
+    """
+    queryset = Review.objects.all().order_by("-created_at")
+    serializer_class = ReviewSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        user_role = getattr(user, "role", None)
+        # Doctor: return reviews for this doctor's profile
+        if user_role in (getattr(User, "ROLE_DOCTOR", "doctor"), "doctor"):
+            dp_id = get_loader(self.request).doctor_profile_id()
+            if dp_id:
+                return Review.objects.filter(doctor_id=dp_id).order_by("-created_at")
+            return Review.objects.none()
+        # Patient: return their own reviews
+        if user_role in (getattr(User, "ROLE_PATIENT", "patient"), "patient"):
+            return Review.objects.filter(user=user).order_by("-created_at")
+        # Admin/others: return all
+        return super().get_queryset()
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)